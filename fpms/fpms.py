@@ -21,7 +21,6 @@ import os.path
 import random
 import signal
 import socket
-import subprocess
 import sys
 import termios
 import threading
@@ -29,7 +28,7 @@ import time
 import tty
 import types
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image
 from gpiod.line import Bias, Edge
 from datetime import timedelta
 
@@ -39,75 +38,47 @@ if not os.geteuid()==0:
     sys.exit(-1)
 
 from .__version__ import __title__, __version__
+from .modules import commands
 from .modules import wlanpi_oled as oled
 from .modules.apps.kismet import *
 from .modules.apps.profiler import *
 from .modules.apps.scanner import *
 from .modules.bluetooth import *
+from .modules.cache import INVALIDATE_INTERFACES, ResultCache
 from .modules.cloud_tests import CloudUtils
 from .modules.constants import *
 from .modules.env_utils import EnvUtils
 from .modules.modes import *
+from .modules.nav.button_queue import ButtonQueue, KeyRepeater
 from .modules.nav.buttons import Button
+from .modules.nav.menu import MenuTree
 from .modules.network import *
+from .modules.pages.canvas import Canvas
 from .modules.pages.display import Display
 from .modules.pages.homepage import HomePage
 from .modules.pages.page import Page
 from .modules.pages.pagedtable import PagedTable
 from .modules.pages.simpletable import SimpleTable
+from .modules.pages.sprites import status_bar_sprites
 from .modules.system import *
 from .modules.battery import *
 from .modules.utils import *
+from .modules.netlink import InterfaceMonitor
+from .modules.nl80211 import WirelessMonitor
+from .modules.reachability import ReachabilityMonitor
 from .modules.reg_domain import *
+from .modules.scaling import open_image
+from .modules.scheduler import *
+from .modules.services import Services
+from .modules.state import AppState
 from .modules.time_zone import *
 
-FPMS_CONF_FILE = "/etc/wlanpi-fpms.conf"
-
 #######################################
 # Initialize various global variables
 #######################################
-g_vars = {
-
-    ##################################################
-    # Shared status signals (may be changed anywhere)
-    ##################################################
-
-    # This variable is shared between activities and is set to True if a
-    # drawing action in already if progress (e.g. by another activity). An activity
-    # happens during each cycle of the main while loop or when a button is pressed
-    # (This does not appear to be threading or process spawning)
-    'display_orientation': DISPLAY_ORIENTATION_NORMAL, # Display module orientation
-    'drawing_in_progress': False,      # True when page being painted on screen
-    'shutdown_in_progress': False,     # True when shutdown or reboot started
-    'screen_cleared': False,           # True when display cleared (e.g. screen save)
-    'display_state': 'page',           # current display state: 'page' or 'menu'
-    'sig_fired': False,                # Set to True when button handler fired
-    'option_selected': 0,              # Content of currently selected menu level
-    'current_menu_location': [0],      # Pointer to current location in menu structure
-    'current_scroll_selection': 0,     # where we currently are in scrolling table
-    'current_mode': 'classic',         # Currently selected mode (e.g. classic/server)
-    'start_up': True,                  # True if in initial (home page) start-up state
-    'disable_keys': False,             # Set to true when need to ignore key presses
-    'table_list_length': 0,            # Total length of currently displayed table
-    'table_pages': 1,                  # pages in current table
-    'result_cache': False,             # used to cache results when paging info
-    'speedtest_result_text': '',       # tablulated speedtest result data
-    'button_press_count': 0,           # global count of button pressses
-    'last_button_press_count': -1,     # copy of count of button pressses used in main loop
-    'pageSleepCountdown': PAGE_SLEEP,  # Set page sleep control
-    'home_page_name': "Home",          # Display name for top level menu
-    'home_page_alternate': False,      # True if in alternate home page state
-    'blinker_status': False,           # Blinker status
-    'eth_carrier_status': 0,           # Eth0 physical link status
-    'eth_last_known_address_set': None,# Last known ethernet addresses
-    'eth_last_reachability_test': 0,       # Number of seconds elapsed since last reachability test
-    'eth_last_reachability_result' : False,# Last reachability state
-    'scan_file' : '',                  # Location to save scans
-    'profiler_beaconing' : False,          # Indicates if the profiler is running
-    'profiler_last_profile_date': None, # The date of the last profile
-    'timezones_available' : [],         # The list of Timezones the system can support
-    'timezone_selected' : None          # The timezone selected from the menu for use in other functions
-}
+# Shared by the main loop, the pages and the background threads (see
+# AppState for the fields and which threads write them)
+g_vars = AppState()
 
 
 def log_to_syslog(message, level=syslog.LOG_INFO):
@@ -118,14 +89,19 @@ def log_to_syslog(message, level=syslog.LOG_INFO):
 
 def handle_reboot_or_shutdown(shutdown=False):
     global g_vars
-    log_to_syslog(f"shutdown_in_progress: {g_vars['shutdown_in_progress']}")
-    if not g_vars['shutdown_in_progress']:
-        g_vars['shutdown_in_progress'] = True
+    log_to_syslog(f"shutdown_in_progress: {g_vars.shutdown_in_progress}")
+
+    # Called from the D-Bus thread: only the first signal draws the image
+    with g_vars.lock:
+        starting = not g_vars.shutdown_in_progress
+        g_vars.shutdown_in_progress = True
+
+    if starting:
         log_to_syslog("Drawing shutdown/reboot image")
         if shutdown == True:
-            oled.drawImage(g_vars['shutdown_image'])
+            oled.drawImage(g_vars['shutdown_image'], wait=True)
         else:
-            oled.drawImage(g_vars['reboot_image'])
+            oled.drawImage(g_vars['reboot_image'], wait=True)
         log_to_syslog("Shutdown/reboot image drawn")
 
 
@@ -279,15 +255,30 @@ optional options:
     oled.init()
 
     g_vars['display_orientation'] = read_value("display", "orientation", DISPLAY_ORIENTATION_NORMAL)
-    oled.orientation = g_vars['display_orientation']
+    oled.set_orientation(g_vars['display_orientation'])
 
     ############################
     # shared objects
     ############################
-    g_vars['image'] = Image.new(DISPLAY_MODE, (PAGE_WIDTH, PAGE_HEIGHT))
-    g_vars['draw'] = ImageDraw.Draw(g_vars['image'])
-    g_vars['reboot_image'] = Image.open(IMAGE_DIR + '/reboot.png').convert(DISPLAY_MODE)
-    g_vars['shutdown_image'] = Image.open(IMAGE_DIR + '/shutdown.png').convert(DISPLAY_MODE)
+    # Pages draw in logical PAGE_WIDTH x PAGE_HEIGHT coordinates straight
+    # onto a canvas at the panel's native resolution
+    g_vars['canvas'] = Canvas((DISPLAY_WIDTH, DISPLAY_HEIGHT), DISPLAY_SCALE, DISPLAY_MODE, output=oled.drawImage)
+    g_vars['image'] = g_vars['canvas'].back
+    g_vars['draw'] = g_vars['canvas'].draw
+
+    # Render the status bar icons once, rather than on every refresh
+    status_bar_sprites()
+
+    # Button presses, page refresh timers and data change notifications
+    # wake the main loop through the scheduler
+    scheduler = Scheduler()
+
+    # The objects behind the pages and menu actions are built once and
+    # shared, rather than on every button press or page refresh
+    services = Services(g_vars)
+
+    g_vars['reboot_image'] = open_image(IMAGE_DIR + '/reboot.png', (DISPLAY_WIDTH, DISPLAY_HEIGHT), DISPLAY_MODE)
+    g_vars['shutdown_image'] = open_image(IMAGE_DIR + '/shutdown.png', (DISPLAY_WIDTH, DISPLAY_HEIGHT), DISPLAY_MODE)
 
     #####################################
     # check our current operating mode
@@ -306,210 +297,257 @@ optional options:
     # ################################
     # Other state initialization
     # ################################
-    profiler = Profiler(g_vars)
+    profiler = services.get(Profiler)
     g_vars['profiler_last_profile_date'] = profiler.profiler_last_profile_date()
     g_vars['profiler_beaconing'] = profiler.profiler_beaconing()
 
-    timezone = TimeZone(g_vars)
+    timezone = services.get(TimeZone)
     timezones_available = timezone.get_timezones_menu_format()
 
+    # Results of the commands run for the pages are cached (see @cached),
+    # the page on screen is repainted when one is refreshed in the background
+    results = services.get(ResultCache)
+    results.on_refresh(lambda key: scheduler.post(EVENT_DATA_CHANGED, 'cache'))
+
+    # Test reachability in the background, the home page shows the last
+    # result (and is repainted when it changes)
+    reachability = services.get(ReachabilityMonitor)
+    reachability.on_change(lambda result: scheduler.post(EVENT_DATA_CHANGED, 'reachability'))
+    reachability.on_addresses_change(lambda addresses: results.invalidate(INVALIDATE_INTERFACES))
+
+    # Follow the network interfaces through rtnetlink: the pages read them
+    # from memory, a carrier change is handled by the main loop as soon as
+    # it happens and an address change has reachability tested again
+    interfaces = services.get(InterfaceMonitor)
+    interfaces.on_carrier_change(lambda interface: scheduler.post(EVENT_DATA_CHANGED, 'carrier'))
+    interfaces.on_addresses_change(lambda addresses: reachability.probe_now())
+    if interfaces.start():
+        reachability.addresses = interfaces.addresses
+
+        # start from the Ethernet link as it is, so that check_eth() only
+        # reacts to changes
+        eth0 = interfaces.interface("eth0")
+        if eth0 is not None:
+            g_vars['eth_carrier_status'] = int(eth0.up and eth0.carrier)
+
+    # The WLAN interfaces (status bar, WLAN pages) are cached until nl80211
+    # reports a change, which repaints the page
+    wireless = services.get(WirelessMonitor)
+    wireless.on_change(lambda: (results.invalidate(INVALIDATE_INTERFACES),
+        scheduler.post(EVENT_DATA_CHANGED, 'wireless')))
+    wireless.start()
+
+    reachability.start()
+
     ###########################
     # Network menu area utils
     ###########################
     def show_interfaces():
-        network_obj = Network(g_vars)
+        network_obj = services.get(Network)
         network_obj.show_interfaces(g_vars)
 
+    @refresh_interval(None)
     def show_wlan_interfaces():
-        network_obj = Network(g_vars)
+        network_obj = services.get(Network)
         network_obj.show_wlan_interfaces(g_vars)
 
     def show_eth0_ipconfig():
-        network_obj = Network(g_vars)
+        network_obj = services.get(Network)
         network_obj.show_eth0_ipconfig(g_vars)
 
     def show_vlan():
-        network_obj = Network(g_vars)
+        network_obj = services.get(Network)
         network_obj.show_vlan(g_vars)
 
     def show_lldp_neighbour():
-        network_obj = Network(g_vars)
+        network_obj = services.get(Network)
         network_obj.show_lldp_neighbour(g_vars)
 
     def show_cdp_neighbour():
-        network_obj = Network(g_vars)
+        network_obj = services.get(Network)
         network_obj.show_cdp_neighbour(g_vars)
 
+    @refresh_interval(None)
     def show_publicip():
-        network_obj = Network(g_vars)
+        network_obj = services.get(Network)
         network_obj.show_publicip(g_vars)
 
+    @refresh_interval(None)
     def show_publicip6():
-        network_obj = Network(g_vars)
+        network_obj = services.get(Network)
         network_obj.show_publicip(g_vars, ip_version=6)
 
     ###########################
     # Bluetooth menu area
     ###########################
     def bluetooth_status():
-        bluetooth_obj = Bluetooth(g_vars)
+        bluetooth_obj = services.get(Bluetooth)
         bluetooth_obj.bluetooth_status(g_vars)
 
     def bluetooth_pair():
-        bluetooth_obj = Bluetooth(g_vars)
+        bluetooth_obj = services.get(Bluetooth)
         bluetooth_obj.bluetooth_pair(g_vars)
 
     def bluetooth_on():
-        bluetooth_obj = Bluetooth(g_vars)
+        bluetooth_obj = services.get(Bluetooth)
         bluetooth_obj.bluetooth_on(g_vars)
 
     def bluetooth_off():
-        bluetooth_obj = Bluetooth(g_vars)
+        bluetooth_obj = services.get(Bluetooth)
         bluetooth_obj.bluetooth_off(g_vars)
 
     ###########################
     # Utils menu area
     ###########################
+    @refresh_interval(None)
     def show_reachability():
-        utils_obj = Utils(g_vars)
+        utils_obj = services.get(Utils)
         utils_obj.show_reachability(g_vars)
 
+    @refresh_interval(None)
     def show_speedtest():
-        utils_obj = Utils(g_vars)
+        utils_obj = services.get(Utils)
         utils_obj.show_speedtest(g_vars)
 
+    @refresh_interval(None)
     def show_ruckus_test():
-        utils_obj = CloudUtils(g_vars)
+        utils_obj = services.get(CloudUtils)
         utils_obj.test_ruckus_cloud(g_vars)
 
+    @refresh_interval(None)
     def show_meraki_test():
-        utils_obj = CloudUtils(g_vars)
+        utils_obj = services.get(CloudUtils)
         utils_obj.test_meraki_cloud(g_vars)
 
+    @refresh_interval(None)
     def show_mist_test():
-        utils_obj = CloudUtils(g_vars)
+        utils_obj = services.get(CloudUtils)
         utils_obj.test_mist_cloud(g_vars)
 
+    @refresh_interval(None)
     def show_aruba_test():
-        utils_obj = CloudUtils(g_vars)
+        utils_obj = services.get(CloudUtils)
         utils_obj.test_aruba_cloud(g_vars)
 
+    @refresh_interval(None)
     def show_extreme_test():
-        utils_obj = CloudUtils(g_vars)
+        utils_obj = services.get(CloudUtils)
         utils_obj.test_extreme_cloud(g_vars)
 
+    @refresh_interval(None)
     def show_arista_test():
-        utils_obj = CloudUtils(g_vars)
+        utils_obj = services.get(CloudUtils)
         utils_obj.test_arista_cloud(g_vars)
 
     def show_blinker():
-        utils_obj = Utils(g_vars)
+        utils_obj = services.get(Utils)
         utils_obj.show_blinker(g_vars)
 
     def stop_blinker():
-        utils_obj = Utils(g_vars)
+        utils_obj = services.get(Utils)
         utils_obj.stop_blinker(g_vars)
 
+    @refresh_interval(None)
     def show_ssid_passphrase():
-        utils_obj = Utils(g_vars)
+        utils_obj = services.get(Utils)
         utils_obj.show_ssid_passphrase(g_vars)
 
     def show_usb():
-        utils_obj = Utils(g_vars)
+        utils_obj = services.get(Utils)
         utils_obj.show_usb(g_vars)
 
     def show_ufw():
-        utils_obj = Utils(g_vars)
+        utils_obj = services.get(Utils)
         utils_obj.show_ufw(g_vars)
 
     ############################
     # Modes area
     ############################
     def hotspot_switcher():
-        mode_obj = Mode(g_vars)
+        mode_obj = services.get(Mode)
         mode_obj.hotspot_switcher(g_vars)
 
     def wiperf_switcher():
-        mode_obj = Mode(g_vars)
+        mode_obj = services.get(Mode)
         mode_obj.wiperf_switcher(g_vars)
 
     def server_switcher():
-        mode_obj = Mode(g_vars)
+        mode_obj = services.get(Mode)
         mode_obj.server_switcher(g_vars)
 
     def bridge_switcher():
-        mode_obj = Mode(g_vars)
+        mode_obj = services.get(Mode)
         mode_obj.bridge_switcher(g_vars)
 
     ###########################
     # Apps area
     ###########################
     def kismet_start():
-        app_obj = Kismet(g_vars)
+        app_obj = services.get(Kismet)
         app_obj.kismet_start(g_vars)
 
     def kismet_stop():
-        app_obj = Kismet(g_vars)
+        app_obj = services.get(Kismet)
         app_obj.kismet_stop(g_vars)
 
     def profiler_status():
-        app_obj = Profiler(g_vars)
+        app_obj = services.get(Profiler)
         app_obj.profiler_status(g_vars)
 
     def profiler_stop():
-        app_obj = Profiler(g_vars)
+        app_obj = services.get(Profiler)
         app_obj.profiler_stop(g_vars)
 
     def profiler_start():
-        app_obj = Profiler(g_vars)
+        app_obj = services.get(Profiler)
         app_obj.profiler_start(g_vars)
 
     def profiler_start_2dot4ghz():
-        app_obj = Profiler(g_vars)
+        app_obj = services.get(Profiler)
         app_obj.profiler_start_2dot4ghz(g_vars)
 
     def profiler_start_5ghz_unii1():
-        app_obj = Profiler(g_vars)
+        app_obj = services.get(Profiler)
         app_obj.profiler_start_5ghz_unii1(g_vars)
 
     def profiler_start_5ghz_unii3():
-        app_obj = Profiler(g_vars)
+        app_obj = services.get(Profiler)
         app_obj.profiler_start_5ghz_unii3(g_vars)
 
     def profiler_start_no11r():
-        app_obj = Profiler(g_vars)
+        app_obj = services.get(Profiler)
         app_obj.profiler_start_no11r(g_vars)
 
     def profiler_start_no11ax():
-        app_obj = Profiler(g_vars)
+        app_obj = services.get(Profiler)
         app_obj.profiler_start_no11ax(g_vars)
 
     def profiler_purge_reports():
-        app_obj = Profiler(g_vars)
+        app_obj = services.get(Profiler)
         app_obj.profiler_purge_reports(g_vars)
 
     def profiler_purge_files():
-        app_obj = Profiler(g_vars)
+        app_obj = services.get(Profiler)
         app_obj.profiler_purge_files(g_vars)
 
     def scanner_scan():
-        app_obj = Scanner(g_vars)
+        app_obj = services.get(Scanner)
         app_obj.scanner_scan(g_vars)
 
     def scanner_scan_nohidden():
-        app_obj = Scanner(g_vars)
+        app_obj = services.get(Scanner)
         app_obj.scanner_scan_nohidden(g_vars)
 
     def scanner_scan_tofile_csv():
-        app_obj = Scanner(g_vars)
+        app_obj = services.get(Scanner)
         app_obj.scanner_scan_tofile_csv(g_vars)
 
     def scanner_scan_tofile_pcap_start():
-        app_obj = Scanner(g_vars)
+        app_obj = services.get(Scanner)
         app_obj.scanner_scan_tofile_pcap_start(g_vars)
 
     def scanner_scan_tofile_pcap_stop():
-        app_obj = Scanner(g_vars)
+        app_obj = services.get(Scanner)
         app_obj.scanner_scan_tofile_pcap_stop(g_vars)
 
     ###########################
@@ -517,59 +555,60 @@ optional options:
     ###########################
 
     def shutdown():
-        system_obj = System(g_vars)
+        system_obj = services.get(System)
         system_obj.shutdown(g_vars)
 
     def reboot():
-        system_obj = System(g_vars)
+        system_obj = services.get(System)
         system_obj.reboot(g_vars)
 
+    @refresh_interval(1)
     def show_summary():
-        system_obj = System(g_vars)
+        system_obj = services.get(System)
         system_obj.show_summary(g_vars)
 
     def show_battery():
-        system_obj = Battery(g_vars)
+        system_obj = services.get(Battery)
         system_obj.show_battery(g_vars)
 
     def show_reg_domain():
-        system_obj = RegDomain(g_vars)
+        system_obj = services.get(RegDomain)
         system_obj.show_reg_domain(g_vars)
 
     def set_reg_domain_us():
-        system_obj = RegDomain(g_vars)
+        system_obj = services.get(RegDomain)
         system_obj.set_reg_domain_us(g_vars)
 
     def set_reg_domain_ca():
-        system_obj = RegDomain(g_vars)
+        system_obj = services.get(RegDomain)
         system_obj.set_reg_domain_ca(g_vars)
 
     def set_reg_domain_gb():
-        system_obj = RegDomain(g_vars)
+        system_obj = services.get(RegDomain)
         system_obj.set_reg_domain_gb(g_vars)
 
     def set_reg_domain_br():
-        system_obj = RegDomain(g_vars)
+        system_obj = services.get(RegDomain)
         system_obj.set_reg_domain_br(g_vars)
 
     def set_reg_domain_fr():
-        system_obj = RegDomain(g_vars)
+        system_obj = services.get(RegDomain)
         system_obj.set_reg_domain_fr(g_vars)
 
     def set_reg_domain_cz():
-        system_obj = RegDomain(g_vars)
+        system_obj = services.get(RegDomain)
         system_obj.set_reg_domain_cz(g_vars)
 
     def set_reg_domain_nl():
-        system_obj = RegDomain(g_vars)
+        system_obj = services.get(RegDomain)
         system_obj.set_reg_domain_nl(g_vars)
 
     def set_reg_domain_de():
-        system_obj = RegDomain(g_vars)
+        system_obj = services.get(RegDomain)
         system_obj.set_reg_domain_de(g_vars)
 
     def set_reg_domain_no():
-        system_obj = RegDomain(g_vars)
+        system_obj = services.get(RegDomain)
         system_obj.set_reg_domain_no(g_vars)
 
     def rotate_display():
@@ -577,18 +616,19 @@ optional options:
             g_vars['display_orientation'] = DISPLAY_ORIENTATION_FLIPPED
         else:
             g_vars['display_orientation'] = DISPLAY_ORIENTATION_NORMAL
-        oled.orientation = g_vars['display_orientation']
+        oled.set_orientation(g_vars['display_orientation'])
         save_value("display", "orientation", g_vars['display_orientation'])
         g_vars['sig_fired'] = True
         menu_left()
         g_vars['sig_fired'] = False
 
+    @refresh_interval(1)
     def show_date():
-        system_obj = System(g_vars)
+        system_obj = services.get(System)
         system_obj.show_date(g_vars)
 
     def set_time_zone_auto():
-        system_obj = TimeZone(g_vars)
+        system_obj = services.get(TimeZone)
         system_obj.set_time_zone_auto(g_vars)
 
     def set_time_zone():
@@ -596,57 +636,57 @@ optional options:
         "/" +
         timezones_available[g_vars['current_menu_location'][5]]['timezones'][g_vars['current_menu_location'][6]])
 
-        system_obj = TimeZone(g_vars)
+        system_obj = services.get(TimeZone)
         system_obj.set_time_zone_from_gvars(g_vars)
 
+    @refresh_interval(None)
     def show_about():
-        system_obj = System(g_vars)
+        system_obj = services.get(System)
         system_obj.show_about(g_vars)
 
+    @refresh_interval(None)
     def show_help():
-        system_obj = System(g_vars)
+        system_obj = services.get(System)
         system_obj.show_help(g_vars)
 
+    @refresh_interval(None)
     def check_for_updates():
-        system_obj = System(g_vars)
+        system_obj = services.get(System)
         system_obj.check_for_updates(g_vars)
 
+    @refresh_interval(None)
     def install_updates():
-        system_obj = System(g_vars)
+        system_obj = services.get(System)
         system_obj.install_updates(g_vars)
 
     #############################
     # Button presses & home page
     #############################
+    @refresh_interval(1)
     def home_page():
-        homepage_obj = HomePage(g_vars)
+        homepage_obj = services.get(HomePage)
         homepage_obj.home_page(g_vars, menu)
 
-    def menu_down():
-        button_obj = Button(g_vars, menu)
-        button_obj.menu_down(g_vars, menu)
+    def menu_down(steps=1):
+        buttons.menu_down(g_vars, menu, steps)
 
-    def menu_up():
-        button_obj = Button(g_vars, menu)
-        button_obj.menu_up(g_vars, menu)
+    def menu_up(steps=1):
+        buttons.menu_up(g_vars, menu, steps)
 
     def menu_left():
-        button_obj = Button(g_vars, menu)
-        button_obj.menu_left(g_vars, menu)
+        buttons.menu_left(g_vars, menu)
 
     def menu_right():
-        button_obj = Button(g_vars, menu)
-        button_obj.menu_right(g_vars, menu)
+        buttons.menu_right(g_vars, menu)
 
     def menu_center():
-        button_obj = Button(g_vars, menu)
-        button_obj.menu_center(g_vars, menu)
+        buttons.menu_center(g_vars, menu)
 
     def menu_key1():
         shortcuts = [
-            create_shortcut(menu, ["Utils",   "Reachability"]),
-            create_shortcut(menu, ["Network", "LLDP Neighbour"]),
-            create_shortcut(menu, ["Network", "Eth0 IP Config"])
+            menu.shortcut(["Utils",   "Reachability"]),
+            menu.shortcut(["Network", "LLDP Neighbour"]),
+            menu.shortcut(["Network", "Eth0 IP Config"])
         ]
 
         option_selected = g_vars['option_selected']
@@ -666,22 +706,20 @@ optional options:
             next_index = (option_index + 1) % len(shortcuts)
 
         next_shortcut = shortcuts[next_index]
-        button_obj = Button(g_vars, menu)
-        button_obj.shortcut(g_vars, menu, next_shortcut)
+        buttons.shortcut(g_vars, menu, next_shortcut)
 
     def menu_key2():
-        shortcut = create_shortcut(menu, ["Mode", "Classic Mode"])
+        shortcut = menu.shortcut(["Mode", "Classic Mode"])
         if g_vars['current_mode'] == "classic":
-            shortcut = create_shortcut(menu, ["Modes", "Hotspot"])
+            shortcut = menu.shortcut(["Modes", "Hotspot"])
 
         # Switch to menu item
-        button_obj = Button(g_vars, menu)
-        button_obj.shortcut(g_vars, menu, shortcut)
+        buttons.shortcut(g_vars, menu, shortcut)
 
     def menu_key3():
         index = 0
-        reboot_shortcut = create_shortcut(menu, ["System", "Reboot"])
-        shutdown_shortcut = create_shortcut(menu, ["System", "Shutdown"])
+        reboot_shortcut = menu.shortcut(["System", "Reboot"])
+        shutdown_shortcut = menu.shortcut(["System", "Shutdown"])
 
         # Select the next path
         next_shortcut = reboot_shortcut
@@ -689,24 +727,7 @@ optional options:
             next_shortcut = shutdown_shortcut
 
         # Switch to menu
-        button_obj = Button(g_vars, menu)
-        button_obj.shortcut(g_vars, menu, next_shortcut)
-
-    def create_shortcut(menu, path, location=[]):
-
-        if isinstance(menu, types.FunctionType):
-            if len(path) > 0:
-                raise Exception("invalid path")
-            return [menu]
-
-        if len(path) > 0:
-            index = 0
-            for item in menu:
-                if item["name"] == path[0]:
-                    return [index] + create_shortcut(item["action"], path[1:], location)
-                index += 1
-
-        return []
+        buttons.shortcut(g_vars, menu, next_shortcut)
 
     #######################
     # menu structure here
@@ -914,8 +935,13 @@ optional options:
             if item["name"] == "Apps":
                 menu.remove(item)
 
-    # Set up handlers to process key presses
-    def button_press(gpio_pin, g_vars=g_vars):
+    # Compile the menu once: pages and buttons navigate the indexed tree
+    # rather than walking the nested lists on every press
+    menu = MenuTree(menu)
+    buttons = Button(g_vars, menu, services)
+
+    # Set up handlers to process key presses (run on the main loop thread)
+    def button_press(gpio_pin, g_vars=g_vars, count=1):
 
         DOWN_KEY = BUTTONS_PINS['down']
         UP_KEY = BUTTONS_PINS['up']
@@ -935,20 +961,12 @@ optional options:
         if 'key3' in BUTTONS_PINS:
             KEY3 = BUTTONS_PINS['key3']
 
-        if g_vars['disable_keys'] == True:
-            # someone disabled the front panel keys as they don't want to be interrupted
-            return
-
-        if (g_vars['sig_fired']):
-            # signal handler already in progress, ignore this one
-            return
-
         # user pressed a button, reset the sleep counter
         g_vars['pageSleepCountdown'] = PAGE_SLEEP
 
         g_vars['start_up'] = False
 
-        if g_vars['drawing_in_progress'] or g_vars['shutdown_in_progress']:
+        if g_vars['shutdown_in_progress']:
             return
 
         # increment the button press counter to indicate the something has been done
@@ -963,14 +981,14 @@ optional options:
         # Down key pressed
         if gpio_pin == DOWN_KEY:
             g_vars['sig_fired'] = True
-            menu_down()
+            menu_down(count)
             g_vars['sig_fired'] = False
             return
 
         # Down key pressed
         if gpio_pin == UP_KEY:
             g_vars['sig_fired'] = True
-            menu_up()
+            menu_up(count)
             g_vars['sig_fired'] = False
             return
 
@@ -1055,7 +1073,7 @@ optional options:
     ]
 
     for image in splash_screen_images:
-        img = Image.open(image).convert(DISPLAY_MODE)
+        img = open_image(image, (DISPLAY_WIDTH, DISPLAY_HEIGHT), DISPLAY_MODE)
         oled.drawImage(img)
         time.sleep(0.100)
 
@@ -1066,85 +1084,61 @@ optional options:
     # Buttons setup
     ###############################################################################
 
-    # Set signal handlers for button presses - these fire every time a button
-    # is pressed
-    def up_key():
-        button_press(BUTTONS_PINS['up'], g_vars)
-
-    def down_key():
-        button_press(BUTTONS_PINS['down'], g_vars)
-
-    def left_key():
-        button_press(BUTTONS_PINS['left'], g_vars)
-
-    def right_key():
-        button_press(BUTTONS_PINS['right'], g_vars)
+    # The input threads (gpiod monitor, keyboard emulator) only queue the
+    # presses; the main loop handles them. Presses made while the keys are
+    # disabled (e.g. during a speedtest) are ignored.
+    def push_button(button, timestamp_ns=None):
+        if g_vars.disable_keys == True:
+            return
 
-    def center_key():
-        button_press(BUTTONS_PINS['center'], g_vars)
+        button_queue.push(button, timestamp_ns)
 
-    def key_1():
-        button_press(BUTTONS_PINS['key1'], g_vars)
+    def handle_buttons():
+        for event in button_queue.drain():
+            button_press(BUTTONS_PINS[event.button], g_vars, event.count)
 
-    def key_2():
-        button_press(BUTTONS_PINS['key2'], g_vars)
+    button_queue = ButtonQueue(on_ready=lambda: scheduler.post(EVENT_BUTTON))
+    button_names = {pin: name for name, pin in BUTTONS_PINS.items()}
 
-    def key_3():
-        button_press(BUTTONS_PINS['key3'], g_vars)
+    def oriented(button):
+        # Keep the buttons consistent with the rotated display
+        if oled.orientation == DISPLAY_ORIENTATION_FLIPPED:
+            return BUTTONS_FLIPPED[button]
+        return button
 
     def monitor_buttons():
 
         line_setting = gpiod.LineSettings(
             bias=Bias.PULL_UP,
-            edge_detection=Edge.FALLING,
+            edge_detection=Edge.BOTH,
             debounce_period=timedelta(microseconds=10)
         )
 
         lines = {k:line_setting for k in BUTTONS_PINS.values()}
 
+        # Repeats the navigation buttons while they are held down
+        repeater = KeyRepeater()
+
         with gpiod.request_lines(
             "/dev/gpiochip0",
             lines,
         ) as request:
             while True:
-                request.wait_edge_events(1)
-                events = request.read_edge_events()
-
-                for event in events:
-                    if g_vars['display_orientation'] == DISPLAY_ORIENTATION_FLIPPED:
-                        if event.line_offset == BUTTONS_PINS['up']:
-                            down_key()
-                        elif event.line_offset == BUTTONS_PINS['down']:
-                            up_key()
-                        elif event.line_offset == BUTTONS_PINS['left']:
-                            right_key()
-                        elif event.line_offset == BUTTONS_PINS['right']:
-                            left_key()
-                        elif event.line_offset == BUTTONS_PINS['center']:
-                            center_key()
-                        elif event.line_offset == BUTTONS_PINS['key1']:
-                            key_3()
-                        elif event.line_offset == BUTTONS_PINS['key2']:
-                            key_2()
-                        elif event.line_offset == BUTTONS_PINS['key3']:
-                            key_1()
-                    else:
-                        if event.line_offset == BUTTONS_PINS['up']:
-                            up_key()
-                        elif event.line_offset == BUTTONS_PINS['down']:
-                            down_key()
-                        elif event.line_offset == BUTTONS_PINS['left']:
-                            left_key()
-                        elif event.line_offset == BUTTONS_PINS['right']:
-                            right_key()
-                        elif event.line_offset == BUTTONS_PINS['center']:
-                            center_key()
-                        elif event.line_offset == BUTTONS_PINS['key1']:
-                            key_1()
-                        elif event.line_offset == BUTTONS_PINS['key2']:
-                            key_2()
-                        elif event.line_offset == BUTTONS_PINS['key3']:
-                            key_3()
+                if request.wait_edge_events(repeater.timeout(time.monotonic_ns())):
+                    for event in request.read_edge_events():
+                        button = button_names.get(event.line_offset)
+                        if button is None:
+                            continue
+
+                        # The buttons pull the lines low when pressed
+                        if event.event_type == gpiod.EdgeEvent.Type.FALLING_EDGE:
+                            repeater.press(button, event.timestamp_ns)
+                            push_button(oriented(button), event.timestamp_ns)
+                        else:
+                            repeater.release(button, event.timestamp_ns)
+
+                for button, timestamp_ns in repeater.due(time.monotonic_ns()):
+                    push_button(oriented(button), timestamp_ns)
 
     m = threading.Thread(name="button-monitor", target=monitor_buttons)
     m.daemon = True
@@ -1180,37 +1174,38 @@ optional options:
 
             if (char == "k" or char == "K"):
                 running = False
+                scheduler.post(EVENT_QUIT)
                 break
 
             if (char == "g" or char == "G"):
                 capture_screen()
 
             if (char == "8" or char == "w"):
-                up_key()
+                push_button('up')
 
             if (char == "2" or char == "x"):
-                down_key()
+                push_button('down')
 
             if (char == "4" or char == "a"):
-                left_key()
+                push_button('left')
 
             if (char == "6" or char == "d"):
-                right_key()
+                push_button('right')
 
             if (char == "5" or char == "s"):
-                center_key()
+                push_button('center')
 
             if button_key1_present:
                 if (char == "*" or char == "i"):
-                    key_1()
+                    push_button('key1')
 
             if button_key2_present:
                 if (char == "-" or char == "o"):
-                    key_2()
+                    push_button('key2')
 
             if button_key3_present:
                 if (char == "+" or char == "p"):
-                    key_3()
+                    push_button('key3')
 
     if emulate:
         print("UP = 'w', DOWN = 'x', LEFT = 'a', RIGHT = 'd', CENTER = 's'")
@@ -1232,7 +1227,7 @@ optional options:
             os.makedirs(screenshots_dir)
         timestr = datetime.now().strftime("%Y_%m_%d-%I_%M_%S_%p")
         save_file = screenshots_dir + "/screenshot_" + timestr + ".png"
-        g_vars['image'].save(save_file)
+        g_vars['canvas'].snapshot().save(save_file)
         print(save_file)
         g_vars['sig_fired'] = False
 
@@ -1245,98 +1240,147 @@ optional options:
         g_vars['screen_cleared'] = False
         g_vars['pageSleepCountdown'] = PAGE_SLEEP
 
+        # Repaint the page straight away
+        scheduler.post(EVENT_DATA_CHANGED, 'screen')
+
     def check_eth():
         '''
         Detects a change in the status of the Ethernet port and wakes up
         the screen if necessary
         '''
         try:
-            cmd = "cat /sys/class/net/eth0/carrier"
-            carrier = int(subprocess.check_output(cmd, shell=True).decode().strip())
+            if interfaces.running:
+                eth0 = interfaces.interface("eth0")
+                if eth0 is None:
+                    return
+                carrier = int(eth0.up and eth0.carrier)
+            else:
+                with open("/sys/class/net/eth0/carrier") as f:
+                    carrier = int(f.read().strip())
+
             if g_vars['eth_carrier_status'] != carrier:
+                results.invalidate(INVALIDATE_INTERFACES)
                 wakeup_screen()
+                reachability.probe_now()
             g_vars['eth_carrier_status'] = carrier
-        except subprocess.CalledProcessError as exc:
+        except (OSError, ValueError):
+            # no eth0, or its carrier cannot be read while it is down
             pass
 
-    ##############################################################################
-    # Constant 'while' loop to paint images on display or execute actions in
-    # response to selections made with buttons. When any of the 3 WLANPi buttons
-    # are pressed, I believe the signal handler takes over the Python interpreter
-    # and executes the code associated with the button. The original flow continues
-    # once the button press action has been completed.
-    #
-    # The current sleep period of the while loop is ignored when a button is
-    # pressed.
-    #
-    # All global variables defined outside of the while loop are preserved and may
-    # read/set as required. The same variables are available for read/write even
-    # when a button is pressed and an interrupt occurs: no additional thread or
-    # interpreter with its own set of vars appears to be launched. For this reason,
-    # vars may be used to signal between the main while loop and any button press
-    # activity to indicate that processes such as screen paints are in progress.
-    #
-    # Despite the sample code suggesting threading is used I do not believe this
-    # is the case, based on testing with variable scopes and checking for process
-    # IDs when different parts of the script are executing.
-    ##############################################################################
-    while running:
+    def busy():
+        '''
+        Returns True while the page must not be refreshed
+        '''
+        return (g_vars.shutdown_in_progress or g_vars.screen_cleared or
+            g_vars.drawing_in_progress or g_vars.sig_fired)
 
-        try:
+    def current_refresh_interval():
+        '''
+        Returns the refresh interval of the page on screen (None if it only
+        changes on a button press)
+        '''
+        if g_vars.shutdown_in_progress or g_vars.screen_cleared:
+            return None
 
-            # check if eth0 link status has changed so we exit from screen save if needed
-            check_eth()
+        # Menus are redrawn by the button handlers
+        if g_vars.display_state == 'menu':
+            return None
+
+        if g_vars.start_up == True:
+            return get_refresh_interval(home_page)
 
-            if g_vars['shutdown_in_progress'] or g_vars['screen_cleared'] or g_vars['drawing_in_progress'] or g_vars['sig_fired']:
+        return get_refresh_interval(g_vars.option_selected)
+
+    def refresh_page():
+        '''
+        Re-runs the current action to refresh the page on screen
+        '''
+        if busy():
+            return
 
-                # we don't really want to do anything at the moment, lets
-                # nap and loop around
-                time.sleep(2)
-                continue
+        # Draw a menu or execute current action (dispatcher)
+        if g_vars['display_state'] != 'menu':
+            # no menu shown, so must be executing action.
 
-            # Draw a menu or execute current action (dispatcher)
-            if g_vars['display_state'] != 'menu':
-                # no menu shown, so must be executing action.
+            # if we've just booted up, show home page
+            if g_vars['start_up'] == True:
+                g_vars['option_selected'] = home_page
 
-                # if we've just booted up, show home page
-                if g_vars['start_up'] == True:
-                    g_vars['option_selected'] = home_page
+            # Handle when g_vars['option_selected'] does not return
+            #   a func but returns a list instead and fpms freezes.
+            if isinstance(g_vars['option_selected'], types.FunctionType):
+                g_vars['option_selected']()
 
-                # Re-run current action to refresh screen
-                #
-                # Handle when g_vars['option_selected'] does not return
-                #   a func but returns a list instead and fpms freezes.
-                #
-                # investigate by uncommenting these print statements
-                # and `tail -f /tmp/nanoled-python.log`:
-                # print(g_vars['option_selected'])
-                # print(type(g_vars['option_selected']))
+        else:
+            # Repaint the menu if a button press did not get to draw it
+            if g_vars['button_press_count'] > g_vars['last_button_press_count']:
+                page_obj = services.get(Page)
+                page_obj.draw_page(g_vars, menu)
 
-                if isinstance(g_vars['option_selected'], types.FunctionType):
-                    g_vars['option_selected']()
+    def housekeeping():
+        '''
+        Periodic checks, independent of the page on screen
+        '''
+        # check if eth0 link status has changed so we exit from screen save
+        # if needed (the interface monitor reports it, when running)
+        if not interfaces.running:
+            check_eth()
 
-            else:
-                # lets try drawing our page (or refresh if already painted)
+        if busy():
+            return
 
-                # No point in repainting screen if we are on a
-                # menu page and no buttons pressed since last loop cycle
-                # In reality, this condition will rarely (if ever) be true
-                # as the page painting is driven from the key press which
-                # interrupts this flow anyhow. Left in as a safeguard
-                if g_vars['button_press_count'] > g_vars['last_button_press_count']:
-                    page_obj = Page(g_vars)
-                    page_obj.draw_page(g_vars, menu)
+        # if screen timeout is zero, clear it if not already done (blank the
+        # display to reduce screenburn)
+        if g_vars['pageSleepCountdown'] == 0 and g_vars['screen_cleared'] == False:
+            sleep_screen()
 
-            # if screen timeout is zero, clear it if not already done (blank the
-            # display to reduce screenburn)
-            if g_vars['pageSleepCountdown'] == 0 and g_vars['screen_cleared'] == False:
-                sleep_screen()
+        if g_vars['pageSleepCountdown'] > 0:
+            g_vars['pageSleepCountdown'] = g_vars['pageSleepCountdown'] - 1
 
-            if g_vars['pageSleepCountdown'] > 0:
-                g_vars['pageSleepCountdown'] = g_vars['pageSleepCountdown'] - 1
+    ##############################################################################
+    # Main loop: paint pages or execute actions in response to events.
+    #
+    # The loop sleeps in the scheduler until something happens:
+    #
+    #   - button presses are queued: they are handled and the page drawn, so
+    #     its refresh period starts over
+    #   - the refresh timer of the page on screen is due: the current action is
+    #     re-run. Each page declares its interval with @refresh_interval (static
+    #     pages declare None and are not re-run)
+    #   - a data change notification (e.g. reachability, WLAN interfaces, screen
+    #     woken up): the page is refreshed at once. A carrier change (from the interface
+    #     monitor) wakes up the screen if it is the Ethernet link's
+    #   - the housekeeping timer (every HOUSEKEEPING_INTERVAL secs) counts down
+    #     to the screen saver (PAGE_SLEEP ticks), and checks the Ethernet link
+    #     if the interface monitor is not running
+    ##############################################################################
+    scheduler.set_timer(TIMER_HOUSEKEEPING, HOUSEKEEPING_INTERVAL)
+
+    # Draw the first page straight away
+    scheduler.post(EVENT_DATA_CHANGED, 'start')
+
+    while running:
+
+        try:
+            kind, data = scheduler.wait()
+
+            if kind == EVENT_QUIT:
+                break
+
+            if kind == EVENT_BUTTON:
+                handle_buttons()
+            elif kind == EVENT_TICK and data == TIMER_HOUSEKEEPING:
+                housekeeping()
+            elif kind == EVENT_DATA_CHANGED and data == 'carrier':
+                # wakes up the screen (and repaints) if eth0 changed
+                check_eth()
+            else:
+                refresh_page()
 
-            # have a nap before we start our next loop
-            time.sleep(2)
+            # Follow the page now on screen: it may have changed, and the
+            # period restarts after a button press or an immediate refresh
+            scheduler.set_timer(TIMER_REFRESH, current_refresh_interval(),
+                restart=kind in [EVENT_BUTTON, EVENT_DATA_CHANGED])
 
         except KeyboardInterrupt:
             break
@@ -1345,11 +1389,18 @@ optional options:
 
         g_vars['last_button_press_count'] = g_vars['button_press_count']
 
-    '''
-    Discounted ideas
-
-        1. Vary sleep timer for main while loop (e.g. longer for less frequently
-           updating data) - doesn;t work as main while loop may be in middle of
-           long sleep when button action taken, so screen refresh very long.
+    oled.flush()
+    if DISPLAY_TYPE == DISPLAY_TYPE_HEADLESS:
+        print("Headless frames: {frames}, bytes: {bytes}, draw time: {draw_time:.3f}s (max {max_draw_time:.4f}s)".format(
+            **oled.device.stats))
+    print("Frames presented: {presented}, {fps:.0f} fps".format(
+        fps=g_vars['canvas'].throughput(), **g_vars['canvas'].stats))
+    print("Frames sent: {sent}, skipped (unchanged): {skipped}, replaced before sending: {coalesced}".format(**oled.frame_stats))
+    print("Buttons pressed: {pressed}, coalesced: {coalesced}, dropped: {dropped}, longest wait: {max_wait:.3f}s".format(
+        **button_queue.stats))
+    print("Cached results: {hits} hits, {stale} stale, {misses} misses, {refreshes} refreshed, {invalidated} invalidated".format(
+        **results.stats))
+    for name, entry in sorted(commands.stats.items(), key=lambda item: item[1]['time'], reverse=True):
+        print("Command {}: {calls} calls, {failures} failed, {timeouts} timed out, {time:.3f}s (max {max_time:.3f}s)".format(
+            name, **entry))
 
-    '''
@@ -5,6 +5,7 @@ import sys
 import time
 
 import fpms.modules.wlanpi_oled as oled
+from fpms.modules import commands
 from fpms.modules.pages.display import Display
 from fpms.modules.pages.alert import Alert
 from fpms.modules.pages.pagedtable import PagedTable
@@ -29,8 +30,7 @@ class Kismet(object):
         """
         try:
             # this cmd fails if service not installed
-            cmd = "/bin/systemctl is-active --quiet kismet"
-            subprocess.run(cmd, shell=True).check_returncode()
+            commands.output(["/bin/systemctl", "is-active", "--quiet", "kismet"])
         except:
             # cmd failed, so profiler service not installed
             return False
@@ -59,15 +59,15 @@ class Kismet(object):
             else:
                 self.alert_obj.display_popup_alert(g_vars, "Starting...")
                 try:
-                    cmd = "/bin/systemctl start kismet"
-                    subprocess.run(cmd, shell=True, timeout=10)
+                    commands.output(["/bin/systemctl", "start", "kismet"], timeout=10)
                     self.alert_obj.display_alert_info(
                         g_vars, "Kismet started.", title="Success"
                     )
-                except subprocess.CalledProcessError as proc_exc:
-                    self.alert_obj.display_alert_error(g_vars, "Start failed.")
-                except subprocess.TimeoutExpired as timeout_exc:
-                    self.alert_obj.display_alert_error(g_vars, "Process timed out.")
+                except commands.CommandError as proc_exc:
+                    if proc_exc.timed_out:
+                        self.alert_obj.display_alert_error(g_vars, "Process timed out.")
+                    else:
+                        self.alert_obj.display_alert_error(g_vars, "Start failed.")
         elif action == "stop":
             if not self.kismet_status():
                 self.alert_obj.display_alert_error(
@@ -76,8 +76,7 @@ class Kismet(object):
             else:
                 self.alert_obj.display_popup_alert(g_vars, "Stopping...")
                 try:
-                    cmd = "/bin/systemctl stop kismet"
-                    subprocess.run(cmd, shell=True)
+                    commands.run(["/bin/systemctl", "stop", "kismet"])
                     if self.kismet_status():
                         self.alert_obj.display_alert_error(g_vars, "Stop failed.")
                     else:
@@ -5,6 +5,7 @@ import sys
 import time
 
 import fpms.modules.wlanpi_oled as oled
+from fpms.modules import commands
 from fpms.modules.pages.display import Display
 from fpms.modules.pages.alert import Alert
 from fpms.modules.pages.pagedtable import PagedTable
@@ -159,8 +160,7 @@ class Profiler(object):
         # check resource is available
         try:
             # this cmd fails if service not installed
-            cmd = "systemctl is-enabled wlanpi-profiler"
-            subprocess.run(cmd, shell=True).check_returncode()
+            commands.output(["systemctl", "is-enabled", "wlanpi-profiler"])
         except:
             # cmd failed, so profiler service not installed
             self.alert_obj.display_alert_error(g_vars, "wlanpi-profiler not available.")
@@ -258,8 +258,7 @@ class Profiler(object):
             else:
                 self.alert_obj.display_popup_alert(g_vars, "Starting...")
                 try:
-                    cmd = "/bin/systemctl start wlanpi-profiler"
-                    subprocess.run(cmd, shell=True, timeout=10)
+                    commands.output(["/bin/systemctl", "start", "wlanpi-profiler"], timeout=10)
 
                     # We need to wait until Profiler starts beaconing so that
                     # we can show the QR code. We will wait for 20 seconds and
@@ -278,10 +277,11 @@ class Profiler(object):
                     else:
                         self.alert_obj.display_alert_error(g_vars, "Start failed.")
 
-                except subprocess.CalledProcessError as proc_exc:
-                    self.alert_obj.display_alert_error(g_vars, "Start failed.")
-                except subprocess.TimeoutExpired as timeout_exc:
-                    self.alert_obj.display_alert_error(g_vars, "Process timed out.")
+                except commands.CommandError as proc_exc:
+                    if proc_exc.timed_out:
+                        self.alert_obj.display_alert_error(g_vars, "Process timed out.")
+                    else:
+                        self.alert_obj.display_alert_error(g_vars, "Start failed.")
 
             # Stamp QR code to facilitate profiling
             qrcode_path = self.profiler_qrcode()
@@ -298,8 +298,7 @@ class Profiler(object):
             else:
                 self.alert_obj.display_popup_alert(g_vars, "Stopping...")
                 try:
-                    cmd = "/bin/systemctl stop wlanpi-profiler"
-                    subprocess.run(cmd, shell=True)
+                    commands.run(["/bin/systemctl", "stop", "wlanpi-profiler"])
 
                     # Wait for Profiler to stop beaconing so we can check
                     # it was successfully stopped.
@@ -325,8 +324,7 @@ class Profiler(object):
             self.alert_obj.display_popup_alert(g_vars, "Purging reports...")
 
             try:
-                cmd = "/usr/sbin/profiler --clean --yes"
-                subprocess.run(cmd, shell=True).check_returncode()
+                commands.output(["/usr/sbin/profiler", "--clean", "--yes"])
                 self.alert_obj.display_alert_info(
                     g_vars, "Reports purged.", title="Success"
                 )
@@ -341,8 +339,7 @@ class Profiler(object):
             self.alert_obj.display_popup_alert(g_vars, "Purging files...")
 
             try:
-                cmd = "/usr/sbin/profiler --clean --files --yes"
-                subprocess.run(cmd, shell=True)
+                commands.run(["/usr/sbin/profiler", "--clean", "--files", "--yes"])
                 self.alert_obj.display_alert_info(
                     g_vars, "Files purged.", title="Success"
                 )
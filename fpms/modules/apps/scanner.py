@@ -9,11 +9,14 @@ from os import kill
 import textfsm
 
 import fpms.modules.wlanpi_oled as oled
+from fpms.modules import commands
 from fpms.modules.constants import IP_FILE, IW_FILE, MAX_TABLE_LINES
 from fpms.modules.pages.alert import Alert
 from fpms.modules.pages.pagedtable import PagedTable
+from fpms.modules.processes import pid_alive
 
 IFACE = "wlan0"
+SCAN_TIMEOUT = 30 # Secs before a scan gives up
 
 class Scanner(object):
     def __init__(self, g_vars):
@@ -62,10 +65,8 @@ class Scanner(object):
 
         g_vars["scanner_status"] = True
 
-        cmd = f"{IW_FILE} {IFACE} scan"
-
         try:
-            scan_output = subprocess.check_output(cmd, shell=True).decode().strip()
+            scan_output = commands.output([IW_FILE, IFACE, "scan"], timeout=SCAN_TIMEOUT)
             networks = self.parse(scan_output)
 
             # Sort results by RSSI
@@ -108,7 +109,8 @@ class Scanner(object):
                     time_measure_value = time_now_value - timedelta(milliseconds=int(lastseen))
                     time_string = time_measure_value.strftime("%H:%M:%S")
                     results.append("\"{}\", \"{}\", \"{}\", \"{}\", \"{}\"\n".format(ssid, bssid, rssi, channel, time_string))
-            g_vars["scanner_results"] = results
+            # results and status change together, as seen by the page
+            g_vars.update(scanner_results=results, scanner_status=False)
         except Exception as e:
             print(e)
         finally:
@@ -144,8 +146,11 @@ class Scanner(object):
 
             # Configure interface
             try:
-                cmd = f"{IP_FILE} link set {IFACE} down && {IW_FILE} {IFACE} set type managed && {IP_FILE} link set {IFACE} up"
-                subprocess.run(cmd, shell=True)
+                for argv in [[IP_FILE, "link", "set", IFACE, "down"],
+                    [IW_FILE, IFACE, "set", "type", "managed"],
+                    [IP_FILE, "link", "set", IFACE, "up"]]:
+                    if not commands.succeeds(argv):
+                        break
             except Exception as e:
                 print(e)
 
@@ -266,11 +271,7 @@ class Scanner(object):
         is still running in the background.
         '''
         if "scanner_scandump_pid" in g_vars:
-            try:
-                subprocess.check_output("/usr/bin/ps -p {}".format(g_vars["scanner_scandump_pid"]), shell=True)
-                return True
-            except subprocess.CalledProcessError:
-                return False
+            return pid_alive(g_vars["scanner_scandump_pid"])
 
         return False
 
@@ -22,6 +22,12 @@ class Battery(object):
         self.alert_obj = Alert(g_vars)
 
         # load battery status info
+        self.read_status()
+
+    def read_status(self):
+        '''
+        (Re-)reads the battery status info
+        '''
         self.info = { "POWER_SUPPLY_PRESENT" : "0" }
         try:
             with open(BATTERY_STATUS_FILE) as f:
@@ -75,6 +81,8 @@ class Battery(object):
     def show_battery(self, g_vars):
         status = []
 
+        self.read_status()
+
         if not self.battery_present():
             self.alert_obj.display_alert_error(g_vars, "Battery not found.")
             g_vars['display_state'] = 'page'
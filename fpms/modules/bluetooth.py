@@ -2,6 +2,7 @@ import time
 import os.path
 import subprocess
 import fpms.modules.wlanpi_oled as oled
+from fpms.modules import commands
 import sys
 import re
 
@@ -12,6 +13,7 @@ from fpms.modules.pages.alert import Alert
 from fpms.modules.constants import MAX_TABLE_LINES
 
 BT_ADAPTER = "hci0"
+BT_COMMAND_TIMEOUT = 30 # Secs to wait for the pairing service to start
 
 class Bluetooth(object):
 
@@ -27,69 +29,43 @@ class Bluetooth(object):
         '''
         We want to use hciconfig here as it works OK when no devices are present
         '''
-        try:
-            cmd = f"hciconfig | grep {BT_ADAPTER}"
-            subprocess.run(cmd, shell=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                check=True)
-            return True
-        except subprocess.CalledProcessError as exc:
-            return False
+        return bool(commands.grep(commands.run(["hciconfig"]).lines(), re.escape(BT_ADAPTER)))
+
+    def adapter_info(self, name):
+        '''
+        Returns the first word of an adapter property listed by bt-adapter
+        '''
+        info = commands.run(["bt-adapter", "-a", BT_ADAPTER, "-i"]).lines()
+        return "\n".join(commands.field(line, 2) for line in commands.grep(info, name))
 
     def bluetooth_name(self):
-        try:
-            cmd = f"bt-adapter -a {BT_ADAPTER} -i" + "| grep Name | awk '{ print $2 }'"
-            name = subprocess.check_output(cmd, shell=True).decode().strip()
-            return name
-        except subprocess.CalledProcessError as exc:
-            return None
+        return self.adapter_info("Name")
 
     def bluetooth_alias(self):
-        try:
-            cmd = f"bt-adapter -a {BT_ADAPTER} -i" + "| grep Alias | awk '{ print $2 }'"
-            alias = subprocess.check_output(cmd, shell=True).decode().strip()
-            return alias
-        except subprocess.CalledProcessError as exc:
-            return None
+        return self.adapter_info("Alias")
 
     def bluetooth_address(self):
-        try:
-            cmd = f"bt-adapter -a {BT_ADAPTER} -i" + "| grep Address | awk '{ print $2 }'"
-            address = subprocess.check_output(cmd, shell=True).decode().strip()
-            return address
-        except subprocess.CalledProcessError as exc:
-            return None
+        return self.adapter_info("Address")
 
     def bluetooth_power(self):
         '''
         We want to use hciconfig here as it works OK when no devices are present
         '''
-        try:
-            cmd = f"hciconfig {BT_ADAPTER} | grep -E '^\s+UP'"
-            subprocess.run(cmd, shell=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                check=True)
-            return True
-        except subprocess.CalledProcessError as exc:
-            return False
+        return bool(commands.grep(commands.run(["hciconfig", BT_ADAPTER]).lines(), r"^\s+UP"))
 
     def bluetooth_set_power(self, power):
         bluetooth_is_on = self.bluetooth_power()
 
+        if power == bluetooth_is_on:
+            return True
+
+        state = "1" if power else "0"
         try:
-            if power:
-                if bluetooth_is_on:
-                    return True
-                cmd = f"bt-adapter -a {BT_ADAPTER} --set Powered 1 && echo 1 > /etc/wlanpi-bluetooth/state"
-            else:
-                if not bluetooth_is_on:
-                    return True
-                cmd = f"bt-adapter -a {BT_ADAPTER} --set Powered 0 && echo 0 > /etc/wlanpi-bluetooth/state"
-            subprocess.run(cmd, shell=True)
+            if commands.succeeds(["bt-adapter", "-a", BT_ADAPTER, "--set", "Powered", state]):
+                with open("/etc/wlanpi-bluetooth/state", "w") as f:
+                    f.write(state + "\n")
             return True
-        except subprocess.CalledProcessError as exc:
+        except OSError as exc:
             return False
 
     def bluetooth_paired_devices(self):
@@ -101,8 +77,9 @@ class Bluetooth(object):
             return None
 
         try:
-            cmd = "bluetoothctl -- paired-devices | grep -iv 'no default controller'"
-            output = subprocess.check_output(cmd, shell=True).decode().strip()
+            lines = commands.output(["bluetoothctl", "--", "paired-devices"]).splitlines()
+            output = "\n".join(line for line in lines
+                if "no default controller" not in line.lower()).strip()
             if len(output) > 0:
                 output = re.sub("Device *", "", output).split('\n')
                 return dict([line.split(" ", 1) for line in output])
@@ -167,13 +144,7 @@ class Bluetooth(object):
                 while paired_devices != None and elapsed_time < timeout:
                     self.alert_obj.display_popup_alert(g_vars, "Unpairing existing device...")
                     for dev in paired_devices:
-                        try:
-                            cmd = f"bluetoothctl -- remove {dev}"
-                            subprocess.run(cmd, shell=True,
-                                stdout=subprocess.DEVNULL,
-                                stderr=subprocess.DEVNULL)
-                        except:
-                            pass
+                        commands.run(["bluetoothctl", "--", "remove", dev])
                     paired_devices = self.bluetooth_paired_devices()
                     time.sleep(1)
                     elapsed_time += 1
@@ -193,8 +164,7 @@ class Bluetooth(object):
                     alias = self.bluetooth_alias()
                     try:
                         g_vars["disable_keys"] = True
-                        cmd = "systemctl start bt-timedpair"
-                        subprocess.run(cmd, shell=True).check_returncode()
+                        commands.output(["systemctl", "start", "bt-timedpair"], timeout=BT_COMMAND_TIMEOUT)
                         alert_msg = "Bluetooth is on. Discoverable as \"" + alias + "\""
                         ok = True
                     except subprocess.CalledProcessError as exc:
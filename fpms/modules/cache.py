@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import functools
+import threading
+import time
+
+# Events invalidating cached results (see ResultCache.invalidate())
+INVALIDATE_INTERFACES = "interfaces"   # an interface, link or address changed
+INVALIDATE_MODE = "mode"               # the operating mode is changing
+
+# Age (as a multiple of the TTL) beyond which a result is too old to be
+# shown while it is refreshed
+MAX_STALE_TTLS = 10
+
+class CacheEntry(object):
+    '''
+    A cached result, the time it was fetched (time.monotonic()) and the
+    events invalidating it
+    '''
+
+    def __init__(self, value, timestamp, ttl, invalidated_by):
+        self.value = value
+        self.timestamp = timestamp
+        self.ttl = ttl
+        self.invalidated_by = invalidated_by
+        self.refreshing = False
+
+class ResultCache(object):
+    '''
+    Results of the page data providers (the commands a page runs to get
+    what it shows), kept for a time-to-live set per provider, so that
+    going back to a page shows it at once.
+
+    A result older than its TTL is still returned (stale-while-revalidate)
+    while a background thread fetches a new one, up to MAX_STALE_TTLS
+    times the TTL. The listeners are told when the refresh is done, to
+    repaint the page. Events (INVALIDATE_INTERFACES, INVALIDATE_MODE)
+    drop the results that depend on them.
+    '''
+
+    def __init__(self, g_vars=None, clock=time.monotonic):
+        # (g_vars is unused, Services builds every service with it)
+        self.clock = clock
+        self.entries = {}
+        self.listeners = []
+        self.lock = threading.Lock()
+
+        self.stats = {
+            'hits': 0,
+            'stale': 0,
+            'misses': 0,
+            'refreshes': 0,
+            'invalidated': 0,
+        }
+
+    def on_refresh(self, listener):
+        '''
+        Calls listener(key) when a result has been refreshed in the background
+        '''
+        self.listeners.append(listener)
+
+    def get(self, key, fetch, ttl, invalidated_by=()):
+        '''
+        Returns the cached result for the key, calling fetch() to get it
+        if there is none (or it is too old). Exceptions raised by fetch()
+        are passed on and nothing is cached.
+        '''
+        now = self.clock()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                age = now - entry.timestamp
+                if age < entry.ttl:
+                    self.stats['hits'] += 1
+                    return entry.value
+
+                if age < entry.ttl * MAX_STALE_TTLS:
+                    self.stats['stale'] += 1
+                    if not entry.refreshing:
+                        entry.refreshing = True
+                        threading.Thread(name="cache-refresh", target=self.refresh,
+                            args=(key, entry, fetch, ttl, invalidated_by), daemon=True).start()
+                    return entry.value
+
+            self.stats['misses'] += 1
+
+        value = fetch()
+        self.put(key, value, ttl, invalidated_by)
+        return value
+
+    def contains(self, key):
+        '''
+        Returns True if there is a result for the key, fresh or not
+        '''
+        with self.lock:
+            return key in self.entries
+
+    def put(self, key, value, ttl, invalidated_by=()):
+        with self.lock:
+            self.entries[key] = CacheEntry(value, self.clock(), ttl, tuple(invalidated_by))
+
+    def refresh(self, key, entry, fetch, ttl, invalidated_by):
+        '''
+        Fetches a new result in place of the (stale) entry
+        '''
+        try:
+            value = fetch()
+        except Exception as e:
+            # keep the stale result, the next get() tries again
+            print(e)
+            with self.lock:
+                entry.refreshing = False
+            return
+
+        with self.lock:
+            # Dropped (invalidated) while refreshing, maybe replaced by a
+            # result fetched since: this one may be out of date already
+            if self.entries.get(key) is not entry:
+                return
+            self.entries[key] = CacheEntry(value, self.clock(), ttl, tuple(invalidated_by))
+            self.stats['refreshes'] += 1
+
+        for listener in self.listeners:
+            listener(key)
+
+    def invalidate(self, event):
+        '''
+        Drops the results invalidated by the event
+        '''
+        with self.lock:
+            keys = [key for key, entry in self.entries.items() if event in entry.invalidated_by]
+            for key in keys:
+                del self.entries[key]
+            self.stats['invalidated'] += len(keys)
+
+    def clear(self, name=None):
+        '''
+        Drops the results of the provider (see cached()), or all of them
+        '''
+        with self.lock:
+            if name is None:
+                self.entries.clear()
+                return
+
+            for key in [key for key in self.entries if key[0] == name]:
+                del self.entries[key]
+
+def cached(ttl, invalidated_by=()):
+    '''
+    Decorator caching the results of a data provider method for `ttl`
+    secs, by arguments, in the ResultCache of its object (`self.cache`)
+    '''
+    def decorator(method):
+        name = method.__qualname__
+
+        @functools.wraps(method)
+        def provider(self, *args):
+            return self.cache.get((name,) + args, lambda: method(self, *args),
+                ttl, invalidated_by)
+
+        provider.cache_name = name
+        return provider
+    return decorator
+
+def is_cached(provider, *args):
+    '''
+    Returns True if the (bound) provider method has a result for the
+    arguments, i.e. calling it will not run its commands
+    '''
+    return provider.__self__.cache.contains((provider.cache_name,) + args)
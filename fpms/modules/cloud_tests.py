@@ -1,8 +1,36 @@
-import subprocess
 import socket
 
+from fpms.modules import commands
 from fpms.modules.pages.alert import *
 from fpms.modules.pages.simpletable import *
+from fpms.modules.constants import (
+    CLOUD_TEST_TIMEOUT,
+    ETHTOOL_FILE,
+)
+
+def link_detected(interface):
+    '''
+    Returns the "Link detected" value ethtool reports for the interface
+    ("yes" or "no"), "" if it cannot be read
+    '''
+    lines = commands.grep(commands.run([ETHTOOL_FILE, interface]).lines(), "Link detected")
+    return commands.field(lines[0], 3) if lines else ""
+
+def ipv4_addresses(interface):
+    '''
+    Returns the IPv4 addresses of the interface, one per line
+    '''
+    lines = commands.grep(commands.run(["ip", "address", "show", interface]).lines(), "inet ")
+    return "\n".join(commands.field(commands.field(line, 2), 1, "/") for line in lines)
+
+def http_code(url, follow=False):
+    '''
+    Returns the HTTP status code of a request to the URL (certificate not
+    checked), "000" or "" if no response came within CLOUD_TEST_TIMEOUT
+    '''
+    argv = ["curl", "-k", "-s"] + (["-L"] if follow else []) + [
+        "--max-time", CLOUD_TEST_TIMEOUT, "-o", "/dev/null", "-w", "%{http_code}", url]
+    return commands.run(argv, timeout=CLOUD_TEST_TIMEOUT).stdout
 
 
 class CloudUtils(object):
@@ -39,8 +67,7 @@ class CloudUtils(object):
             self.alert_obj.display_popup_alert(g_vars, "Running...")
 
             # Is eth0 up?
-            cmd = "/sbin/ethtool eth0 | grep 'Link detected'| awk '{print $3}'"
-            result = subprocess.check_output(cmd, shell=True).decode().strip()
+            result = link_detected("eth0")
 
             if result == "yes":
                 item_list[0] = "Eth0 Port Up: YES"
@@ -54,8 +81,7 @@ class CloudUtils(object):
             # we're done if test failed
             if not test_fail:
                 # Have we got an IP address?
-                cmd = "ip address show eth0 | grep 'inet ' | awk '{print $2}' | awk -F'/' '{print $1}'"
-                result = subprocess.check_output(cmd, shell=True).decode().strip()
+                result = ipv4_addresses("eth0")
 
                 if result:
                     item_list[1] = "MyIP: {}".format(result)
@@ -75,8 +101,7 @@ class CloudUtils(object):
 
             if not test_fail:
                 # Can we get an http 403 from devices.srv.wifi.arista.com ?
-                cmd = 'curl -k -s -o /dev/null -w "%{http_code}" https://devices.srv.wifi.arista.com'
-                result = subprocess.check_output(cmd, shell=True).decode()
+                result = http_code("https://devices.srv.wifi.arista.com")
 
                 if result == "403":
                     item_list[3] = "CV-CUE HTTPS: OK"
@@ -125,8 +150,7 @@ class CloudUtils(object):
             self.alert_obj.display_popup_alert(g_vars, "Running...")
 
             # Is eth0 up?
-            cmd = "/sbin/ethtool eth0 | grep 'Link detected'| awk '{print $3}'"
-            result = subprocess.check_output(cmd, shell=True).decode().strip()
+            result = link_detected("eth0")
 
             if result == "yes":
                 item_list[0] = "Eth0 Port Up: YES"
@@ -140,8 +164,7 @@ class CloudUtils(object):
             # we're done if test failed
             if not test_fail:
                 # Have we got an IP address?
-                cmd = "ip address show eth0 | grep 'inet ' | awk '{print $2}' | awk -F'/' '{print $1}'"
-                result = subprocess.check_output(cmd, shell=True).decode().strip()
+                result = ipv4_addresses("eth0")
 
                 if result:
                     item_list[1] = "MyIP: {}".format(result)
@@ -189,14 +212,7 @@ class CloudUtils(object):
 
             if not test_fail:
                 # Can we get an ICMP response from https://pqm.arubanetworks.com?
-                cmd = ["ping", "-c", "2", "-W", "2", "pqm.arubanetworks.com"]
-                result = subprocess.run(
-                    cmd,
-                    shell=False,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                )
-                if result.returncode == 0:
+                if commands.succeeds(["ping", "-c", "2", "-W", "2", "pqm.arubanetworks.com"], timeout=CLOUD_TEST_TIMEOUT):
                     item_list[6] = "ICMP (PQM): OK"
                 else:
                     item_list[6] = "ICMP (PQM): FAIL"
@@ -259,11 +275,7 @@ class CloudUtils(object):
                 return False
 
         def test_ping(host, timeout=2):
-            try:
-                subprocess.check_call(f"ping -c1 -W{timeout} -4 -q {host}", shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                return True
-            except subprocess.CalledProcessError:
-                return False
+            return commands.succeeds(["ping", "-c1", f"-W{timeout}", "-4", "-q", host], timeout=CLOUD_TEST_TIMEOUT)
 
         def test_ntp(server: str, port: int = 123, timeout: int = 2) -> bool:
             try:
@@ -288,24 +300,13 @@ class CloudUtils(object):
                 client.close()
 
         def test_dns(hostname):
-            try:
-                # Dig with timeout is faster to fail and more flexible than native Python
-                result = subprocess.run(
-                    ["dig", "+short", "+tries=1", hostname],
-                    capture_output=True,
-                    text=True,
-                    timeout=2
-                )
-                if result.returncode == 0:
-                    return True
-                else:
-                    print(f"Failed to resolve hostname {hostname}.")
-                    return False
-            except subprocess.TimeoutExpired:
-                return False
-            except Exception as e:
-                print(f"DNS test error occurred: {e}")
-                return False
+            # Dig with timeout is faster to fail and more flexible than native Python
+            result = commands.run(["dig", "+short", "+tries=1", hostname], timeout=2)
+            if result.ok:
+                return True
+            if result.returncode is not None:
+                print(f"Failed to resolve hostname {hostname}.")
+            return False
 
         # Ignore any more key presses as this could cause us issues
         g_vars["disable_keys"] = True
@@ -322,8 +323,7 @@ class CloudUtils(object):
             self.alert_obj.display_popup_alert(g_vars, "Running...")
 
             # Is eth0 up?
-            cmd = "/sbin/ethtool eth0 | awk '/Link detected/ {print $3}'"
-            result = subprocess.check_output(cmd, shell=True).decode().strip()
+            result = link_detected("eth0")
 
             if result == "yes":
                 item_list[0] = "Eth0 Port Up: YES"
@@ -337,8 +337,7 @@ class CloudUtils(object):
             # We're done if test failed
             if not test_fail:
                 # Have we got an IP address?
-                cmd = "ip address show eth0 | awk '/inet / {print $2}' | awk -F'/' '{print $1}'"
-                result = subprocess.check_output(cmd, shell=True).decode().strip()
+                result = ipv4_addresses("eth0")
 
                 if result:
                     item_list[1] = "My IP: {}".format(result)
@@ -409,8 +408,7 @@ class CloudUtils(object):
             self.alert_obj.display_popup_alert(g_vars, "Running...")
 
             # Is eth0 up?
-            cmd = "/sbin/ethtool eth0 | grep 'Link detected'| awk '{print $3}'"
-            result = subprocess.check_output(cmd, shell=True).decode().strip()
+            result = link_detected("eth0")
 
             if result == "yes":
                 item_list[0] = "Eth0 Port Up: YES"
@@ -424,8 +422,7 @@ class CloudUtils(object):
             # we're done if test failed
             if not test_fail:
                 # Have we got an IP address?
-                cmd = "ip address show eth0 | grep 'inet ' | awk '{print $2}' | awk -F'/' '{print $1}'"
-                result = subprocess.check_output(cmd, shell=True).decode().strip()
+                result = ipv4_addresses("eth0")
 
                 if result:
                     item_list[1] = "MyIP: {}".format(result)
@@ -444,8 +441,7 @@ class CloudUtils(object):
 
             if not test_fail:
                 # Can we get an http 200 from https://ep-terminator.mistsys.net/test ?
-                cmd = 'curl -k -s -o /dev/null -w "%{http_code}" https://ep-terminator.mistsys.net/test'
-                result = subprocess.check_output(cmd, shell=True).decode()
+                result = http_code("https://ep-terminator.mistsys.net/test")
 
                 if result == "200":
                     item_list[3] = "HTTP: OK"
@@ -490,8 +486,7 @@ class CloudUtils(object):
             self.alert_obj.display_popup_alert(g_vars, "Running...")
 
             # Is eth0 up?
-            cmd = "/sbin/ethtool eth0 | grep 'Link detected'| awk '{print $3}'"
-            result = subprocess.check_output(cmd, shell=True).decode().strip()
+            result = link_detected("eth0")
 
             if result == "yes":
                 item_list[0] = "Eth0 Port Up: YES"
@@ -505,8 +500,7 @@ class CloudUtils(object):
             # we're done if test failed
             if not test_fail:
                 # Have we got an IP address?
-                cmd = "ip address show eth0 | grep 'inet ' | awk '{print $2}' | awk -F'/' '{print $1}'"
-                result = subprocess.check_output(cmd, shell=True).decode().strip()
+                result = ipv4_addresses("eth0")
 
                 if result:
                     item_list[1] = "MyIP: {}".format(result)
@@ -525,10 +519,7 @@ class CloudUtils(object):
 
             if not test_fail:
                 # Can we get an http 200 from https://ruckus.cloud ?
-                cmd = (
-                    'curl -k -s -L -o /dev/null -w "%{http_code}" https://ruckus.cloud'
-                )
-                result = subprocess.check_output(cmd, shell=True).decode()
+                result = http_code("https://ruckus.cloud", follow=True)
 
                 if result == "200":
                     item_list[3] = "HTTP: OK"
@@ -575,8 +566,7 @@ class CloudUtils(object):
             self.alert_obj.display_popup_alert(g_vars, "Running...")
 
             # Is eth0 up?
-            cmd = "/sbin/ethtool eth0 | grep 'Link detected'| awk '{print $3}'"
-            result = subprocess.check_output(cmd, shell=True).decode().strip()
+            result = link_detected("eth0")
 
             if result == "yes":
                 item_list[0] = "Eth0 Port Up: YES"
@@ -590,8 +580,7 @@ class CloudUtils(object):
             # we're done if test failed
             if not test_fail:
                 # Have we got an IP address?
-                cmd = "ip address show eth0 | grep 'inet ' | awk '{print $2}' | awk -F'/' '{print $1}'"
-                result = subprocess.check_output(cmd, shell=True).decode().strip()
+                result = ipv4_addresses("eth0")
 
                 if result:
                     item_list[1] = "MyIP: {}".format(result)
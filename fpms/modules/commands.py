@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+commands.py - runs external commands without a shell
+
+The pages used to run shell pipelines (`iw dev | grep | awk`) for each
+datum they show: a /bin/sh plus a process per stage, with no timeout, so
+a hung tool froze the front panel. The commands here are run from an
+argv list, with a timeout and a cap on the output captured, and the
+filtering is done in Python on the lines returned.
+"""
+
+import os
+import re
+import selectors
+import signal
+import subprocess
+import threading
+import time
+
+# Secs before a command is killed
+COMMAND_TIMEOUT = 5
+
+# Bytes of a command's output kept (the rest is read and discarded)
+COMMAND_OUTPUT_MAX = 65536
+
+class CommandError(subprocess.CalledProcessError):
+    '''
+    A command failed: it exited with a non-zero status, could not be run
+    (returncode 127) or timed out (returncode None). A CalledProcessError,
+    as caught by the pages.
+    '''
+
+    def __init__(self, returncode, cmd, output="", timed_out=False):
+        super().__init__(returncode, cmd, output.encode())
+        self.timed_out = timed_out
+
+    def __str__(self):
+        if self.timed_out:
+            return "Command '{}' timed out".format(" ".join(self.cmd))
+        return super().__str__()
+
+class CommandResult(object):
+    '''
+    Outcome of a command: exit status (None if it timed out), standard
+    output (decoded, capped to the maximum captured), whether the output
+    was truncated and how long the command took (secs)
+    '''
+
+    def __init__(self, argv, returncode, stdout, truncated, elapsed):
+        self.argv = argv
+        self.returncode = returncode
+        self.stdout = stdout
+        self.truncated = truncated
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+    def lines(self):
+        return self.stdout.splitlines()
+
+    def __repr__(self):
+        return "CommandResult({!r}, returncode={}, elapsed={:.3f})".format(
+            self.argv, self.returncode, self.elapsed)
+
+# Time spent by command, keyed by executable name:
+# {'calls', 'failures', 'timeouts', 'time', 'max_time'}
+stats = {}
+stats_lock = threading.Lock()
+
+def record(result):
+    name = os.path.basename(result.argv[0])
+
+    with stats_lock:
+        entry = stats.setdefault(name, {
+            'calls': 0, 'failures': 0, 'timeouts': 0, 'time': 0.0, 'max_time': 0.0})
+        entry['calls'] += 1
+        entry['time'] += result.elapsed
+        entry['max_time'] = max(entry['max_time'], result.elapsed)
+        if result.returncode is None:
+            entry['timeouts'] += 1
+        elif result.returncode != 0:
+            entry['failures'] += 1
+
+def kill(process):
+    '''
+    Kills the command and the processes it started (its process group):
+    killing only the command would leave e.g. the children of a script
+    running, holding its output open
+    '''
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+def run(argv, timeout=COMMAND_TIMEOUT, max_output=COMMAND_OUTPUT_MAX, stderr=False):
+    '''
+    Runs the command and returns its CommandResult. The command is killed
+    if it runs for longer than the timeout (secs); output beyond
+    max_output bytes is read but not kept. Standard error is discarded,
+    unless `stderr` is set to capture it with the output (as `2>&1`).
+
+    A timeout of None waits for the command however long it runs. The
+    command is started in a session of its own, so that the processes it
+    starts are killed with it.
+    '''
+    argv = [str(arg) for arg in argv]
+    start = time.monotonic()
+
+    try:
+        process = subprocess.Popen(argv,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT if stderr else subprocess.DEVNULL,
+            start_new_session=True)
+    except OSError:
+        result = CommandResult(argv, 127, "", False, time.monotonic() - start)
+        record(result)
+        return result
+
+    chunks = []
+    size = 0
+    truncated = False
+    timed_out = False
+    deadline = None if timeout is None else start + timeout
+
+    with process, selectors.DefaultSelector() as selector:
+        selector.register(process.stdout, selectors.EVENT_READ)
+
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if (remaining is not None and remaining <= 0) or not selector.select(remaining):
+                timed_out = True
+                kill(process)
+                break
+
+            chunk = os.read(process.stdout.fileno(), 65536)
+            if not chunk:
+                break
+
+            if size < max_output:
+                chunks.append(chunk[:max_output - size])
+            else:
+                truncated = True
+            size += len(chunk)
+            truncated = truncated or size > max_output
+
+        try:
+            returncode = process.wait(None if deadline is None else max(0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            # closed its output but did not exit
+            timed_out = True
+            kill(process)
+            process.wait()
+
+    stdout = b"".join(chunks).decode(errors="replace")
+    result = CommandResult(argv, None if timed_out else returncode, stdout,
+        truncated, time.monotonic() - start)
+    record(result)
+    return result
+
+def output(argv, **kwargs):
+    '''
+    Runs the command and returns its output, stripped. Raises CommandError
+    if it fails or times out.
+    '''
+    result = run(argv, **kwargs)
+    if not result.ok:
+        raise CommandError(result.returncode, result.argv, result.stdout,
+            timed_out=result.returncode is None)
+    return result.stdout.strip()
+
+def succeeds(argv, **kwargs):
+    '''
+    Returns True if the command runs and exits with status 0
+    '''
+    return run(argv, **kwargs).ok
+
+def grep(lines, pattern, ignore_case=False):
+    '''
+    Returns the lines matching the regular expression (grep [-i] -E)
+    '''
+    regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    return [line for line in lines if regex.search(line)]
+
+def field(line, index, separator=None):
+    '''
+    Returns a field of the line (awk '{ print $n }', 1-based), or "" if it
+    has fewer fields
+    '''
+    fields = line.split(separator)
+    if 0 < index <= len(fields):
+        return fields[index - 1]
+    return ""
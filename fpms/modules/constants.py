@@ -4,10 +4,11 @@
 constants.py - shared constant vars
 """
 
-from PIL import ImageFont
 import os
 import pathlib
 from fpms.modules.env_utils import EnvUtils
+from fpms.modules.scaling import load_font
+from fpms.modules.text import CachedFont
 from fpms.modules.platform import *
 from fpms.modules.display import *
 
@@ -20,10 +21,13 @@ WLANPI_MODEL_FILE = '/etc/wlanpi-model'
 # Version file for WLAN Pi image
 WLANPI_IMAGE_FILE = '/etc/wlanpi-release'
 
+# FPMS settings (display orientation and type)
+FPMS_CONF_FILE = "/etc/wlanpi-fpms.conf"
+
 env_util = EnvUtils()
 PLATFORM = env_util.get_platform(WLANPI_MODEL_FILE)
-DISPLAY_TYPE = env_util.get_display_type(PLATFORM)
-# Uncomment the line below to force a display type
+DISPLAY_TYPE = env_util.get_display_type(PLATFORM, FPMS_CONF_FILE)
+# Uncomment the line below to force a display type (or set FPMS_DISPLAY)
 #DISPLAY_TYPE = DISPLAY_TYPE_ST7789
 
 DISPLAY_ORIENTATION_NORMAL  = "normal"
@@ -35,8 +39,21 @@ MAX_PAGE_LINES = 8
 DISPLAY_MODE = 'RGB'
 
 PAGE_SLEEP = 300 # Time in secs before sleep, Set to -1 to disable sleep, default 300
-PAGE_WIDTH = 128 # Pixel size of screen width
-PAGE_HEIGHT = 128 # Pixel size of screen height
+HOUSEKEEPING_INTERVAL = 2 # Secs between Ethernet link checks (and screen sleep countdown ticks)
+REACHABILITY_INTERVAL = 30 # Secs between reachability tests (sooner if an IP address changes)
+REACHABILITY_BACKOFF_MAX = 300 # Longest wait between reachability tests while the Internet cannot be reached
+REACHABILITY_TIMEOUT = 3 # Secs before a reachability probe gives up
+REACHABILITY_TCP_TARGETS = [("www.google.com", 443), ("8.8.8.8", 53)] # Connected to by the reachability probes
+REACHABILITY_HTTP_HOST = "www.google.com" # Sent a HEAD request by the reachability probes
+PAGE_WIDTH = 128 # Logical pixel size of screen width, pages are laid out on this grid
+PAGE_HEIGHT = 128 # Logical pixel size of screen height
+
+# Native resolution of the panel, pages are rendered directly at this size
+DISPLAY_WIDTH, DISPLAY_HEIGHT = DISPLAY_SIZES.get(DISPLAY_TYPE, (PAGE_WIDTH, PAGE_HEIGHT))
+if DISPLAY_TYPE == DISPLAY_TYPE_HEADLESS and os.environ.get("FPMS_HEADLESS_SIZE"):
+    # e.g. FPMS_HEADLESS_SIZE=240x240 to render like the ST7789
+    DISPLAY_WIDTH, DISPLAY_HEIGHT = map(int, os.environ["FPMS_HEADLESS_SIZE"].split("x"))
+DISPLAY_SCALE = DISPLAY_WIDTH / PAGE_WIDTH # Native pixels per logical pixel
 NAV_BAR_TOP = PAGE_HEIGHT - 10 # Top pixel number of nav bar
 STATUS_BAR_HEIGHT = 16
 SYSTEM_BAR_HEIGHT = 15
@@ -49,20 +66,21 @@ SCRIPT_PATH = str(pathlib.Path(__file__).parent.parent.absolute())
 # change in to script path dir
 os.chdir(SCRIPT_PATH)
 
-# Define display fonts
-TINY_FONT = ImageFont.truetype('fonts/DejaVuSansMono.ttf', 7)
-SMART_FONT = ImageFont.truetype('fonts/DejaVuSansMono-Bold.ttf', 10)
-FONT10 = ImageFont.truetype('fonts/DejaVuSansMono.ttf', 10)
-FONT11 = ImageFont.truetype('fonts/DejaVuSansMono.ttf', 11)
-FONT12 = ImageFont.truetype('fonts/DejaVuSansMono.ttf', 12)
-FONT13 = ImageFont.truetype('fonts/DejaVuSansMono.ttf', 13)
-FONT14 = ImageFont.truetype('fonts/DejaVuSansMono.ttf', 14)
-FONTB10 =  ImageFont.truetype('fonts/DejaVuSansMono-Bold.ttf', 10)
-FONTB11 =  ImageFont.truetype('fonts/DejaVuSansMono-Bold.ttf', 11)
-FONTB12 =  ImageFont.truetype('fonts/DejaVuSansMono-Bold.ttf', 12)
-FONTB13 =  ImageFont.truetype('fonts/DejaVuSansMono-Bold.ttf', 13)
-FONTB14 =  ImageFont.truetype('fonts/DejaVuSansMono-Bold.ttf', 14)
-ICONS = ImageFont.truetype('fonts/ionicons.ttf', 13)
+# Define display fonts, measurements and rendered text are cached
+TINY_FONT = CachedFont(load_font('fonts/DejaVuSansMono.ttf', 7, DISPLAY_SCALE))
+SMART_FONT = CachedFont(load_font('fonts/DejaVuSansMono-Bold.ttf', 10, DISPLAY_SCALE))
+FONT10 = CachedFont(load_font('fonts/DejaVuSansMono.ttf', 10, DISPLAY_SCALE))
+FONT11 = CachedFont(load_font('fonts/DejaVuSansMono.ttf', 11, DISPLAY_SCALE))
+FONT12 = CachedFont(load_font('fonts/DejaVuSansMono.ttf', 12, DISPLAY_SCALE))
+FONT13 = CachedFont(load_font('fonts/DejaVuSansMono.ttf', 13, DISPLAY_SCALE))
+FONT14 = CachedFont(load_font('fonts/DejaVuSansMono.ttf', 14, DISPLAY_SCALE))
+FONTB10 =  CachedFont(load_font('fonts/DejaVuSansMono-Bold.ttf', 10, DISPLAY_SCALE))
+FONTB11 =  CachedFont(load_font('fonts/DejaVuSansMono-Bold.ttf', 11, DISPLAY_SCALE))
+FONTB12 =  CachedFont(load_font('fonts/DejaVuSansMono-Bold.ttf', 12, DISPLAY_SCALE))
+FONTB13 =  CachedFont(load_font('fonts/DejaVuSansMono-Bold.ttf', 13, DISPLAY_SCALE))
+FONTB14 =  CachedFont(load_font('fonts/DejaVuSansMono-Bold.ttf', 14, DISPLAY_SCALE))
+FONTB18 =  CachedFont(load_font('fonts/DejaVuSansMono-Bold.ttf', 18, DISPLAY_SCALE))
+ICONS = CachedFont(load_font('fonts/ionicons.ttf', 13, DISPLAY_SCALE))
 
 #######################################
 # File name constants
@@ -91,10 +109,18 @@ TIME_ZONE_FILE= '/usr/bin/wlanpi-timezone'
 # Networkinfo data file names
 LLDPNEIGH_FILE = '/tmp/lldpneigh.txt'
 CDPNEIGH_FILE = '/tmp/cdpneigh.txt'
-IPCONFIG_FILE = '/opt/wlanpi-common/networkinfo/ipconfig.sh 2>/dev/null'
+IPCONFIG_FILE = '/opt/wlanpi-common/networkinfo/ipconfig.sh'
 REACHABILITY_FILE = '/opt/wlanpi-common/networkinfo/reachability.sh'
+REACHABILITY_SCRIPT_TIMEOUT = 60 # Secs before the reachability report gives up
+SPEEDTEST_TIMEOUT = 120 # Secs before the speedtest gives up
 PUBLICIP_CMD = '/opt/wlanpi-common/networkinfo/publicip.sh'
 PUBLICIP6_CMD = '/opt/wlanpi-common/networkinfo/publicip6.sh'
+PUBLICIP_TTL = 300 # Secs the public IP details are cached for
+PUBLICIP_TIMEOUT = 20 # Secs before the public IP lookup gives up
+CLOUD_TEST_TIMEOUT = 10 # Secs before a cloud test probe (curl, ping) gives up
+WLAN_INTERFACES_TTL = 10 # Secs the WLAN interface details are cached for
+UPDATES_TTL = 3600 # Secs the list of available updates is cached for
+UPDATES_CHECK_TIMEOUT = 120 # Secs before checking for updates gives up
 BLINKER_FILE = '/opt/wlanpi-common/networkinfo/portblinker.sh'
 
 # Battery status file
@@ -133,6 +159,18 @@ BUTTONS_SAPPHIRE = {
     "center": 17
 }
 
+# Button to use in place of each button when the display is flipped
+BUTTONS_FLIPPED = {
+    "up": "down",
+    "down": "up",
+    "left": "right",
+    "right": "left",
+    "center": "center",
+    "key1": "key3",
+    "key2": "key2",
+    "key3": "key1"
+}
+
 BUTTONS_PINS = {}
 
 if PLATFORM == PLATFORM_PRO:
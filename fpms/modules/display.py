@@ -7,3 +7,12 @@ display.py - display types
 DISPLAY_TYPE_SSD1351 = "ssd1351"
 DISPLAY_TYPE_ST7735 = "st7735"
 DISPLAY_TYPE_ST7789 = "st7789"
+DISPLAY_TYPE_HEADLESS = "headless"
+
+# Native resolution (width, height) of each display type
+DISPLAY_SIZES = {
+    DISPLAY_TYPE_SSD1351: (128, 128),
+    DISPLAY_TYPE_ST7735: (128, 128),
+    DISPLAY_TYPE_ST7789: (240, 240),
+    DISPLAY_TYPE_HEADLESS: (128, 128),
+}
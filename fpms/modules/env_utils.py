@@ -5,6 +5,7 @@
     longer term
 """
 
+import configparser
 import subprocess
 import re
 import sys
@@ -13,6 +14,7 @@ import hashlib
 import qrcode
 
 from PIL import Image
+from fpms.modules import commands
 from fpms.modules.platform import *
 from fpms.modules.display import *
 
@@ -37,15 +39,23 @@ class EnvUtils(object):
 
         platform = PLATFORM_UNKNOWN
 
+        # Allow forcing the platform, e.g. to run on a plain Linux box
+        if os.environ.get("FPMS_PLATFORM"):
+            return os.environ["FPMS_PLATFORM"]
+
+        # No hardware to identify when running headless
+        if os.environ.get("FPMS_DISPLAY") == DISPLAY_TYPE_HEADLESS:
+            return platform
+
         if os.path.isfile(WLANPI_MODEL_FILE):
             with open(WLANPI_MODEL_FILE, 'r') as f:
                 platform = f.readline().strip()
 
         if platform == PLATFORM_UNKNOWN:
             # get output of wlanpi-model
-            model_cmd = "wlanpi-model | grep \"Model:\" | cut -d \":\" -f2 | xargs"
             try:
-                platform = subprocess.check_output(model_cmd, shell=True).decode().strip()
+                model = commands.grep(commands.output(["wlanpi-model"]).splitlines(), "Model:")
+                platform = " ".join(commands.field(model[0], 2, ":").split()) if model else ""
             except subprocess.CalledProcessError as exc:
                 return PLATFORM_UNKNOWN
 
@@ -55,7 +65,21 @@ class EnvUtils(object):
         return platform
 
 
-    def get_display_type(self, platform):
+    def get_display_type(self, platform, conf_file=None):
+         '''
+         Returns the display type: from the FPMS_DISPLAY environment
+         variable, the "type" option of the [display] section of the config
+         file, or else the platform's display
+         '''
+         display_type = os.environ.get("FPMS_DISPLAY")
+         if display_type:
+             return display_type
+
+         if conf_file:
+             config = configparser.ConfigParser()
+             config.read(conf_file)
+             if config.has_option("display", "type"):
+                 return config.get("display", "type")
 
          if platform == PLATFORM_PRO:
              return DISPLAY_TYPE_SSD1351
@@ -106,11 +130,11 @@ class EnvUtils(object):
     def get_hostname(self):
 
         try:
-            hostname = subprocess.check_output('/usr/bin/hostname', shell=True).decode().strip()
+            hostname = commands.output(["/usr/bin/hostname"])
             if not "." in hostname:
                 domain = "local"
                 try:
-                    output = subprocess.check_output('/usr/bin/hostname -d', shell=True).decode().strip()
+                    output = commands.output(["/usr/bin/hostname", "-d"])
                     if len(output) != 0:
                         domain = output
                 except:
@@ -123,14 +147,22 @@ class EnvUtils(object):
         return None
 
 
+    def get_hostapd_credentials(self, conf_file="/etc/hostapd/hostapd.conf"):
+        '''
+        Returns the SSID and passphrase set in the Hostapd config
+        '''
+        with open(conf_file) as f:
+            settings = commands.grep(f.read().splitlines(), "^ssid|^wpa_passphrase")
+        ssid, passphrase = [commands.field(line, 2, "=") for line in settings]
+        return ssid, passphrase
+
+
     def get_wifi_qrcode_for_hostapd(self):
         '''
         Generates and returns the path to a WiFi QR code for the current Hostapd config.
         '''
-        cmd = "grep -E '^ssid|^wpa_passphrase' /etc/hostapd/hostapd.conf | cut -d '=' -f2"
-
         try:
-            ssid, passphrase = subprocess.check_output(cmd, shell=True, stderr=subprocess.DEVNULL).decode().strip().split("\n")
+            ssid, passphrase = self.get_hostapd_credentials()
             return self.get_wifi_qrcode(ssid, passphrase)
 
         except Exception as e:
@@ -2,9 +2,11 @@ import time
 import os.path
 import subprocess
 import fpms.modules.wlanpi_oled as oled
+from fpms.modules import commands
 
 from fpms.modules.pages.alert import Alert
 from fpms.modules.pages.simpletable import SimpleTable
+from fpms.modules.cache import INVALIDATE_MODE, ResultCache
 from fpms.modules.constants import (
     HOTSPOT_SWITCHER_FILE,
     WIPERF_SWITCHER_FILE,
@@ -14,7 +16,10 @@ from fpms.modules.constants import (
 
 class Mode(object):
 
-    def __init__(self, g_vars):
+    def __init__(self, g_vars, services=None):
+
+        # results of the commands run for the pages, some depend on the mode
+        self.cache = services.get(ResultCache) if services else ResultCache()
 
         # create simple table
         self.simple_table_obj = SimpleTable(g_vars)
@@ -50,6 +55,7 @@ class Mode(object):
             return False
 
         # Flip the mode
+        self.cache.invalidate(INVALIDATE_MODE)
         self.alert_obj.display_popup_alert(g_vars, alert_msg, delay=2)
         g_vars['shutdown_in_progress'] = True
         time.sleep(2)
@@ -57,7 +63,7 @@ class Mode(object):
         oled.drawImage(g_vars['reboot_image'])
 
         try:
-            alert_msg = subprocess.check_output("{} {}".format(resource_switcher_file, switch), shell=True).decode()  # reboots
+            alert_msg = commands.output([resource_switcher_file, switch], timeout=None)  # reboots (not killed half way through the switch)
             time.sleep(1)
         except subprocess.CalledProcessError as exc:
             print(exc)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from collections import deque
+
+# Presses waiting for the UI thread, beyond which the oldest are dropped
+BUTTON_QUEUE_SIZE = 16
+
+# Buttons whose consecutive presses are merged into one event with a
+# count (menu and table navigation), and auto-repeated while held
+COALESCED_BUTTONS = ['up', 'down']
+
+# Auto-repeat of a held button: first repeat after REPEAT_DELAY secs, then
+# every REPEAT_INTERVAL secs, the interval shrinking by REPEAT_ACCELERATION
+# on every repeat down to REPEAT_MIN_INTERVAL
+REPEAT_DELAY = 0.5
+REPEAT_INTERVAL = 0.2
+REPEAT_ACCELERATION = 0.85
+REPEAT_MIN_INTERVAL = 0.03
+
+NS_PER_SEC = 1000000000
+
+class ButtonEvent(object):
+    '''
+    A button press (or several coalesced ones) waiting to be handled.
+    Timestamps are CLOCK_MONOTONIC nanoseconds, the clock gpiod stamps
+    edge events with.
+    '''
+
+    def __init__(self, button, timestamp_ns, count=1):
+        self.button = button
+        self.timestamp_ns = timestamp_ns
+        self.count = count
+
+    def __repr__(self):
+        return "ButtonEvent({!r}, {}, count={})".format(self.button, self.timestamp_ns, self.count)
+
+class ButtonQueue(object):
+    '''
+    Bounded queue of button presses, filled by the input threads (gpiod
+    monitor, keyboard emulator) and drained by the UI thread.
+
+    Navigation presses arriving while the UI is busy (e.g. rendering a
+    slow page) coalesce into the waiting event, which then carries the
+    number of steps to move. `on_ready` is called when the queue stops
+    being empty, to wake the UI thread.
+    '''
+
+    def __init__(self, maxsize=BUTTON_QUEUE_SIZE, on_ready=None):
+        self.events = deque()
+        self.maxsize = maxsize
+        self.on_ready = on_ready
+        self.lock = threading.Lock()
+
+        self.stats = {
+            'pressed': 0,
+            'coalesced': 0,
+            'dropped': 0,
+            'max_wait': 0.0,
+        }
+
+    def __len__(self):
+        return len(self.events)
+
+    def push(self, button, timestamp_ns=None):
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+
+        with self.lock:
+            self.stats['pressed'] += 1
+
+            if self.events and self.events[-1].button == button and button in COALESCED_BUTTONS:
+                self.events[-1].count += 1
+                self.stats['coalesced'] += 1
+                return
+
+            if len(self.events) >= self.maxsize:
+                self.events.popleft()
+                self.stats['dropped'] += 1
+
+            was_empty = not self.events
+            self.events.append(ButtonEvent(button, timestamp_ns))
+
+        if was_empty and self.on_ready:
+            self.on_ready()
+
+    def drain(self):
+        '''
+        Returns the events waiting, oldest first, and empties the queue
+        '''
+        now = time.monotonic_ns()
+
+        with self.lock:
+            events = list(self.events)
+            self.events.clear()
+
+            for event in events:
+                wait = (now - event.timestamp_ns) / NS_PER_SEC
+                self.stats['max_wait'] = max(self.stats['max_wait'], wait)
+
+        return events
+
+class KeyRepeater(object):
+    '''
+    Generates the auto-repeat presses of held navigation buttons, with
+    acceleration so that long lists scroll quickly. Press and release
+    times are the edge event timestamps; the repeats are scheduled from
+    them on the same clock.
+    '''
+
+    def __init__(self, delay=REPEAT_DELAY, interval=REPEAT_INTERVAL,
+        acceleration=REPEAT_ACCELERATION, min_interval=REPEAT_MIN_INTERVAL):
+        self.delay = int(delay * NS_PER_SEC)
+        self.interval = int(interval * NS_PER_SEC)
+        self.acceleration = acceleration
+        self.min_interval = int(min_interval * NS_PER_SEC)
+
+        # Held button -> [next repeat, interval after it] (ns)
+        self.held = {}
+
+    def press(self, button, timestamp_ns):
+        if button in COALESCED_BUTTONS:
+            self.held[button] = [timestamp_ns + self.delay, self.interval]
+
+    def release(self, button, timestamp_ns=None):
+        self.held.pop(button, None)
+
+    def due(self, now_ns):
+        '''
+        Returns the (button, timestamp_ns) repeats due by now
+        '''
+        repeats = []
+        for button, repeat in self.held.items():
+            while repeat[0] <= now_ns:
+                repeats.append((button, repeat[0]))
+                repeat[0] += repeat[1]
+                repeat[1] = max(self.min_interval, int(repeat[1] * self.acceleration))
+
+        repeats.sort(key=lambda item: item[1])
+        return repeats
+
+    def timeout(self, now_ns):
+        '''
+        Returns the secs until the next repeat, or None if no button is held
+        '''
+        if not self.held:
+            return None
+
+        next_repeat = min(repeat[0] for repeat in self.held.values())
+        return max(0, next_repeat - now_ns) / NS_PER_SEC
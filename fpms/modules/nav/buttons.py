@@ -1,15 +1,20 @@
 import types
 
+from fpms.modules.nav.menu import MenuTree
 from fpms.modules.pages.homepage import *
 from fpms.modules.pages.page import *
 from fpms.modules.pages.simpletable import *
+from fpms.modules.services import Services
 
 class Button(object):
 
-    def __init__(self, g_vars, menu):
+    def __init__(self, g_vars, menu, services=None):
 
-        self.homepage_obj = HomePage(g_vars)
-        self.page_obj = Page(g_vars)
+        if services is None:
+            services = Services(g_vars)
+
+        self.homepage_obj = services.get(HomePage)
+        self.page_obj = services.get(Page)
 
 
     #######################################
@@ -22,47 +27,15 @@ class Button(object):
             return False
 
 
-    def _bottom_of_list(self, current_location, menu):
-
-        # pull apart current menu location (e.g. [0, 1, 1])
-        menu_selection = menu
-        leaf = current_location[-1]
-        branch = current_location[0:-1]
-
-        # trim off the branch to reach leaf
-        for choice in branch:
-            menu_selection = menu_selection[choice]['action']
-
-        # check if the next leaf exists, or whether we are at end of the structure
-        try:
-            if menu_selection[(leaf + 1)]:
-                return False
-        except IndexError:
-            return True
+    def _selected_node(self, current_location, menu):
 
-        # we shouldn't hit this point, but just in case
-        return True
+        # look up the current menu location (e.g. [0, 1, 1]) in the menu tree
+        return MenuTree.of(menu).resolve(current_location)
 
 
     def _length_of_list(self, current_location, menu):
 
-        # pull apart current menu location (e.g. [0, 1, 1])
-        menu_selection = menu
-        leaf = current_location[-1]
-        branch = current_location[0:-1]
-
-        # trim off the branch to reach leaf
-        for choice in branch:
-            menu_selection = menu_selection[choice]['action']
-
-        # check if the next leaf exists, or whether we are at end of the structure
-        try:
-            return len(menu_selection)
-        except IndexError:
-            return 0
-
-        # we shouldn't hit this point, but just in case
-        return 0
+        return len(self._selected_node(current_location, menu).parent.children)
 
 
     def _display_top_menu(self, g_vars, menu):
@@ -70,7 +43,11 @@ class Button(object):
         return self.page_obj.draw_page(g_vars, menu)
 
 
-    def menu_down(self, g_vars, menu):
+    def menu_down(self, g_vars, menu, steps=1):
+        '''
+        Moves down `steps` items (presses coalesced while busy) and draws
+        the result once
+        '''
 
         if self._at_home_page(g_vars):
             return self._display_top_menu(g_vars, menu)
@@ -78,7 +55,8 @@ class Button(object):
         # If we are in a table, scroll down (unless at bottom of list)
         if g_vars['display_state'] == 'page':
             if (g_vars['current_scroll_selection'] < (g_vars['table_pages'] -1)):
-                g_vars['current_scroll_selection'] += 1
+                g_vars['current_scroll_selection'] = min(g_vars['current_scroll_selection'] + steps,
+                    g_vars['table_pages'] - 1)
                 # Re-run current action immediately to display new page
                 g_vars['option_selected']()
                 return
@@ -87,23 +65,27 @@ class Button(object):
         if g_vars['display_state'] != 'menu':
             return
 
-        is_last = self._bottom_of_list(g_vars['current_menu_location'], menu)
-        # pop the last menu list item, increment & push back on
+        # move down the list, wrapping around to the top after the last item
+        list_length = self._length_of_list(g_vars['current_menu_location'], menu)
         current_selection = g_vars['current_menu_location'].pop()
-        current_selection = 0 if is_last else current_selection + 1
+        current_selection = (current_selection + steps) % list_length
         g_vars['current_menu_location'].append(current_selection)
 
         self.page_obj.draw_page(g_vars, menu)
 
 
-    def menu_up(self, g_vars, menu):
+    def menu_up(self, g_vars, menu, steps=1):
+        '''
+        Moves up `steps` items (presses coalesced while busy) and draws
+        the result once
+        '''
 
         if self._at_home_page(g_vars):
             return self._display_top_menu(g_vars, menu)
 
         # If we are in a table, scroll up (unless at top of list)
         if g_vars['display_state'] == 'page' and g_vars['current_scroll_selection'] > 0:
-            g_vars['current_scroll_selection'] -= 1
+            g_vars['current_scroll_selection'] = max(g_vars['current_scroll_selection'] - steps, 0)
             # Re-run current action immediately to display new page
             g_vars['option_selected']()
             return
@@ -112,13 +94,10 @@ class Button(object):
         if g_vars['display_state'] != 'menu':
             return
 
-        # pop the last menu list item, decrement & push back on
-        index_last_item = self._length_of_list(g_vars['current_menu_location'], menu) - 1
+        # move up the list, wrapping around to the bottom before the first item
+        list_length = self._length_of_list(g_vars['current_menu_location'], menu)
         current_selection = g_vars['current_menu_location'].pop()
-        if current_selection == 0:
-            current_selection = index_last_item
-        else:
-            current_selection = current_selection - 1
+        current_selection = (current_selection - steps) % list_length
         g_vars['current_menu_location'].append(current_selection)
 
         self.page_obj.draw_page(g_vars, menu)
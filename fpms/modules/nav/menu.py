@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import types
+
+# Longest name shown in full for an item opening a sub-menu (the '>'
+# marker takes the rest of the line)
+SUBMENU_LABEL_MAX = 16
+
+# Longest page title shown in full
+TITLE_MAX = 15
+
+def shorten(text, length):
+    '''
+    Truncates the text to the length, ending with ".." if it was cut
+    '''
+    if len(text) > length:
+        return text[:length - 2] + ".."
+    return text
+
+class MenuNode(object):
+    '''
+    An item of the menu, linked to its parent, children and siblings
+    '''
+
+    def __init__(self, name, action, parent=None, index=0):
+        self.name = name
+        self.action = action
+        self.parent = parent
+        self.index = index
+        self.children = []
+        self.previous = None
+        self.next = None
+
+        self.path = [] if parent is None else parent.path + [index]
+        self.names = () if parent is None else parent.names + (name,)
+        self.submenu = isinstance(action, list)
+
+        # Labels drawn in the menu list, as the item appears unselected and
+        # selected (selected sub-menu names are cut one character earlier)
+        self.label = name
+        self.selected_label = name
+        if self.submenu and name is not None:
+            self.label = shorten(name, SUBMENU_LABEL_MAX)
+            self.selected_label = shorten("*" + name, SUBMENU_LABEL_MAX)[1:]
+
+        # Title of the page listing the children of this item
+        self.title = None if name is None else shorten(name.upper(), TITLE_MAX)
+
+    def __repr__(self):
+        return "MenuNode({!r}, path={})".format(self.name, self.path)
+
+class MenuTree(object):
+    '''
+    The menu structure (nested lists of {"name", "action"} dicts) compiled
+    once into a tree of MenuNode. Locations (lists of indexes, as stored
+    in g_vars['current_menu_location']) and name paths (for shortcuts)
+    are looked up in indexes instead of walking the menu from its root.
+    '''
+
+    def __init__(self, menu):
+        self.menu = menu
+        self.root = MenuNode(None, menu)
+        self.locations = {}
+        self.paths = {}
+
+        self.add_children(self.root, menu)
+
+    @staticmethod
+    def of(menu):
+        '''
+        Returns the menu as a MenuTree, compiling it if necessary
+        '''
+        if isinstance(menu, MenuTree):
+            return menu
+        return MenuTree(menu)
+
+    def add_children(self, parent, items):
+        previous = None
+        for index, item in enumerate(items):
+            node = MenuNode(item["name"], item["action"], parent, index)
+            parent.children.append(node)
+
+            node.previous = previous
+            if previous is not None:
+                previous.next = node
+            previous = node
+
+            self.locations[tuple(node.path)] = node
+            self.paths.setdefault(node.names, node)
+
+            if node.submenu:
+                self.add_children(node, node.action)
+
+    def node(self, location):
+        '''
+        Returns the node at the location, or None if there is no such item
+        '''
+        return self.locations.get(tuple(location))
+
+    def resolve(self, location):
+        '''
+        Returns the node at the location. An index one past the end of its
+        list (having moved off the end) is reset to 0, in place.
+        '''
+        node = self.node(location)
+        if node is not None:
+            return node
+
+        node = self.root
+        for depth, index in enumerate(location):
+            if index == len(node.children):
+                index = 0
+                location[depth] = 0
+            node = node.children[index]
+
+        return node
+
+    def find(self, names):
+        '''
+        Returns the node reached by following the item names, or None
+        '''
+        return self.paths.get(tuple(names))
+
+    def shortcut(self, names):
+        '''
+        Returns the location of the item with the names, followed by its
+        action if it is not a sub-menu (see Button.shortcut()), or an empty
+        list if there is no such item
+        '''
+        node = self.find(names)
+        if node is None:
+            return []
+
+        if isinstance(node.action, types.FunctionType):
+            return node.path + [node.action]
+
+        return list(node.path)
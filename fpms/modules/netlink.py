@@ -0,0 +1,528 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+netlink.py - network interfaces and addresses from rtnetlink
+
+The pages and the main loop used to poll for link and address state
+(ifconfig, ip addr, the eth0 carrier file every 2 secs). Here the kernel
+tells us instead: InterfaceMonitor dumps the interfaces and addresses
+once, then follows the changes multicast by the kernel (RTMGRP_LINK,
+RTMGRP_IPV4_IFADDR, RTMGRP_IPV6_IFADDR) to keep a table in memory that
+the pages read without running anything.
+"""
+
+import copy
+import errno
+import socket
+import struct
+import threading
+
+# Netlink protocols and multicast groups
+NETLINK_ROUTE = 0
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV6_IFADDR = 0x100
+
+# Message types and flags
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_MULTI = 0x2
+NLM_F_ACK = 0x4
+NLM_F_DUMP = 0x300
+
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+
+# Attributes
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+IFLA_OPERSTATE = 16
+IFLA_CARRIER = 33
+
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFA_LABEL = 3
+
+# Interface flags and types
+IFF_UP = 0x1
+IFF_LOWER_UP = 0x10000
+ARPHRD_IEEE80211_RADIOTAP = 803   # WLAN interface in monitor mode
+
+NLMSGHDR = struct.Struct("=LHHLL")
+NLATTR = struct.Struct("=HH")
+IFINFOMSG = struct.Struct("=BxHiII")
+IFADDRMSG = struct.Struct("=BBBBI")
+
+RECV_BUFFER_SIZE = 65536
+
+# Secs the monitor thread waits for a message before checking it is
+# still running
+RECV_TIMEOUT = 1
+
+# Attempts at loading the table again after lost messages, before the
+# monitor gives up following the changes
+RESYNC_ATTEMPTS = 3
+
+# Change events (see InterfaceTable.apply())
+EVENT_LINK = "link"            # an interface was added or changed (name, flags)
+EVENT_CARRIER = "carrier"      # the carrier of an interface changed
+EVENT_ADDRESSES = "addresses"  # an address was added or removed
+EVENT_REMOVED = "removed"      # an interface was removed
+
+def align(length):
+    return (length + 3) & ~3
+
+def parse_messages(data):
+    '''
+    Returns the messages of a netlink datagram as (type, flags, seq,
+    payload) tuples
+    '''
+    messages = []
+    offset = 0
+    while offset + NLMSGHDR.size <= len(data):
+        length, msg_type, flags, seq, _ = NLMSGHDR.unpack_from(data, offset)
+        if length < NLMSGHDR.size:
+            break
+        messages.append((msg_type, flags, seq, data[offset + NLMSGHDR.size:offset + length]))
+        offset += align(length)
+    return messages
+
+def parse_attributes(data, offset=0):
+    '''
+    Returns the attributes (type: value) found from the offset on. Nested
+    and byte order flags are dropped from the types.
+    '''
+    attributes = {}
+    while offset + NLATTR.size <= len(data):
+        length, attr_type = NLATTR.unpack_from(data, offset)
+        if length < NLATTR.size:
+            break
+        attributes[attr_type & 0x3fff] = data[offset + NLATTR.size:offset + length]
+        offset += align(length)
+    return attributes
+
+def pack_message(msg_type, flags, seq, payload):
+    return NLMSGHDR.pack(NLMSGHDR.size + len(payload), msg_type, flags, seq, 0) + payload
+
+def pack_attribute(attr_type, value):
+    '''
+    Returns the attribute, padded to the netlink alignment
+    '''
+    length = NLATTR.size + len(value)
+    return NLATTR.pack(length, attr_type) + value + b"\0" * (align(length) - length)
+
+def parse_string(value):
+    return value.split(b"\0", 1)[0].decode(errors="replace")
+
+def check_error(payload):
+    '''
+    Raises the error carried by an NLMSG_ERROR message (error 0 is an
+    acknowledgement)
+    '''
+    error = struct.unpack_from("=i", payload)[0]
+    if error:
+        raise OSError(-error, errno.errorcode.get(-error, "netlink error"))
+
+def open_netlink_socket(protocol=NETLINK_ROUTE, groups=0):
+    '''
+    Returns a netlink socket, subscribed to the multicast groups
+    '''
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, protocol)
+    try:
+        sock.bind((0, groups))
+        sock.settimeout(RECV_TIMEOUT)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+class Interface(object):
+    '''
+    A network interface: index, name, flags (IFF_*), type (ARPHRD_*),
+    carrier, MAC address and IP addresses, as (family, address, prefix
+    length) tuples
+    '''
+
+    def __init__(self, index, name="", flags=0, type=0, carrier=False, mac=None):
+        self.index = index
+        self.name = name
+        self.flags = flags
+        self.type = type
+        self.carrier = carrier
+        self.mac = mac
+        self.addresses = []
+
+    @property
+    def up(self):
+        return bool(self.flags & IFF_UP)
+
+    @property
+    def monitor(self):
+        return self.type == ARPHRD_IEEE80211_RADIOTAP
+
+    def ipv4_addresses(self):
+        return [address for family, address, _ in self.addresses if family == socket.AF_INET]
+
+    def __repr__(self):
+        return "Interface({}, {!r}, up={}, carrier={}, addresses={})".format(
+            self.index, self.name, self.up, self.carrier, self.addresses)
+
+class InterfaceTable(object):
+    '''
+    Interfaces by index, kept up to date from the rtnetlink messages
+    '''
+
+    def __init__(self):
+        self.interfaces = {}
+
+    def apply(self, msg_type, payload):
+        '''
+        Applies a RTM_NEWLINK, RTM_DELLINK, RTM_NEWADDR or RTM_DELADDR
+        message, returns the changes it made as (event, interface) tuples
+        '''
+        if msg_type in (RTM_NEWLINK, RTM_DELLINK):
+            return self.apply_link(msg_type, payload)
+        if msg_type in (RTM_NEWADDR, RTM_DELADDR):
+            return self.apply_address(msg_type, payload)
+        return []
+
+    def apply_link(self, msg_type, payload):
+        _, if_type, index, flags, _ = IFINFOMSG.unpack_from(payload)
+        attributes = parse_attributes(payload, IFINFOMSG.size)
+        previous = self.interfaces.get(index)
+
+        if msg_type == RTM_DELLINK:
+            if previous is None:
+                return []
+            del self.interfaces[index]
+            return [(EVENT_REMOVED, previous)]
+
+        interface = Interface(index, flags=flags, type=if_type)
+        interface.name = parse_string(attributes.get(IFLA_IFNAME, b""))
+        if IFLA_CARRIER in attributes:
+            interface.carrier = bool(attributes[IFLA_CARRIER][0])
+        else:
+            interface.carrier = bool(flags & IFF_LOWER_UP)
+        if IFLA_ADDRESS in attributes:
+            interface.mac = ":".join("{:02x}".format(b) for b in attributes[IFLA_ADDRESS])
+        if previous is not None:
+            interface.addresses = previous.addresses
+        self.interfaces[index] = interface
+
+        events = []
+        if previous is None or (previous.name, previous.flags, previous.type) != (interface.name, interface.flags, interface.type):
+            events.append((EVENT_LINK, interface))
+        if previous is not None and previous.carrier != interface.carrier:
+            events.append((EVENT_CARRIER, interface))
+        return events
+
+    def apply_address(self, msg_type, payload):
+        family, prefixlen, _, _, index = IFADDRMSG.unpack_from(payload)
+        attributes = parse_attributes(payload, IFADDRMSG.size)
+
+        # IFA_LOCAL is the address of the interface, IFA_ADDRESS the peer's
+        # on point-to-point links (and the interface's on others)
+        value = attributes.get(IFA_LOCAL, attributes.get(IFA_ADDRESS))
+        if value is None or family not in (socket.AF_INET, socket.AF_INET6):
+            return []
+
+        address = (family, socket.inet_ntop(family, value), prefixlen)
+        interface = self.interfaces.get(index)
+        if interface is None:
+            # the address arrived before its link
+            interface = self.interfaces[index] = Interface(index)
+
+        if msg_type == RTM_NEWADDR:
+            if address in interface.addresses:
+                return []
+            interface.addresses = interface.addresses + [address]
+        else:
+            if address not in interface.addresses:
+                return []
+            interface.addresses = [a for a in interface.addresses if a != address]
+
+        return [(EVENT_ADDRESSES, interface)]
+
+    def addresses(self):
+        '''
+        Returns the set of IP addresses of all the interfaces
+        '''
+        return frozenset(address for interface in self.interfaces.values()
+            for _, address, _ in interface.addresses)
+
+class InterfaceMonitor(object):
+    '''
+    Background service following the network interfaces and their IP
+    addresses through rtnetlink.
+
+    The table is loaded with a dump of the links and addresses when the
+    monitor starts, then updated from the changes the kernel multicasts,
+    so reading it (snapshot(), interface()...) costs no process or system
+    call. The listeners are called from the monitor thread when a carrier
+    changes (e.g. a cable plugged in), an interface is added, removed or
+    changed, or the IP addresses change.
+
+    If the kernel drops messages (receive buffer overrun), the table is
+    loaded again. If that keeps failing, the monitor stops (`running` is
+    cleared, for the callers to poll instead) and every read loads the
+    table again. Until the monitor is started, reading the table loads
+    it on demand.
+    '''
+
+    def __init__(self, g_vars=None, open_socket=None):
+        # (g_vars is unused, Services builds every service with it)
+        self.open_socket = open_socket or open_netlink_socket
+        self.table = InterfaceTable()
+        self.loaded = False
+        self.given_up = False
+        self.lock = threading.Lock()
+        self.seq = 0
+
+        self.listeners = {
+            EVENT_LINK: [],
+            EVENT_CARRIER: [],
+            EVENT_ADDRESSES: [],
+            EVENT_REMOVED: [],
+        }
+
+        self.sock = None
+        self.running = False
+        self.thread = None
+
+    def on_link_change(self, listener):
+        '''
+        Calls listener(interface) when an interface is added or changed
+        '''
+        self.listeners[EVENT_LINK].append(listener)
+
+    def on_carrier_change(self, listener):
+        '''
+        Calls listener(interface) when the carrier of an interface changes
+        '''
+        self.listeners[EVENT_CARRIER].append(listener)
+
+    def on_addresses_change(self, listener):
+        '''
+        Calls listener(addresses) with the IP addresses of the device when
+        they change
+        '''
+        self.listeners[EVENT_ADDRESSES].append(listener)
+
+    def on_remove(self, listener):
+        '''
+        Calls listener(interface) when an interface is removed
+        '''
+        self.listeners[EVENT_REMOVED].append(listener)
+
+    def start(self):
+        '''
+        Loads the table and starts following the changes. Returns False if
+        rtnetlink cannot be used.
+        '''
+        if self.running:
+            return True
+
+        try:
+            self.sock = self.open_socket(NETLINK_ROUTE,
+                RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR)
+            self.load(self.sock)
+        except (OSError, AttributeError) as e:
+            # no netlink (e.g. not Linux, AF_NETLINK undefined)
+            print("Interface monitor not available: {}".format(e))
+            if self.sock is not None:
+                self.sock.close()
+                self.sock = None
+            return False
+
+        self.given_up = False
+        self.running = True
+        self.thread = threading.Thread(name="netlink", target=self.run, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def request(self, sock, msg_type, payload):
+        '''
+        Sends a dump request, returns the messages of the reply. Changes
+        multicast meanwhile (sequence number 0) are returned with them, in
+        order.
+        '''
+        self.seq += 1
+        seq = self.seq
+        sock.send(pack_message(msg_type, NLM_F_REQUEST | NLM_F_DUMP, seq, payload))
+
+        messages = []
+        while True:
+            for message in parse_messages(sock.recv(RECV_BUFFER_SIZE)):
+                reply_type, _, reply_seq, reply = message
+                if reply_seq not in (0, seq):
+                    # reply to an earlier request that failed
+                    continue
+                if reply_seq == seq and reply_type == NLMSG_DONE:
+                    return messages
+                if reply_seq == seq and reply_type == NLMSG_ERROR:
+                    check_error(reply)
+                    return messages
+                messages.append(message)
+
+    def load(self, sock):
+        '''
+        Loads the table with a dump of the links and addresses
+        '''
+        messages = self.request(sock, RTM_GETLINK, IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0))
+        messages += self.request(sock, RTM_GETADDR, IFADDRMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0))
+
+        table = InterfaceTable()
+        for msg_type, _, _, payload in messages:
+            table.apply(msg_type, payload)
+
+        # addresses of links removed while dumping
+        table.interfaces = {index: interface for index, interface in table.interfaces.items() if interface.name}
+
+        with self.lock:
+            previous = self.table
+            self.table = table
+            self.loaded = True
+
+        return previous
+
+    def ensure_loaded(self):
+        if self.loaded and not self.given_up:
+            return
+
+        try:
+            sock = self.open_socket(NETLINK_ROUTE, 0)
+        except (OSError, AttributeError):
+            return
+        try:
+            self.load(sock)
+        except OSError as e:
+            print(e)
+        finally:
+            sock.close()
+
+    def notify(self, events):
+        addresses_changed = False
+        for event, interface in events:
+            if event == EVENT_ADDRESSES:
+                addresses_changed = True
+                continue
+            for listener in self.listeners[event]:
+                listener(interface)
+
+        if addresses_changed:
+            addresses = self.addresses()
+            for listener in self.listeners[EVENT_ADDRESSES]:
+                listener(addresses)
+
+    def resync(self):
+        '''
+        Loads the table again after messages were lost, reporting the
+        differences as changes. Returns False if it could not be loaded.
+        '''
+        for attempt in range(RESYNC_ATTEMPTS):
+            try:
+                previous = self.load(self.sock)
+                break
+            except OSError as e:
+                # more messages lost, or no reply in time
+                print("Interface table reload failed: {}".format(e))
+        else:
+            return False
+
+        with self.lock:
+            current = dict(self.table.interfaces)
+
+        events = []
+        for index, interface in current.items():
+            before = previous.interfaces.get(index)
+            if before is None or (before.name, before.flags, before.type) != (interface.name, interface.flags, interface.type):
+                events.append((EVENT_LINK, interface))
+            if before is not None and before.carrier != interface.carrier:
+                events.append((EVENT_CARRIER, interface))
+        for index, interface in previous.interfaces.items():
+            if index not in current:
+                events.append((EVENT_REMOVED, interface))
+        if previous.addresses() != self.addresses():
+            events.append((EVENT_ADDRESSES, None))
+
+        self.notify(events)
+        return True
+
+    def run(self):
+        while self.running:
+            try:
+                data = self.sock.recv(RECV_BUFFER_SIZE)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if not self.running:
+                    break
+                if e.errno == errno.ENOBUFS:
+                    if not self.resync():
+                        print("Interface monitor stopped, changes are no longer followed")
+                        self.given_up = True
+                        self.running = False
+                        self.sock.close()
+                        self.sock = None
+                        break
+                    continue
+                print(e)
+                continue
+
+            events = []
+            with self.lock:
+                for msg_type, _, _, payload in parse_messages(data):
+                    events += self.table.apply(msg_type, payload)
+
+            self.notify(events)
+
+    def snapshot(self):
+        '''
+        Returns a copy of the interfaces, by index order
+        '''
+        self.ensure_loaded()
+        with self.lock:
+            return [copy.copy(self.table.interfaces[index]) for index in sorted(self.table.interfaces)]
+
+    def interface(self, name):
+        '''
+        Returns a copy of the named interface, None if there is none
+        '''
+        self.ensure_loaded()
+        with self.lock:
+            for interface in self.table.interfaces.values():
+                if interface.name == name:
+                    return copy.copy(interface)
+        return None
+
+    def ipv4_address(self, name):
+        '''
+        Returns the first IPv4 address of the interface, None if it has none
+        '''
+        interface = self.interface(name)
+        if interface is None:
+            return None
+        addresses = interface.ipv4_addresses()
+        return addresses[0] if addresses else None
+
+    def addresses(self):
+        '''
+        Returns the set of IP addresses set on the device
+        '''
+        self.ensure_loaded()
+        with self.lock:
+            return self.table.addresses()
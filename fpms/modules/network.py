@@ -3,24 +3,45 @@ import os
 import subprocess
 import re
 
+from fpms.modules import commands
 from fpms.modules.pages.alert import *
 from fpms.modules.pages.display import *
 from fpms.modules.pages.simpletable import *
 from fpms.modules.pages.pagedtable import *
+from fpms.modules.cache import *
+from fpms.modules.netlink import InterfaceMonitor
+from fpms.modules.nl80211 import WirelessMonitor
 from fpms.modules.constants import (
     LLDPNEIGH_FILE,
     CDPNEIGH_FILE,
     IPCONFIG_FILE,
     PUBLICIP_CMD,
     PUBLICIP6_CMD,
-    ETHTOOL_FILE,
-    IFCONFIG_FILE,
-    IW_FILE,
+    PUBLICIP_TIMEOUT,
+    PUBLICIP_TTL,
+    WLAN_INTERFACES_TTL,
 )
 
+def read_sys_file(path):
+    '''
+    Returns the contents of a sysfs attribute, stripped
+    '''
+    with open(path) as f:
+        return f.read().strip()
+
 class Network(object):
 
-    def __init__(self, g_vars):
+    def __init__(self, g_vars, services=None):
+
+        # results of the commands run for the pages, shared with the
+        # other pages through the service registry
+        self.cache = services.get(ResultCache) if services else ResultCache()
+
+        # network interfaces, followed through rtnetlink
+        self.interfaces = services.get(InterfaceMonitor) if services else InterfaceMonitor()
+
+        # WLAN interfaces, from nl80211
+        self.wireless = services.get(WirelessMonitor) if services else WirelessMonitor()
 
         # grab a screeb obj
         self.display_obj = Display(g_vars)
@@ -39,72 +60,39 @@ class Network(object):
         Return the list of network interfaces with IP address (if available)
         '''
 
-        ifconfig_file = IFCONFIG_FILE
-        iw_file = IW_FILE
-
-        try:
-            ifconfig_info = subprocess.check_output(
-                f"{ifconfig_file} -a", shell=True).decode()
-        except Exception as ex:
-            interfaces = ["Err: ifconfig error", str(ex)]
-            self.simple_table_obj.display_simple_table(g_vars, interfaces)
-            return
+        interfaces = []
+        for interface in self.interfaces.snapshot():
+
+            # save the interface name
+            interface_name = interface.name
+
+            # determine interface status
+            status = "▲" if interface.up else "▽"
+
+            # determine IP address (or monitor mode, for WLAN interfaces)
+            addresses = interface.ipv4_addresses()
+            if addresses:
+                ip_address = addresses[0]
+            elif interface.monitor:
+                ip_address = "Monitor"
+            else:
+                ip_address = "-"
+
+            # shorten interface name to make space for status and IP address
+            if len(interface_name) > 2:
+                short_name = interface_name
+                try:
+                    id = re.search(".*(\d+).*", interface_name).group(1)
+                    if interface_name.endswith(id):
+                        short_name = "{}{}".format(interface_name[0], id)
+                    else:
+                        short_name = "{}{}{}".format(interface_name[0], id, interface_name[-1])
+                    interface_name = short_name
+                except:
+                    pass
 
-        # Extract interface info with a bit of regex magic
-        interface_re = re.findall(
-            r'^(\w+?)\: flags(.*?)RX packets', ifconfig_info, re.DOTALL | re.MULTILINE)
-        if interface_re is None:
-            # Something broke is our regex - report an issue
-            interfaces = ["Error: match error"]
-        else:
-            interfaces = []
-            for result in interface_re:
-
-                # save the interface name
-                interface_name = result[0]
-
-                # look at the rest of the interface info & extract IP if available
-                interface_info = result[1]
-
-                # determine interface status
-                status = "▲" if re.search("UP", interface_info, re.MULTILINE) is not None else "▽"
-
-                # determine IP address
-                inet_search = re.search(
-                    "inet (.+?) ", interface_info, re.MULTILINE)
-                if inet_search is None:
-                    ip_address = "-"
-
-                    # do check if this is an interface in monitor mode
-                    if (re.search(r"(wlan\d+)|(mon\d+)", interface_name, re.MULTILINE)):
-
-                        # fire up 'iw' for this interface (hmmm..is this a bit of an un-necessary ovehead?)
-                        try:
-                            iw_info = subprocess.check_output(
-                                '{} {} info'.format(iw_file, interface_name), shell=True).decode()
-
-                            if re.search("type monitor", iw_info, re.MULTILINE):
-                                ip_address = "Monitor"
-                        except:
-                            ip_address = "-"
-                else:
-                    ip_address = inet_search.group(1)
-
-                # shorten interface name to make space for status and IP address
-                if len(interface_name) > 2:
-                    short_name = interface_name
-                    try:
-                        id = re.search(".*(\d+).*", interface_name).group(1)
-                        if interface_name.endswith(id):
-                            short_name = "{}{}".format(interface_name[0], id)
-                        else:
-                            short_name = "{}{}{}".format(interface_name[0], id, interface_name[-1])
-                        interface_name = short_name
-                    except:
-                        pass
-
-                # format interface info
-                interfaces.append('{} {}:{}'.format(status, interface_name, ip_address))
+            # format interface info
+            interfaces.append('{} {}:{}'.format(status, interface_name, ip_address))
 
         # final check no-one pressed a button before we render page
         if g_vars['display_state'] == 'menu':
@@ -127,105 +115,69 @@ class Network(object):
 
         return None
 
-    def show_wlan_interfaces(self, g_vars):
+    @cached(WLAN_INTERFACES_TTL, invalidated_by=[INVALIDATE_INTERFACES, INVALIDATE_MODE])
+    def wlan_interfaces_pages(self):
         '''
-        Create pages to summarise WLAN interface info
+        Returns the pages summarising the WLAN interfaces
         '''
-
-        g_wlan_interfaces_key = 'network_wlan_interfaces'
-
-        g_vars['disable_keys'] = True
-        g_vars['drawing_in_progress'] = True
-
-        # Display cached results (if any)
-        if g_vars['result_cache'] == True:
-            self.paged_table_obj.display_paged_table(g_vars,
-                { 'title' : "WLAN Interfaces", 'pages': g_vars[g_wlan_interfaces_key] })
-            g_vars['disable_keys'] = False
-            return None
-
-        interfaces = []
         pages = []
 
-        try:
-            interfaces = subprocess.check_output(f"{IW_FILE} dev 2>&1 | grep -i interface" + "| awk '{ print $2 }'", shell=True).decode().strip().split()
-        except Exception as e:
-            print(e)
-
-        for interface in interfaces:
+        for interface in self.wireless.interfaces():
             page = []
-            page.append(f"Interface: {interface}")
+            page.append(f"Interface: {interface.name}")
 
-            # Driver
+            # Driver (the module bound to the device, as ethtool -i reports it)
             try:
-                ethtool_output = subprocess.check_output(f"{ETHTOOL_FILE} -i {interface}", shell=True).decode().strip()
-                driver = re.search(".*driver:\s+(.*)", ethtool_output).group(1)
+                driver = os.path.basename(os.readlink(f"/sys/class/net/{interface.name}/device/driver"))
                 page.append(f"Driver: {driver}")
-            except Exception:
+            except OSError:
                 pass
 
             # Device ID (USB or PCI)
             try:
-                modalias_path = f"/sys/class/net/{interface}/device/modalias"
-                modalias = subprocess.check_output(
-                    f"cat {modalias_path}", shell=True).decode().strip()
+                device_path = f"/sys/class/net/{interface.name}/device"
+                modalias = read_sys_file(f"{device_path}/modalias")
                 bus = modalias.split(":")[0]
                 if bus == "usb":
                     device_id = modalias.split(":")[1][1:10].replace("p", ":")
                     page.append(f"DevID: {device_id}")
                 elif bus == "pci":
-                    vendor = subprocess.check_output(
-                        f"cat /sys/class/net/{interface}/device/vendor",
-                        shell=True).decode().strip()
-                    device = subprocess.check_output(
-                        f"cat /sys/class/net/{interface}/device/device",
-                        shell=True).decode().strip()
+                    vendor = read_sys_file(f"{device_path}/vendor")
+                    device = read_sys_file(f"{device_path}/device")
                     page.append(f"DevID: {vendor}:{device}")
             except Exception:
                 pass
 
-            # Addr, SSID, Mode, Channel
-            try:
-                iw_output = subprocess.check_output(f"{IW_FILE} {interface} info", shell=True).decode().strip()
+            # Addr, Mode, SSID, Channel
+            if interface.mac:
+                page.append(f"Addr: {interface.mac.replace(':', '').upper()}")
 
-                # Addr
-                try:
-                    addr = re.search(".*addr\s+(.*)", iw_output).group(1).replace(":", "").upper()
-                    page.append(f"Addr: {addr}")
-                except Exception:
-                    pass
+            mode = interface.mode
+            page.append(f"Mode: {mode.capitalize() if not mode.isupper() else mode}")
 
-                # Mode
-                try:
-                    mode = re.search(".*type\s+(.*)", iw_output).group(1)
-                    page.append(f"Mode: {mode.capitalize() if not mode.isupper() else mode}")
-                except Exception:
-                    pass
+            if interface.ssid is not None:
+                page.append(f"SSID: {interface.ssid}")
 
-                # SSID
-                try:
-                    ssid = re.search(".*ssid\s+(.*)", iw_output).group(1)
-                    page.append(f"SSID: {ssid}")
-                except Exception:
-                    pass
+            if interface.frequency:
+                page.append(f"Freq (MHz): {interface.frequency}")
+                page.append(f"Channel: {self.channel_lookup(interface.frequency)}")
 
-                # Frequency
-                try:
-                    freq = int(re.search(".*\(([0-9]+)\s+MHz\).*", iw_output).group(1))
-                    channel = self.channel_lookup(freq)
-                    page.append(f"Freq (MHz): {freq}")
-                    page.append(f"Channel: {channel}")
-                except Exception:
-                    pass
+            pages.append(page)
 
-            except Exception as e:
-                print(e)
+        return pages
 
-            pages.append(page)
+    def show_wlan_interfaces(self, g_vars):
+        '''
+        Create pages to summarise WLAN interface info
+        '''
+
+        g_vars['disable_keys'] = True
+        g_vars['drawing_in_progress'] = True
+
+        pages = self.wlan_interfaces_pages()
 
         self.paged_table_obj.display_paged_table(g_vars, { 'title' : "WLAN Interfaces", 'pages': pages })
 
-        g_vars[g_wlan_interfaces_key] = pages
         g_vars['result_cache'] = True
         g_vars['display_state'] = 'page'
         g_vars['drawing_in_progress'] = False
@@ -240,8 +192,7 @@ class Network(object):
         eth0_ipconfig_info = []
 
         try:
-            ipconfig_output = subprocess.check_output(
-                ipconfig_file, shell=True).decode().strip()
+            ipconfig_output = commands.output([ipconfig_file])
             ipconfig_info = ipconfig_output.split('\n')
 
         except subprocess.CalledProcessError as exc:
@@ -278,20 +229,14 @@ class Network(object):
 
         vlan_info = []
 
-        vlan_cmd = "sudo grep -a VLAN " + lldpneigh_file + \
-            " || grep -a VLAN " + cdpneigh_file
-
         if os.path.exists(lldpneigh_file):
 
-            try:
-                vlan_output = subprocess.check_output(
-                    vlan_cmd, shell=True).decode()
-                vlan_info = vlan_output.split('\n')
-
-                if len(vlan_info) == 0:
-                    vlan_info.append("No VLAN found")
+            # the LLDP neighbour's VLAN, else the CDP neighbour's
+            vlan_info = commands.grep(commands.run(["sudo", "cat", lldpneigh_file]).lines(), "VLAN")
+            if not vlan_info:
+                vlan_info = commands.grep(commands.run(["cat", cdpneigh_file]).lines(), "VLAN")
 
-            except:
+            if len(vlan_info) == 0:
                 vlan_info = ["No VLAN found"]
 
         # final check no-one pressed a button before we render page
@@ -307,13 +252,10 @@ class Network(object):
         lldpneigh_file = LLDPNEIGH_FILE
 
         neighbour_info = []
-        neighbour_cmd = "sudo cat " + lldpneigh_file
-
         if os.path.exists(lldpneigh_file):
 
             try:
-                neighbour_output = subprocess.check_output(
-                    neighbour_cmd, shell=True).decode()
+                neighbour_output = commands.output(["sudo", "cat", lldpneigh_file])
                 neighbour_info = neighbour_output.split('\n')
 
             except subprocess.CalledProcessError as exc:
@@ -340,13 +282,10 @@ class Network(object):
         cdpneigh_file = CDPNEIGH_FILE
 
         neighbour_info = []
-        neighbour_cmd = "sudo cat " + cdpneigh_file
-
         if os.path.exists(cdpneigh_file):
 
             try:
-                neighbour_output = subprocess.check_output(
-                    neighbour_cmd, shell=True).decode()
+                neighbour_output = commands.output(["sudo", "cat", cdpneigh_file])
                 neighbour_info = neighbour_output.split('\n')
 
             except subprocess.CalledProcessError as exc:
@@ -365,36 +304,36 @@ class Network(object):
 
         self.paged_table_obj.display_list_as_paged_table(g_vars, neighbour_info, title='CDP Neighbour')
 
+    @cached(PUBLICIP_TTL, invalidated_by=[INVALIDATE_INTERFACES])
+    def publicip_info(self, ip_version=4):
+        '''
+        Returns the lines of public IP details
+        '''
+        cmd = PUBLICIP6_CMD if ip_version == 6 else PUBLICIP_CMD
+        return commands.output([cmd], timeout=PUBLICIP_TIMEOUT).split('\n')
+
     def show_publicip(self, g_vars, ip_version=4):
         '''
         Shows public IP address and related details, works with any interface with internet connectivity
         '''
 
-        publicip_info = []
-        cmd = PUBLICIP6_CMD if ip_version == 6 else PUBLICIP_CMD
-
-        if g_vars['result_cache'] == False:
+        if not is_cached(self.publicip_info, ip_version):
             self.alert_obj.display_popup_alert(g_vars, "Detecting public " + ("IPv6..." if ip_version == 6 else "IPv4..."))
 
-            try:
-                g_vars["disable_keys"] = True
-                publicip_output = subprocess.check_output(
-                    cmd, shell=True).decode().strip()
-                publicip_info = publicip_output.split('\n')
-                g_vars['publicip_info'] = publicip_info
-                g_vars['result_cache'] = True
-            except subprocess.CalledProcessError:
-                self.alert_obj.display_alert_error(g_vars, "Failed to detect public IP address")
-                return
-            finally:
-                g_vars["disable_keys"] = False
+        try:
+            g_vars["disable_keys"] = True
+            publicip_info = self.publicip_info(ip_version)
+        except subprocess.CalledProcessError:
+            self.alert_obj.display_alert_error(g_vars, "Failed to detect public IP address")
+            return
+        finally:
+            g_vars["disable_keys"] = False
 
-        else:
+        g_vars['result_cache'] = True
 
-            publicip_info = g_vars['publicip_info']
-            if len(publicip_info) == 1:
-                self.alert_obj.display_alert_error(g_vars, publicip_info[0])
-                return
+        if len(publicip_info) == 1:
+            self.alert_obj.display_alert_error(g_vars, publicip_info[0])
+            return
 
-            title = "Public IPv6" if ip_version == 6 else "Public IPv4"
-            self.paged_table_obj.display_list_as_paged_table(g_vars, publicip_info, title=title, justify=False)
+        title = "Public IPv6" if ip_version == 6 else "Public IPv4"
+        self.paged_table_obj.display_list_as_paged_table(g_vars, publicip_info, title=title, justify=False)
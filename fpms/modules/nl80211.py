@@ -0,0 +1,374 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+nl80211.py - WLAN interfaces from nl80211, over generic netlink
+
+The status bar ran `iw dev` (parsed with TextFSM) on every refresh of the
+home page, and the WLAN pages ran `iw dev`, `iw <interface> info` and
+`iw dev <interface> station dump` on top of it. iw only asks the kernel
+through nl80211: WirelessMonitor asks it directly, one dump giving the
+PHY, type, MAC address, frequency and SSID of every WLAN interface. The
+dump is cached until nl80211 multicasts a change ("config" and "mlme"
+groups: interfaces added, removed or changing type, connections,
+channel switches).
+"""
+
+import errno
+import socket
+import struct
+import threading
+import time
+
+from fpms.modules import netlink
+from fpms.modules.netlink import (
+    NLM_F_DUMP,
+    check_error,
+    pack_attribute,
+    parse_attributes,
+    parse_messages,
+    parse_string,
+)
+
+# Generic netlink
+NETLINK_GENERIC = 16
+SOL_NETLINK = 270
+NETLINK_ADD_MEMBERSHIP = 1
+
+GENL_ID_CTRL = 0x10
+CTRL_CMD_GETFAMILY = 3
+CTRL_ATTR_FAMILY_ID = 1
+CTRL_ATTR_FAMILY_NAME = 2
+CTRL_ATTR_MCAST_GROUPS = 7
+CTRL_ATTR_MCAST_GRP_NAME = 1
+CTRL_ATTR_MCAST_GRP_ID = 2
+
+GENLMSGHDR = struct.Struct("=BBH")
+
+NL80211_FAMILY = "nl80211"
+
+# Multicast groups whose messages invalidate the interfaces
+NL80211_GROUPS = ["config", "mlme"]
+
+# nl80211 commands
+NL80211_CMD_GET_INTERFACE = 5
+NL80211_CMD_NEW_INTERFACE = 7
+NL80211_CMD_DEL_INTERFACE = 8
+NL80211_CMD_GET_STATION = 17
+NL80211_CMD_NEW_STATION = 19
+
+# nl80211 attributes
+NL80211_ATTR_WIPHY = 1
+NL80211_ATTR_IFINDEX = 3
+NL80211_ATTR_IFNAME = 4
+NL80211_ATTR_IFTYPE = 5
+NL80211_ATTR_MAC = 6
+NL80211_ATTR_WIPHY_FREQ = 38
+NL80211_ATTR_SSID = 52
+
+# Interface types, named as iw names them
+NL80211_IFTYPE_UNSPECIFIED = 0
+NL80211_IFTYPE_STATION = 2
+NL80211_IFTYPE_AP = 3
+NL80211_IFTYPE_MONITOR = 6
+
+IFTYPE_NAMES = {
+    0: "unspecified",
+    1: "IBSS",
+    2: "managed",
+    3: "AP",
+    4: "AP/VLAN",
+    5: "WDS",
+    6: "monitor",
+    7: "mesh point",
+    8: "P2P-client",
+    9: "P2P-GO",
+    10: "P2P-device",
+    11: "outside context of a BSS",
+    12: "NAN",
+}
+
+# Secs a dump is used for at most: a few changes (e.g. the channel of a
+# monitor interface) are not multicast
+WIRELESS_MAX_AGE = 10
+
+def parse_u32(value):
+    return struct.unpack_from("=I", value)[0]
+
+def pack_genl_message(family, cmd, flags, seq, attributes=b""):
+    '''
+    Returns a generic netlink request: header, command and attributes
+    '''
+    return netlink.pack_message(family, netlink.NLM_F_REQUEST | flags, seq,
+        GENLMSGHDR.pack(cmd, 1, 0) + attributes)
+
+def genl_request(sock, family, cmd, seq, attributes=b"", flags=NLM_F_DUMP):
+    '''
+    Sends a generic netlink request, returns the replies as (command,
+    attributes) tuples
+    '''
+    sock.send(pack_genl_message(family, cmd, flags, seq, attributes))
+
+    replies = []
+    while True:
+        for msg_type, msg_flags, msg_seq, payload in parse_messages(sock.recv(netlink.RECV_BUFFER_SIZE)):
+            if msg_seq != seq:
+                continue
+            if msg_type == netlink.NLMSG_DONE:
+                return replies
+            if msg_type == netlink.NLMSG_ERROR:
+                check_error(payload)
+                return replies
+            replies.append((payload[0], parse_attributes(payload, GENLMSGHDR.size)))
+            if not msg_flags & netlink.NLM_F_MULTI:
+                return replies
+
+def resolve_family(sock, name, seq=1):
+    '''
+    Returns the id and the multicast groups (name: id) of the generic
+    netlink family
+    '''
+    replies = genl_request(sock, GENL_ID_CTRL, CTRL_CMD_GETFAMILY, seq,
+        pack_attribute(CTRL_ATTR_FAMILY_NAME, name.encode() + b"\0"), flags=0)
+    for _, attributes in replies:
+        if CTRL_ATTR_FAMILY_ID not in attributes:
+            continue
+        groups = {}
+        for group in parse_attributes(attributes.get(CTRL_ATTR_MCAST_GROUPS, b"")).values():
+            group = parse_attributes(group)
+            groups[parse_string(group[CTRL_ATTR_MCAST_GRP_NAME])] = parse_u32(group[CTRL_ATTR_MCAST_GRP_ID])
+        return struct.unpack_from("=H", attributes[CTRL_ATTR_FAMILY_ID])[0], groups
+
+    raise OSError("generic netlink family {} not found".format(name))
+
+class WirelessInterface(object):
+    '''
+    A WLAN interface: index, name, PHY index, type (NL80211_IFTYPE_*), MAC
+    address, frequency (MHz) and SSID. The frequency and SSID are None
+    when the interface is not on a channel or has no SSID.
+    '''
+
+    def __init__(self, index, name, phy, type=NL80211_IFTYPE_UNSPECIFIED, mac=None, frequency=None, ssid=None):
+        self.index = index
+        self.name = name
+        self.phy = phy
+        self.type = type
+        self.mac = mac
+        self.frequency = frequency
+        self.ssid = ssid
+
+    @classmethod
+    def from_attributes(cls, attributes):
+        interface = cls(
+            parse_u32(attributes[NL80211_ATTR_IFINDEX]),
+            parse_string(attributes.get(NL80211_ATTR_IFNAME, b"")),
+            parse_u32(attributes[NL80211_ATTR_WIPHY]),
+            parse_u32(attributes.get(NL80211_ATTR_IFTYPE, b"\0\0\0\0")))
+        if NL80211_ATTR_MAC in attributes:
+            interface.mac = ":".join("{:02x}".format(b) for b in attributes[NL80211_ATTR_MAC])
+        if NL80211_ATTR_WIPHY_FREQ in attributes:
+            interface.frequency = parse_u32(attributes[NL80211_ATTR_WIPHY_FREQ])
+        if NL80211_ATTR_SSID in attributes:
+            interface.ssid = attributes[NL80211_ATTR_SSID].decode(errors="replace")
+        return interface
+
+    @property
+    def mode(self):
+        return IFTYPE_NAMES.get(self.type, "unknown")
+
+    @property
+    def monitor(self):
+        return self.type == NL80211_IFTYPE_MONITOR
+
+    def __repr__(self):
+        return "WirelessInterface({}, {!r}, phy={}, mode={!r}, frequency={}, ssid={!r})".format(
+            self.index, self.name, self.phy, self.mode, self.frequency, self.ssid)
+
+class WirelessMonitor(object):
+    '''
+    Background service caching the WLAN interfaces nl80211 reports.
+
+    interfaces() dumps them once, then returns the same dump until
+    nl80211 multicasts a change (or WIRELESS_MAX_AGE passes), so the
+    status bar reads them without running iw. Listeners are called from
+    the monitor thread when a change is multicast.
+
+    Until the monitor is started, nothing invalidates a dump: every call
+    dumps the interfaces again. Without nl80211 (no cfg80211 driver
+    loaded, no netlink) there are no WLAN interfaces.
+    '''
+
+    def __init__(self, g_vars=None, open_socket=None, clock=time.monotonic):
+        # (g_vars is unused, Services builds every service with it)
+        self.open_socket = open_socket or netlink.open_netlink_socket
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.seq = 0
+
+        self.family = None
+        self.groups = {}
+
+        self.cached = None
+        self.cached_at = 0
+        self.generation = 0
+
+        self.listeners = []
+
+        self.sock = None
+        self.running = False
+        self.thread = None
+
+    def on_change(self, listener):
+        '''
+        Calls listener() when nl80211 reports a change of the interfaces
+        '''
+        self.listeners.append(listener)
+
+    def start(self):
+        '''
+        Subscribes to the nl80211 changes. Returns False if nl80211 cannot
+        be used.
+        '''
+        if self.running:
+            return True
+
+        try:
+            self.sock = self.open_socket(NETLINK_GENERIC, 0)
+            self.resolve(self.sock)
+            for group in NL80211_GROUPS:
+                if group in self.groups:
+                    self.sock.setsockopt(SOL_NETLINK, NETLINK_ADD_MEMBERSHIP, self.groups[group])
+        except (OSError, AttributeError) as e:
+            print("Wireless monitor not available: {}".format(e))
+            if self.sock is not None:
+                self.sock.close()
+                self.sock = None
+            return False
+
+        self.running = True
+        self.thread = threading.Thread(name="nl80211", target=self.run, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def next_seq(self):
+        with self.lock:
+            self.seq += 1
+            return self.seq
+
+    def resolve(self, sock):
+        '''
+        Looks the nl80211 family up (once)
+        '''
+        if self.family is None:
+            self.family, self.groups = resolve_family(sock, NL80211_FAMILY, self.next_seq())
+        return self.family
+
+    def request(self, cmd, attributes=b""):
+        '''
+        Dumps the nl80211 command on a socket of its own, so the replies
+        are not mixed with the multicast changes
+        '''
+        sock = self.open_socket(NETLINK_GENERIC, 0)
+        try:
+            family = self.resolve(sock)
+            return genl_request(sock, family, cmd, self.next_seq(), attributes)
+        except OSError:
+            # the family id changes if cfg80211 is loaded again
+            self.family = None
+            raise
+        finally:
+            sock.close()
+
+    def invalidate(self):
+        with self.lock:
+            self.cached = None
+            self.generation += 1
+
+    def notify(self):
+        self.invalidate()
+        for listener in self.listeners:
+            listener()
+
+    def run(self):
+        while self.running:
+            try:
+                data = self.sock.recv(netlink.RECV_BUFFER_SIZE)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if not self.running:
+                    break
+                if e.errno == errno.ENOBUFS:
+                    # changes were lost, the interfaces are dumped again
+                    self.notify()
+                    continue
+                print(e)
+                continue
+
+            if any(msg_type == self.family for msg_type, _, _, _ in parse_messages(data)):
+                self.notify()
+
+    def interfaces(self):
+        '''
+        Returns the WLAN interfaces, by PHY and index order
+        '''
+        with self.lock:
+            if self.cached is not None and self.clock() - self.cached_at < WIRELESS_MAX_AGE:
+                return list(self.cached)
+            generation = self.generation
+
+        try:
+            replies = self.request(NL80211_CMD_GET_INTERFACE)
+        except (OSError, AttributeError) as e:
+            # (ENOENT: no nl80211, i.e. no WLAN driver loaded)
+            if getattr(e, "errno", None) != errno.ENOENT:
+                print(e)
+            return []
+
+        interfaces = [WirelessInterface.from_attributes(attributes)
+            for cmd, attributes in replies
+            if cmd == NL80211_CMD_NEW_INTERFACE and NL80211_ATTR_IFINDEX in attributes]
+        interfaces.sort(key=lambda interface: (interface.phy, interface.index))
+
+        with self.lock:
+            # keep the dump unless a change was reported meanwhile
+            if self.running and generation == self.generation:
+                self.cached = interfaces
+                self.cached_at = self.clock()
+
+        return list(interfaces)
+
+    def interface(self, name):
+        '''
+        Returns the named WLAN interface, None if there is none
+        '''
+        for interface in self.interfaces():
+            if interface.name == name:
+                return interface
+        return None
+
+    def station_count(self, name):
+        '''
+        Returns the number of stations associated with the interface (the
+        clients of an AP), None if they cannot be listed
+        '''
+        interface = self.interface(name)
+        if interface is None:
+            return None
+
+        try:
+            replies = self.request(NL80211_CMD_GET_STATION,
+                pack_attribute(NL80211_ATTR_IFINDEX, struct.pack("=I", interface.index)))
+        except OSError as e:
+            print(e)
+            return None
+
+        return sum(1 for cmd, _ in replies if cmd == NL80211_CMD_NEW_STATION)
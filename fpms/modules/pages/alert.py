@@ -2,7 +2,6 @@
 # Create an alert object
 #################################
 import time
-import fpms.modules.wlanpi_oled as oled
 from textwrap import wrap
 
 from fpms.modules.pages.display import *
@@ -70,11 +69,11 @@ class Alert(object):
 
             item_size = font_type.getbbox(item)
             self.draw.text((x + (PAGE_WIDTH - item_size[2])/2, y + font_offset), item,
-                            font=font_type, fill=THEME.alert_message_foreground.value)
+                            font=font_type, fill=THEME.alert_message_foreground)
 
             font_offset += font_size
 
-        oled.drawImage(g_vars['image'])
+        self.display_obj.present(g_vars)
 
         g_vars['display_state'] = 'page'
         g_vars['drawing_in_progress'] = False
@@ -86,16 +85,16 @@ class Alert(object):
         Display an alert styled for information messages
         '''
         self.display_alert(g_vars, msg, title=title,
-            title_foreground=THEME.alert_info_title_foreground.value,
-            title_background=THEME.alert_info_title_background.value)
+            title_foreground=THEME.alert_info_title_foreground,
+            title_background=THEME.alert_info_title_background)
 
     def display_alert_error(self, g_vars, msg, title="Error"):
         '''
         Display an alert styled for error messages
         '''
         self.display_alert(g_vars, msg, title=title,
-            title_foreground=THEME.alert_error_title_foreground.value,
-            title_background=THEME.alert_error_title_background.value)
+            title_foreground=THEME.alert_error_title_foreground,
+            title_background=THEME.alert_error_title_background)
 
     def display_popup_alert(self, g_vars, msg, delay=0.5):
         '''
@@ -105,6 +104,9 @@ class Alert(object):
         g_vars['drawing_in_progress'] = True
         g_vars['display_state'] = 'page'
 
+        # Overlay the pop-up on what is on screen, not on a half painted page
+        self.display_obj.restore(g_vars)
+
         item_length_max = 17
         item_list = wrap(msg, 17, break_on_hyphens=False)
 
@@ -117,7 +119,7 @@ class Alert(object):
         x = 0
         y = (PAGE_HEIGHT - rect_height) / 2
         self.draw.rectangle((margin, y - (rect_height / 2), PAGE_WIDTH - margin, y + rect_height),
-            outline=THEME.alert_popup_foreground.value, fill=THEME.alert_popup_background.value)
+            outline=THEME.alert_popup_foreground, fill=THEME.alert_popup_background)
 
         y -= font_offset * (len(item_list) + 2) - 1
 
@@ -128,10 +130,10 @@ class Alert(object):
 
             text_size = SMART_FONT.getbbox(item)
             self.draw.text((x + (PAGE_WIDTH - text_size[2])/2, y + font_offset), item,
-                font=SMART_FONT, fill=THEME.alert_popup_foreground.value)
+                font=SMART_FONT, fill=THEME.alert_popup_foreground)
             font_offset += font_size
 
-        oled.drawImage(g_vars['image'])
+        self.display_obj.present(g_vars)
 
         g_vars['drawing_in_progress'] = False
 
@@ -0,0 +1,71 @@
+import threading
+import time
+
+from PIL import Image
+
+from fpms.modules.scaling import create_draw
+
+class Canvas(object):
+    '''
+    Double-buffered drawing surface shared by the pages.
+
+    Pages draw into the back buffer through `draw` (also published as
+    g_vars['image'] / g_vars['draw']). present() publishes the finished
+    frame to the front buffer under a lock and hands it to the output, so
+    readers only ever see complete frames. Both buffers are allocated once:
+    the back buffer and its drawing context stay the same object for the
+    lifetime of the canvas, as pages hold on to them, so the swap copies
+    the back buffer into the front one instead of exchanging references.
+    '''
+
+    def __init__(self, size, scale=1, mode="RGB", output=None):
+        self.back = Image.new(mode, size)
+        self.front = Image.new(mode, size)
+        self.draw = create_draw(self.back, scale)
+        self.output = output
+        self.lock = threading.Lock()
+
+        self.stats = {
+            'presented': 0,
+            'present_time': 0.0,
+        }
+
+    def present(self, wait=False):
+        '''
+        Publishes the back buffer as the new front buffer and sends it to
+        the output. The back buffer keeps its contents, so the next frame
+        can be painted incrementally on top of it.
+        '''
+        start = time.perf_counter()
+
+        with self.lock:
+            self.front.paste(self.back)
+            if self.output:
+                self.output(self.front, wait)
+
+        self.stats['presented'] += 1
+        self.stats['present_time'] += time.perf_counter() - start
+
+    def restore(self):
+        '''
+        Resets the back buffer to the last frame presented, discarding any
+        partial drawing (e.g. before overlaying a pop-up on the screen).
+        '''
+        with self.lock:
+            self.back.paste(self.front)
+
+    def snapshot(self):
+        '''
+        Returns a copy of the last frame presented
+        '''
+        with self.lock:
+            return self.front.copy()
+
+    def throughput(self):
+        '''
+        Returns the average frames per second present() can sustain
+        '''
+        if not self.stats['present_time']:
+            return 0.0
+
+        return self.stats['presented'] / self.stats['present_time']
@@ -1,9 +1,8 @@
 from PIL import Image
 
-import fpms.modules.wlanpi_oled as oled
-
 from fpms.modules.themes import THEME
 from fpms.modules.constants import (
+    DISPLAY_SCALE,
     PAGE_HEIGHT,
     PAGE_WIDTH,
 )
@@ -24,10 +23,22 @@ class Display(object):
 
         # Draw a black filled box to clear the display.
         g_vars['draw'].rectangle((0, 0, PAGE_WIDTH, PAGE_HEIGHT),
-            fill=THEME.display_background.value)
+            fill=THEME.display_background)
 
         return
 
+    def present(self, g_vars, wait=False):
+        '''
+        Send the page painted on the canvas to the display
+        '''
+        g_vars['canvas'].present(wait)
+
+    def restore(self, g_vars):
+        '''
+        Discard anything painted since the last page was sent to the display
+        '''
+        g_vars['canvas'].restore()
+
     def stamp_qrcode(self, g_vars, qrcode_path, x=0, y=0,
         center_horizontally=True, center_vertically=True, draw_immediately=True):
         '''
@@ -37,7 +48,11 @@ class Display(object):
         img_w, img_h = img.size
         x = (PAGE_WIDTH  - img_w) // 2 if center_horizontally else x
         y = (PAGE_HEIGHT - img_h) // 2 if center_vertically   else y
-        offset = (x, y)
+        offset = (round(x * DISPLAY_SCALE), round(y * DISPLAY_SCALE))
+        if DISPLAY_SCALE != 1:
+            # Keep the modules sharp so the code still scans
+            img = img.resize((round(img_w * DISPLAY_SCALE), round(img_h * DISPLAY_SCALE)),
+                Image.NEAREST)
         g_vars['image'].paste(img, offset)
         if draw_immediately:
-            oled.drawImage(g_vars['image'])
+            self.present(g_vars)
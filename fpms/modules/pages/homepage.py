@@ -1,18 +1,16 @@
 #################################################
 # Create a page object that renders dispay page
 #################################################
-import fpms.modules.wlanpi_oled as oled
-import subprocess
 import re
 import os.path
 import time
-import textfsm
-import threading
 
 from PIL import Image
 
+from fpms.modules import commands
 from fpms.modules.pages.display import *
 from fpms.modules.pages.simpletable import *
+from fpms.modules.pages.sprites import status_bar_sprites
 from fpms.modules.battery import *
 from fpms.modules.bluetooth import *
 from fpms.modules.apps.kismet import *
@@ -22,15 +20,19 @@ from fpms.modules.themes import THEME
 from fpms.modules.constants import *
 from fpms.modules.env_utils import EnvUtils
 from fpms.modules.platform import *
+from fpms.modules.netlink import InterfaceMonitor
+from fpms.modules.nl80211 import WirelessMonitor
+from fpms.modules.processes import ProcessTable
+from fpms.modules.services import Services
+from fpms.modules.sysinfo import SystemMetrics
 
 class HomePage(object):
 
-    def __init__(self, g_vars):
-        # load textfsm template to parse iw output
-        with open(
-            os.path.realpath(os.path.join(os.getcwd(), "modules/templates/iw_dev.textfsm"))
-        ) as f:
-            self.iw_textfsm_template = textfsm.TextFSM(f)
+    def __init__(self, g_vars, services=None):
+        # the scanner, profiler and kismet objects are shared with the menu
+        # actions through the service registry
+        if services is None:
+            services = Services(g_vars)
 
         # grab a screeb obj
         self.display_obj = Display(g_vars)
@@ -38,63 +40,57 @@ class HomePage(object):
         # create simple table
         self.simple_table_obj = SimpleTable(g_vars)
 
-        # create a scanner object
-        self.scanner_obj = Scanner(g_vars)
+        # get the scanner object
+        self.scanner_obj = services.get(Scanner)
 
-        # create a profiler object
-        self.profiler_obj = Profiler(g_vars)
+        # get the profiler object
+        self.profiler_obj = services.get(Profiler)
 
-        # create a kismet object
-        self.kismet_obj = Kismet(g_vars)
+        # get the kismet object
+        self.kismet_obj = services.get(Kismet)
+
+        # get the bluetooth object
+        self.bluetooth_obj = services.get(Bluetooth)
+
+        # get the battery object
+        self.battery_obj = services.get(Battery)
+
+        # get the system metrics (temperature indicator)
+        self.metrics = services.get(SystemMetrics)
+
+        # get the network interfaces (addresses, link status)
+        self.interfaces = services.get(InterfaceMonitor)
+
+        # get the WLAN interfaces (type, PHY, SSID), from nl80211
+        self.wireless = services.get(WirelessMonitor)
+
+        # get the process list (capture tools on the monitor interfaces)
+        self.processes = services.get(ProcessTable)
 
         # create env utils object
         self.env_obj = EnvUtils()
 
-        thread = threading.Thread(target=self.check_reachability, args=(g_vars,), daemon=True)
-        thread.start()
-
     def wifi_client_count(self):
         '''
         Get a count of connected clients when in hotspot mode
         '''
-        cmd = "sudo /sbin/iw dev wlan0 station dump | grep 'Station' | wc -l"
-
-        try:
-            client_count = subprocess.check_output(cmd, shell=True).decode().strip()
-            return int(client_count)
-        except subprocess.CalledProcessError as exc:
-            return -1
+        count = self.wireless.station_count("wlan0")
+        return -1 if count is None else count
 
 
     def check_wlan(self):
         '''
         Returns true if there's at least one WLAN interface present.
         '''
-        interfaces = []
-        try:
-            interfaces = subprocess.check_output(f"{IW_FILE} dev 2>&1 | grep -i interface" + "| awk '{ print $2 }'", shell=True).decode().strip().split()
-            if len(interfaces) > 0:
-                return True
-        except Exception as e:
-            print(e)
-
-        return False
+        return len(self.wireless.interfaces()) > 0
 
 
     def check_reg_domain(self):
         '''
         Returns true if the reg. domain is set, false otherwise.
         '''
-        reg_domain_cmd = '/usr/bin/wlanpi-reg-domain get | grep "XX"'
-        try:
-            subprocess.run(reg_domain_cmd,
-                shell=True,
-                stderr=subprocess.DEVNULL,
-                stdout=subprocess.DEVNULL,
-                check=True)
-            return False
-        except subprocess.CalledProcessError:
-            return True
+        result = commands.run(["/usr/bin/wlanpi-reg-domain", "get"])
+        return not commands.grep(result.lines(), "XX")
 
 
     def check_port_blinker(self, g_vars):
@@ -128,81 +124,18 @@ class HomePage(object):
             return '15 Mbps/30 Mbps'
 
 
-    def check_reachability(self, g_vars):
-
-        # Detect changes in the IP address assigned to any interface
-        address_set = self.if_addresses()
-        if g_vars['eth_last_known_address_set'] != address_set:
-            g_vars['eth_last_known_address_set'] = address_set
-            g_vars['eth_last_reachability_test'] = 0
-
-        # Run a reachability test if enough time has passed
-        last_reachability_test = g_vars['eth_last_reachability_test']
-        if last_reachability_test > 0:
-            g_vars['eth_last_reachability_test'] = last_reachability_test - 1
-        else:
-            # check reachability every 30 seconds
-            g_vars['eth_last_reachability_test'] = 30
-
-            reachability_cmd = "sudo " + REACHABILITY_FILE + " | grep -i 'browse google' | grep OK"
-
-            try:
-                subprocess.run(reachability_cmd,
-                    shell=True,
-                    stderr=subprocess.DEVNULL,
-                    stdout=subprocess.DEVNULL,
-                    check=True)
-                g_vars['eth_last_reachability_result'] = True
-            except subprocess.CalledProcessError as exc:
-                g_vars['eth_last_reachability_result'] = False
-
-
-    def if_addresses(self):
-        '''
-        Returns the set of IP addresses set on the device (for all interfaces)
-        '''
-        cmd = "ifconfig | grep -E 'inet[6]?' | awk '{ print $2 }'"
-        try:
-            output = subprocess.check_output(cmd, shell=True).decode().strip().split()
-            return set(output)
-        except:
-            pass
-
-        return {}
-
-
     def if_address(self, if_name):
         '''
         Returns the IP address for the given interface
         '''
-        ip_addr = "No IP address"
-
-        cmd = "ip addr show {}  2>/dev/null | grep -Po \'inet \K[\d.]+\' | head -n 1".format(if_name)
-        try:
-            output = subprocess.check_output(cmd, shell=True).decode().strip()
-            if len(output) > 0:
-                ip_addr = output
-        except:
-            pass
-
-        return ip_addr
+        return self.interfaces.ipv4_address(if_name) or "No IP address"
 
     def if_wireless(self, if_name):
         '''
         Returns True if the interface is a wireless interface, False otherwise.
         '''
 
-        try:
-            subprocess.run("iw dev {} info".format(if_name),
-                shell=True,
-                stderr=subprocess.DEVNULL,
-                stdout=subprocess.DEVNULL,
-                check=True)
-            return True
-        except:
-            pass
-
-        return False
+        return self.wireless.interface(if_name) is not None
 
     def if_link_status(self, if_name):
         '''
@@ -215,8 +148,7 @@ class HomePage(object):
 
         status = None
         try:
-            eth_info = subprocess.check_output(
-                '{} {} 2>/dev/null'.format(ETHTOOL_FILE, if_name), shell=True).decode()
+            eth_info = commands.output([ETHTOOL_FILE, if_name])
             speed_re = re.findall(r'Speed\: (.*\/s)', eth_info, re.MULTILINE)
             duplex_re = re.findall(r'Duplex\: (.*)', eth_info, re.MULTILINE)
             link_re = re.findall(r'Link detected\: (.*)',
@@ -296,10 +228,10 @@ class HomePage(object):
 
         if display_alternate_title:
             y -= 2
-            canvas.text((x + (PAGE_WIDTH - FONTB10.getbbox(title)[2])/2, y), title, font=FONTB10, fill=THEME.text_highlighted_color.value)
+            canvas.text((x + (PAGE_WIDTH - FONTB10.getbbox(title)[2])/2, y), title, font=FONTB10, fill=THEME.text_highlighted_color)
             y += 10 + padding * 2
         else:
-            canvas.text((x + (PAGE_WIDTH - FONTB13.getbbox(title)[2])/2, y + padding), title, font=FONTB13, fill=THEME.text_highlighted_color.value)
+            canvas.text((x + (PAGE_WIDTH - FONTB13.getbbox(title)[2])/2, y + padding), title, font=FONTB13, fill=THEME.text_highlighted_color)
             y += 14 + padding * 2
 
         mode(g_vars, x=x, y=y, padding=padding)
@@ -337,7 +269,7 @@ class HomePage(object):
         if g_vars['home_page_alternate']:
             self.profiler_obj.profiler_check_new_profile(g_vars)
 
-        oled.drawImage(g_vars['image'])
+        self.display_obj.present(g_vars)
         g_vars['drawing_in_progress'] = False
 
     def home_page_legacy(self, g_vars, menu):
@@ -374,8 +306,7 @@ class HomePage(object):
 
             # get Ethernet port info (...for Jerry)
             try:
-                eth_info = subprocess.check_output(
-                    '{} eth0 2>/dev/null'.format(ethtool_file), shell=True).decode()
+                eth_info = commands.output([ethtool_file, "eth0"])
                 speed_re = re.findall(r'Speed\: (.*\/s)', eth_info, re.MULTILINE)
                 duplex_re = re.findall(r'Duplex\: (.*)', eth_info, re.MULTILINE)
                 link_re = re.findall(r'Link detected\: (.*)',
@@ -401,12 +332,12 @@ class HomePage(object):
                 if_name = "usb0"
                 mode_name = ""
 
-        ip_addr_cmd = "ip addr show {}  2>/dev/null | grep -Po \'inet \K[\d.]+\' | head -n 1".format(if_name)
-
-        try:
-            ip_addr = subprocess.check_output(ip_addr_cmd, shell=True).decode()
-        except Exception as ex:
+        interface = self.interfaces.interface(if_name)
+        if interface is None:
             ip_addr = "No IP address"
+        else:
+            addresses = interface.ipv4_addresses()
+            ip_addr = addresses[0] if addresses else ""
 
         x = 0
         y = 0
@@ -417,13 +348,13 @@ class HomePage(object):
         hostname = self.env_obj.get_hostname()
 
         canvas = g_vars['draw']
-        canvas.text((x + padding, y + 1), str(g_vars['wlanpi_ver']), font=SMART_FONT, fill=THEME.text_color.value)
-        canvas.text((x + padding, y + 11), hostname, font=FONT11, fill=THEME.text_color.value)
-        canvas.text((x + padding + 95, y + 20), if_name, font=SMART_FONT, fill=THEME.text_color.value)
-        canvas.text((x + padding, y + 29), str(ip_addr), font=FONT14, fill=THEME.text_color.value)
-        canvas.text((x + padding, y + 43), str(mode_name), font=SMART_FONT, fill=THEME.text_color.value)
+        canvas.text((x + padding, y + 1), str(g_vars['wlanpi_ver']), font=SMART_FONT, fill=THEME.text_color)
+        canvas.text((x + padding, y + 11), hostname, font=FONT11, fill=THEME.text_color)
+        canvas.text((x + padding + 95, y + 20), if_name, font=SMART_FONT, fill=THEME.text_color)
+        canvas.text((x + padding, y + 29), str(ip_addr), font=FONT14, fill=THEME.text_color)
+        canvas.text((x + padding, y + 43), str(mode_name), font=SMART_FONT, fill=THEME.text_color)
 
-        oled.drawImage(g_vars['image'])
+        self.display_obj.present(g_vars)
 
         g_vars['drawing_in_progress'] = False
         return
@@ -440,11 +371,11 @@ class HomePage(object):
         addr = self.if_address(if_name)
         link_status = self.if_link_status(if_name)
         if addr != None:
-            text_color = THEME.text_color.value if addr.lower() != "no ip address" else THEME.text_important_color.value
+            text_color = THEME.text_color if addr.lower() != "no ip address" else THEME.text_important_color
             canvas.text((x + (PAGE_WIDTH - FONTB12.getbbox(addr)[2])/2, y + padding + offset), addr, font=FONTB12, fill=text_color)
             offset += 13
         if link_status != None:
-            canvas.text((x + (PAGE_WIDTH - SMART_FONT.getbbox(link_status)[2])/2, y + padding + offset), link_status, font=SMART_FONT, fill=THEME.text_secondary_color.value)
+            canvas.text((x + (PAGE_WIDTH - SMART_FONT.getbbox(link_status)[2])/2, y + padding + offset), link_status, font=SMART_FONT, fill=THEME.text_secondary_color)
             offset += 11
 
         return offset + 8
@@ -459,7 +390,7 @@ class HomePage(object):
         addr = self.if_address(if_name)
         if addr.lower() != "no ip address":
             info = f"{label}: {addr}"
-            canvas.text((x + (PAGE_WIDTH - SMART_FONT.getbbox(info)[2])/2, y), info, font=SMART_FONT, fill=THEME.text_tertiary_color.value)
+            canvas.text((x + (PAGE_WIDTH - SMART_FONT.getbbox(info)[2])/2, y), info, font=SMART_FONT, fill=THEME.text_tertiary_color)
             return 11
 
         return 0
@@ -484,7 +415,7 @@ class HomePage(object):
             # Show the PAN address if bluetooth is on and we're paired with a device
             pan = self.if_address("pan0")
             if pan.lower() != "no ip address":
-                bluetooth = Bluetooth(g_vars)
+                bluetooth = self.bluetooth_obj
                 if bluetooth.bluetooth_power():
                     paired_devices = bluetooth.bluetooth_paired_devices()
                     if paired_devices != None:
@@ -504,7 +435,7 @@ class HomePage(object):
             client_count = self.wifi_client_count()
             if client_count >= 0:
                 clients = str(client_count) + (" client" if client_count == 1 else " clients")
-                canvas.text((x + (PAGE_WIDTH - SMART_FONT.getbbox(clients)[2])/2, y), clients, font=SMART_FONT, fill=THEME.text_secondary_color.value)
+                canvas.text((x + (PAGE_WIDTH - SMART_FONT.getbbox(clients)[2])/2, y), clients, font=SMART_FONT, fill=THEME.text_secondary_color)
                 y += 18
 
             # Show the eth0 address
@@ -524,7 +455,7 @@ class HomePage(object):
         y += self.iface_details(g_vars, "wlan0", x=x, y=y, padding=padding)
         y += 12
         status = self.check_wiperf_status()
-        canvas.text((x + (PAGE_WIDTH - SMART_FONT.getbbox(status)[2])/2, y), status, font=SMART_FONT, fill=THEME.text_tertiary_color.value)
+        canvas.text((x + (PAGE_WIDTH - SMART_FONT.getbbox(status)[2])/2, y), status, font=SMART_FONT, fill=THEME.text_tertiary_color)
 
     def dhcp_server_mode(self, g_vars, x=0, y=0, padding=2):
         if g_vars['home_page_alternate']:
@@ -563,54 +494,17 @@ class HomePage(object):
         '''
         Displays a battery indicator that shows charge level and power status
         '''
-        battery = Battery(g_vars)
+        battery = self.battery_obj
+        battery.read_status()
 
         if not battery.battery_present():
             return False
 
-        # Draw indicator
-        canvas = g_vars['draw']
-        bx = x + 3
-        by = y + 2
-
-        battery_indicator_width  = 16
-        battery_indicator_height = 8
-        canvas.rounded_rectangle((bx, by, bx + battery_indicator_width, by + battery_indicator_height), radius=1, outline=THEME.status_bar_foreground.value)
-
-        bx = bx + battery_indicator_width
-        by = by + 3
-        canvas.rectangle((bx , by, bx+1, by + 2), fill=THEME.status_bar_foreground.value)
-
         status = battery.battery_status()
         charge = battery.battery_charge()
 
-        # Draw current charge level
-        if charge > 0:
-            bx = x + 2
-            by = y + 2
-            fill_color = THEME.status_bar_foreground.value
-
-            if status == "charging":
-                fill_color = THEME.status_bar_battery_full.value
-            elif charge <= 25:
-                fill_color = THEME.status_bar_battery_low.value
-            elif charge >= 100:
-                if status == "not charging":
-                    fill_color = THEME.status_bar_battery_full.value
-
-            canvas.rectangle((bx+2, by+2, bx + ((battery_indicator_width - 2) * charge / 100), by + battery_indicator_height-2), fill=fill_color)
-
-        # Draw charging indicator (aka lighting bolt)
-        if status == "charging":
-            xy = [
-            (bx + battery_indicator_width/2 + 1, by - 2),
-            (bx + battery_indicator_width/2 - 4, by + battery_indicator_height/2 + 1),
-            (bx + battery_indicator_width/2 - 1, by + battery_indicator_height/2 + 1),
-            (bx + battery_indicator_width/2 - 1, by + battery_indicator_height + 2),
-            (bx + battery_indicator_width/2 + 4, by + battery_indicator_height/2 - 1),
-            (bx + battery_indicator_width/2 + 1, by + battery_indicator_height/2 - 1)
-            ]
-            canvas.polygon(xy, fill=THEME.status_bar_foreground.value, outline=THEME.status_bar_background.value)
+        sprites = status_bar_sprites()
+        sprites.paste(g_vars['image'], sprites.battery_key(status, charge), x, y)
 
         return True
 
@@ -624,47 +518,20 @@ class HomePage(object):
         temp_med   = 75 # getting uncomfortable
         temp_low   = 70 # getting warmer but ok
 
-        try:
-            temp = int(open('/sys/class/thermal/thermal_zone0/temp').read())
-        except:
-            temp = 0
-
-        if temp > 1000:
-            temp = temp/1000
+        temp = self.metrics.temperature() or 0
 
         # do not draw if temperature is ok
         if temp < temp_low:
             return False
 
-        canvas = g_vars['draw']
-
         if temp >= temp_high:
-            temp_color = THEME.status_bar_temp_high.value
+            level = "high"
         elif temp >= temp_med:
-            temp_color = THEME.status_bar_temp_med.value
-        elif temp >= temp_low:
-            temp_color = THEME.status_bar_temp_low.value
+            level = "med"
         else:
-            temp_color = THEME.status_bar_foreground.value
-
-        x = x + (width - 6) / 2
+            level = "low"
 
-        # draw thermometer
-        canvas.ellipse((x, y + 7, x + 6, y + 13), fill=temp_color)
-        canvas.rounded_rectangle((x + 2, y + 1, x + 4, y + 11), fill=THEME.status_bar_background.value, outline=temp_color, radius=1)
-
-        # draw marks
-        canvas.line((x + 6, y + 2, x + 7, y + 2), fill=temp_color)
-        canvas.line((x + 6, y + 4, x + 7, y + 4), fill=temp_color)
-        canvas.line((x + 6, y + 6, x + 7, y + 6), fill=temp_color)
-
-        # fill thermometer
-        if temp >= temp_high:
-            canvas.rounded_rectangle((x + 2, y + 2, x + 4, y + 11), fill=temp_color, radius=1)
-        elif temp >= temp_med:
-            canvas.rounded_rectangle((x + 2, y + 4, x + 4, y + 11), fill=temp_color, radius=1)
-        elif temp >= temp_low:
-            canvas.rounded_rectangle((x + 2, y + 6, x + 4, y + 11), fill=temp_color, radius=1)
+        status_bar_sprites().paste(g_vars['image'], ("temperature", level), x, y)
 
         return True
 
@@ -679,37 +546,21 @@ class HomePage(object):
         active = False
 
         for iface in interfaces:
-            if iface[1] == if_name:
-
-                # phy index
-                phy = iface[0]
+            if iface.name == if_name:
 
                 # check if the interface is UP
-                try:
-                    subprocess.run(f"{IFCONFIG_FILE} {if_name} | grep UP",
-                        shell=True,
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL,
-                        check=True)
+                interface = self.interfaces.interface(if_name)
+                if interface is not None and interface.up:
                     status_up = True
-                except Exception as e:
-                    pass
 
                 for other_iface in interfaces:
-                    if phy == other_iface[0]:
-                        if other_iface[2] == "monitor":
+                    if iface.phy == other_iface.phy:
+                        if other_iface.monitor:
                             monitor_mode = True
 
                             # check if it's being used for capturing with tcpdump or dumpcap
-                            try:
-                                subprocess.run(f"ps aux 2>&1 | grep -v grep | grep -E 'tcpdump|dumpcap' | grep {other_iface[1]}",
-                                    shell=True,
-                                    stdout=subprocess.DEVNULL,
-                                    stderr=subprocess.DEVNULL,
-                                    check=True)
+                            if self.processes.capture_tools(other_iface.name):
                                 active = True
-                            except Exception as e:
-                                pass
 
                 if monitor_mode and not active:
                     # check if the interface is being used for capturing with Profiler
@@ -717,20 +568,13 @@ class HomePage(object):
                         if self.profiler_obj.profiler_beaconing():
                             active = True
 
-                fill_color = THEME.status_bar_foreground.value
+                # draw wifi icon
+                key = ("wifi", height, status_up or monitor_mode, monitor_mode, active)
+                status_bar_sprites().paste(g_vars['image'], key, x, y)
 
+                fill_color = THEME.status_bar_foreground
                 if active:
-                    fill_color = THEME.status_bar_wifi_active.value
-
-                # draw wifi icon
-                if status_up or monitor_mode:
-                    canvas.pieslice((x, y + 3, x + height, y + height + 3), 225, 315, fill=fill_color)
-                    if monitor_mode:
-                        # draw the monitor mode 'eye'
-                        canvas.ellipse((x + height/2 - 3, y + height/2 - 2, x + height/2 + 3, y + height/2), fill=THEME.status_bar_background.value)
-                        canvas.ellipse((x + height/2 - 1, y + height/2 - 2, x + height/2 + 1, y + height/2), fill=fill_color)
-                else:
-                    canvas.pieslice((x, y + 3, x + height, y + height + 3), 225, 315, outline=fill_color)
+                    fill_color = THEME.status_bar_wifi_active
 
                 canvas.text((x + width/2 + 3, y + height - 8), if_name[-1], font=TINY_FONT, fill=fill_color)
 
@@ -744,12 +588,9 @@ class HomePage(object):
         Displays a bluetooth icon if bluetooth is on
         '''
 
-        bluetooth = Bluetooth(g_vars)
+        bluetooth = self.bluetooth_obj
         if bluetooth.bluetooth_power():
-            bluetooth_icon = chr(0xf128)
-            canvas = g_vars['draw']
-            x = x + (width - ICONS.getbbox(bluetooth_icon)[2])/2 + 1
-            canvas.text((x, y), bluetooth_icon, font=ICONS, fill=THEME.status_bar_foreground.value)
+            status_bar_sprites().paste(g_vars['image'], ("bluetooth",), x, y)
             return True
 
         return False
@@ -760,13 +601,8 @@ class HomePage(object):
         Displays a 'world' icon if we can reach the Internet via the Ethernet interface
         '''
 
-        canvas = g_vars['draw']
-        canvas.ellipse((x + 4, y + 2, x + height, y + height - 2), outline=THEME.status_bar_foreground.value)
-        canvas.ellipse((x + 7, y + 2, x + height - 3, y + height - 2), outline=THEME.status_bar_foreground.value)
-        canvas.line((x + 4, y + height/2, x + height, y + height/2), fill=THEME.status_bar_foreground.value)
-
-        if g_vars['eth_last_reachability_result'] != True:
-            canvas.line((x + 3, y + 1, x + height, y + height - 2), fill=THEME.status_bar_foreground.value, width=2)
+        reachable = g_vars['eth_last_reachability_result'] == True
+        status_bar_sprites().paste(g_vars['image'], ("reachability", height, reachable), x, y)
 
         return True
 
@@ -777,8 +613,8 @@ class HomePage(object):
 
         current_time = time.strftime("%H:%M")
         current_time_width = FONTB11.getbbox(current_time)[2]
-        canvas.rectangle((x, y, width, height), fill=THEME.status_bar_background.value)
-        canvas.text((x + padding + 2, y + 2), current_time, font=FONTB11, fill=THEME.status_bar_foreground.value)
+        canvas.rectangle((x, y, width, height), fill=THEME.status_bar_background)
+        canvas.text((x + padding + 2, y + 2), current_time, font=FONTB11, fill=THEME.status_bar_foreground)
 
         # We position each indicator starting from the right edge of the status bar
         x = width - 20
@@ -798,15 +634,9 @@ class HomePage(object):
 
         # WiFi Indicators
         try:
-            '''
-            Get the list of wireless interfaces from iw and parse it as:
-                [["phy_index", "interface_name", "type"], ...]
-            e.g.
-                [["0", "wlan0", "managed"], ["0", "wlan0mon", "monitor"], ["1", "wlan1", "managed"]]
-            '''
-            iw_dev_output = subprocess.check_output(f"{IW_FILE} dev 2>&1", shell=True).decode().strip()
-            self.iw_textfsm_template.Reset()
-            interfaces = self.iw_textfsm_template.ParseText(iw_dev_output)
+            # The wireless interfaces (name, PHY, type), cached until
+            # nl80211 reports a change
+            interfaces = self.wireless.interfaces()
 
             # WiFi indicator (wlan1)
             if x > current_time_width:
@@ -839,11 +669,11 @@ class HomePage(object):
         if contents != None:
             canvas = g_vars['draw']
 
-            foreground = THEME.alert_info_title_foreground.value
-            background = THEME.alert_info_title_background.value
+            foreground = THEME.alert_info_title_foreground
+            background = THEME.alert_info_title_background
             if error:
-                foreground = THEME.alert_error_title_foreground.value
-                background = THEME.alert_error_title_background.value
+                foreground = THEME.alert_error_title_foreground
+                background = THEME.alert_error_title_background
 
             # Draw background
             canvas.rectangle((x, y, width, y + height), fill=background)
@@ -862,13 +692,13 @@ class HomePage(object):
         canvas = g_vars['draw']
 
         # Draw background
-        canvas.rectangle((x, y, width, y + height), fill=THEME.system_bar_background.value)
+        canvas.rectangle((x, y, width, y + height), fill=THEME.system_bar_background)
 
         if contents != None:
             # Truncate contents if too long
             if len(contents) > 21:
                 contents = contents[0:19] + ".."
 
-            canvas.text((x + (PAGE_WIDTH - SMART_FONT.getbbox(contents)[2])/2, y + padding), contents, font=SMART_FONT, fill=THEME.system_bar_foreground.value)
+            canvas.text((x + (PAGE_WIDTH - SMART_FONT.getbbox(contents)[2])/2, y + padding), contents, font=SMART_FONT, fill=THEME.system_bar_foreground)
 
         return height
@@ -1,9 +1,9 @@
 #################################################
 # Create a page object that renders dispay page
 #################################################
-import fpms.modules.wlanpi_oled as oled
 
 from fpms.modules.pages.display import *
+from fpms.modules.nav.menu import MenuTree, TITLE_MAX, shorten
 from fpms.modules.themes import THEME
 from fpms.modules.constants import (
     STATUS_BAR_HEIGHT,
@@ -35,91 +35,32 @@ class Page(object):
         # show menu list based on current menu position
         ################################################
 
-        # FIXME: This feels clunky. Would be best to access menu locations
-        #       via evaluated location rather than crawling over menu
+        # Current menu location choice specified in list format:
+        #  g_vars['current_menu_location'] = [2,1]
+        menu = MenuTree.of(menu)
+        selected = menu.resolve(g_vars['current_menu_location'])
+        depth = len(g_vars['current_menu_location'])
 
-        menu_structure = menu
-        location_search = []
-        depth = 0
-        section_name = [g_vars['home_page_name']]
-
-        # Crawl the menu structure until we hit the current specified location
-        while g_vars['current_menu_location'] != location_search:
-
-            # List that will be used to build menu items to display
-            menu_list = []
-
-            # Current menu location choice specified in list format:
-            #  g_vars['current_menu_location'] = [2,1]
-            #
-            # As we move though menu depths, inpsect next level of
-            # menu structure
-            node = g_vars['current_menu_location'][depth]
-
-            # figure out the number of menu options at this menu level
-            number_menu_choices = len(menu_structure)
-
-            if node == number_menu_choices:
-
-                # we've fallen off the end of menu choices, fix item by zeroing
-                node = 0
-                g_vars['current_menu_location'][depth] = 0
-
-            location_search.append(node)
-
-            item_counter = 0
-
-            for menu_item in menu_structure:
-
-                item_name = menu_item['name']
-
-                # this is the currently selected item, pre-pend name with '*'
-                if (item_counter == node):
-                    section_name.append(item_name)
-                    item_name = "*" + item_name
-
-                # this item contains a list of options, append name with '>'
-                if (type(menu_item['action']) is list):
-                    if len(item_name) > 16:
-                        item_name = item_name[:14] + ".."
-                    item_name = item_name + ">"
-
-                menu_list.append((item_name))
-
-                item_counter = item_counter + 1
-
-            depth = depth + 1
-
-            # move down to next level of menu structure & repeat for new level
-            menu_structure = menu_structure[node]['action']
-
-        option_number_selected = node
-        g_vars['option_selected'] = menu_structure
+        g_vars['option_selected'] = selected.action
 
         # if we're at the top of the menu tree, show the home page title
         if depth == 1:
-            page_name = g_vars['home_page_name']
+            page_title = shorten(g_vars['home_page_name'].upper(), TITLE_MAX)
         else:
             # otherwise show the name of the parent menu item
-            page_name = section_name[-2]
-
-        page_title = page_name.upper()
-
-        # shorten title if necessary
-        if len(page_title) > 15:
-            page_title = page_title[:13] + ".."
+            page_title = selected.parent.title
 
         # Clear display prior to painting new item
         self.display_obj.clear_display(g_vars)
 
         # paint the page title
-        g_vars['draw'].rectangle((0, 0, PAGE_WIDTH, STATUS_BAR_HEIGHT), fill=THEME.page_title_background.value)
+        g_vars['draw'].rectangle((0, 0, PAGE_WIDTH, STATUS_BAR_HEIGHT), fill=THEME.page_title_background)
         title_size = FONTB12.getbbox(page_title)
-        g_vars['draw'].text(((PAGE_WIDTH - title_size[2])/2, 0), page_title,  font=FONTB12, fill=THEME.page_title_foreground.value)
+        g_vars['draw'].text(((PAGE_WIDTH - title_size[2])/2, 0), page_title,  font=FONTB12, fill=THEME.page_title_foreground)
 
         # draw back nav indicator
-        g_vars['draw'].line([(4, (STATUS_BAR_HEIGHT/2)), (8, 4)], fill=THEME.page_title_foreground.value, width=1)
-        g_vars['draw'].line([(4, (STATUS_BAR_HEIGHT/2)), (8, STATUS_BAR_HEIGHT-4)], fill=THEME.page_title_foreground.value, width=1)
+        g_vars['draw'].line([(4, (STATUS_BAR_HEIGHT/2)), (8, 4)], fill=THEME.page_title_foreground, width=1)
+        g_vars['draw'].line([(4, (STATUS_BAR_HEIGHT/2)), (8, STATUS_BAR_HEIGHT-4)], fill=THEME.page_title_foreground, width=1)
 
         # vertical starting point for menu (under title) & incremental offset for
         # subsequent items
@@ -130,6 +71,8 @@ class Page(object):
         table_window = MAX_PAGE_LINES
 
         # determine the menu list to show based on current selection and window limits
+        menu_list = selected.parent.children
+        option_number_selected = selected.index
         if (len(menu_list) > table_window):
 
             # We've got more items than we can fit in our window, need to slice to fit
@@ -140,30 +83,27 @@ class Page(object):
                 menu_list = menu_list[0: table_window]
 
         # paint the menu items, highlighting selected menu item
-        for menu_item in menu_list:
+        for node in menu_list:
 
-            nav = False
+            # this is a menu item that has more options
+            nav = node.submenu
             sel = False
 
-            rect_fill = THEME.page_item_background.value
-            text_fill = THEME.page_item_foreground.value
-            nav_fill  = THEME.page_item_foreground.value
-            icon_fill = THEME.page_icon_foreground.value
+            rect_fill = THEME.page_item_background
+            text_fill = THEME.page_item_foreground
+            nav_fill  = THEME.page_item_foreground
+            icon_fill = THEME.page_icon_foreground
             font_type = FONTB11
+            menu_item = node.label
 
-            # this is a menu item that has more options: remove > character
-            if (menu_item[-1] == '>'):
-                nav = True
-                menu_item = menu_item[:-1]
-
-            # this is selected menu item: highlight it and remove * character
-            if (menu_item[0] == '*'):
+            # this is selected menu item: highlight it
+            if node is selected:
                 sel = True
-                rect_fill = THEME.page_selected_item_background.value
-                text_fill = THEME.page_selected_item_foreground.value
-                nav_fill  = THEME.page_selected_item_foreground.value
-                icon_fill = THEME.page_selected_item_foreground.value
-                menu_item = menu_item[1:len(menu_item)]
+                rect_fill = THEME.page_selected_item_background
+                text_fill = THEME.page_selected_item_foreground
+                nav_fill  = THEME.page_selected_item_foreground
+                icon_fill = THEME.page_selected_item_foreground
+                menu_item = node.selected_label
 
             g_vars['draw'].rectangle((0, y, PAGE_WIDTH, y+y_offset), fill=rect_fill)
             g_vars['draw'].text((12, y), menu_item,  font=font_type, fill=text_fill)
@@ -188,6 +128,6 @@ class Page(object):
 
             y += y_offset
 
-        oled.drawImage(g_vars['image'])
+        self.display_obj.present(g_vars)
 
         g_vars['drawing_in_progress'] = False
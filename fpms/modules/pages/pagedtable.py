@@ -1,7 +1,6 @@
 #################################
 # Create a simpe table object
 #################################
-import fpms.modules.wlanpi_oled as oled
 
 from fpms.modules.pages.display import *
 from fpms.modules.pages.utils import *
@@ -71,19 +70,19 @@ class PagedTable(object):
             title = title[:title_length_max-2] + ".."
 
         # Draw title
-        g_vars['draw'].rectangle((x, y, PAGE_WIDTH, STATUS_BAR_HEIGHT), fill=THEME.page_table_title_background.value)
+        g_vars['draw'].rectangle((x, y, PAGE_WIDTH, STATUS_BAR_HEIGHT), fill=THEME.page_table_title_background)
         title_size = SMART_FONT.getbbox(title)
-        g_vars['draw'].text((x + (PAGE_WIDTH - title_size[2])/2, y + font_offset), title,  font=SMART_FONT, fill=THEME.page_table_title_foreground.value)
+        g_vars['draw'].text((x + (PAGE_WIDTH - title_size[2])/2, y + font_offset), title,  font=SMART_FONT, fill=THEME.page_table_title_foreground)
 
         # Draw back nav indicator
-        g_vars['draw'].line([(2, (STATUS_BAR_HEIGHT/2)), (6, 4)], fill=THEME.page_table_title_foreground.value, width=1)
-        g_vars['draw'].line([(2, (STATUS_BAR_HEIGHT/2)), (6, STATUS_BAR_HEIGHT-4)], fill=THEME.page_table_title_foreground.value, width=1)
+        g_vars['draw'].line([(2, (STATUS_BAR_HEIGHT/2)), (6, 4)], fill=THEME.page_table_title_foreground, width=1)
+        g_vars['draw'].line([(2, (STATUS_BAR_HEIGHT/2)), (6, STATUS_BAR_HEIGHT-4)], fill=THEME.page_table_title_foreground, width=1)
 
         # Draw up/down nav indicators
         if multi_page:
             current_page = g_vars['current_scroll_selection'] + 1
-            up_fill_color = THEME.page_table_disabled_title_foreground.value if current_page == 1 else THEME.page_table_title_foreground.value
-            down_fill_color = THEME.page_table_disabled_title_foreground.value if current_page == total_pages else THEME.page_table_title_foreground.value
+            up_fill_color = THEME.page_table_disabled_title_foreground if current_page == 1 else THEME.page_table_title_foreground
+            down_fill_color = THEME.page_table_disabled_title_foreground if current_page == total_pages else THEME.page_table_title_foreground
             # draw up nav indicator
             g_vars['draw'].line([(PAGE_WIDTH - 7, 2), (PAGE_WIDTH - 3, (STATUS_BAR_HEIGHT/2)-2)], fill=up_fill_color, width=1)
             g_vars['draw'].line([(PAGE_WIDTH - 7, 2), (PAGE_WIDTH - 11, (STATUS_BAR_HEIGHT/2)-2)], fill=up_fill_color, width=1)
@@ -122,10 +121,10 @@ class PagedTable(object):
                     item = self.string_formatter.justify(item, width=item_length_max)
 
                 if item == "---":
-                    g_vars['draw'].line([(x, y + font_offset + 2), (PAGE_WIDTH, y + font_offset + 2)], fill=THEME.page_table_row_separator.value)
+                    g_vars['draw'].line([(x, y + font_offset + 2), (PAGE_WIDTH, y + font_offset + 2)], fill=THEME.page_table_row_separator)
                     font_offset += 3
                 else:
-                    g_vars['draw'].text((x, y + font_offset), item,  font=SMART_FONT, fill=THEME.page_table_row_foreground.value)
+                    g_vars['draw'].text((x, y + font_offset), item,  font=SMART_FONT, fill=THEME.page_table_row_foreground)
                     font_offset += font_size
 
 
@@ -134,9 +133,9 @@ class PagedTable(object):
             scroll_bar_length = (PAGE_HEIGHT - STATUS_BAR_HEIGHT - 4) / total_pages
             x = PAGE_WIDTH - 1
             y = STATUS_BAR_HEIGHT + 2 + (scroll_bar_length * (current_page - 1))
-            g_vars['draw'].line([(x, y), (x, y+scroll_bar_length)], fill=THEME.page_table_scrollbar.value, joint="curve")
+            g_vars['draw'].line([(x, y), (x, y+scroll_bar_length)], fill=THEME.page_table_scrollbar, joint="curve")
 
-        oled.drawImage(g_vars['image'])
+        self.display_obj.present(g_vars)
 
         g_vars['display_state'] = 'page'
         g_vars['drawing_in_progress'] = False
@@ -191,6 +190,6 @@ class PagedTable(object):
         self.display_paged_table(g_vars, data)
 
         footer_size = SMART_FONT.getbbox(footer)
-        g_vars['draw'].text(((PAGE_WIDTH - footer_size[2])/2, PAGE_HEIGHT - 20), footer, font=SMART_FONT, fill=THEME.page_table_row_foreground.value)
+        g_vars['draw'].text(((PAGE_WIDTH - footer_size[2])/2, PAGE_HEIGHT - 20), footer, font=SMART_FONT, fill=THEME.page_table_row_foreground)
 
         return
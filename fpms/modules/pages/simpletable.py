@@ -1,7 +1,6 @@
 #################################
 # Create a simpe table object
 #################################
-import fpms.modules.wlanpi_oled as oled
 
 from fpms.modules.pages.display import *
 from fpms.modules.pages.utils import *
@@ -51,15 +50,15 @@ class SimpleTable(object):
             if len(title) > title_length_max:
                 title = title[:title_length_max-2] + ".."
 
-            g_vars['draw'].rectangle((x, y, PAGE_WIDTH, STATUS_BAR_HEIGHT), fill=THEME.simple_table_title_background.value)
+            g_vars['draw'].rectangle((x, y, PAGE_WIDTH, STATUS_BAR_HEIGHT), fill=THEME.simple_table_title_background)
             title_size = font_type.getbbox(title)
-            g_vars['draw'].text((x + (PAGE_WIDTH - title_size[2])/2, y + font_offset), title, font=font_type, fill=THEME.simple_table_title_foreground.value)
+            g_vars['draw'].text((x + (PAGE_WIDTH - title_size[2])/2, y + font_offset), title, font=font_type, fill=THEME.simple_table_title_foreground)
             font_offset += font_size + padding * 4
             table_display_max -= 1
 
             # draw back nav indicator
-            g_vars['draw'].line([(4, (STATUS_BAR_HEIGHT/2)), (8, 4)], fill=THEME.simple_table_title_foreground.value, width=1)
-            g_vars['draw'].line([(4, (STATUS_BAR_HEIGHT/2)), (8, STATUS_BAR_HEIGHT-4)], fill=THEME.simple_table_title_foreground.value, width=1)
+            g_vars['draw'].line([(4, (STATUS_BAR_HEIGHT/2)), (8, 4)], fill=THEME.simple_table_title_foreground, width=1)
+            g_vars['draw'].line([(4, (STATUS_BAR_HEIGHT/2)), (8, STATUS_BAR_HEIGHT-4)], fill=THEME.simple_table_title_foreground, width=1)
 
         previous_table_list_length = g_vars['table_list_length']
         g_vars['table_list_length'] = len(item_list)
@@ -89,11 +88,11 @@ class SimpleTable(object):
                 item = self.string_formatter.justify(item)
 
             self.draw.text((x, y + font_offset), item,
-                            font=font_type, fill=THEME.simple_table_row_foreground.value)
+                            font=font_type, fill=THEME.simple_table_row_foreground)
 
             font_offset += font_size + 2
 
-        oled.drawImage(g_vars['image'])
+        self.display_obj.present(g_vars)
 
         g_vars['display_state'] = 'page'
         g_vars['drawing_in_progress'] = False
@@ -0,0 +1,215 @@
+#################################################
+# Pre-rendered status bar icons
+#################################################
+from PIL import Image
+
+from fpms.modules.scaling import create_draw
+from fpms.modules.themes import THEME, on_theme_change
+from fpms.modules.constants import (
+    DISPLAY_SCALE,
+    STATUS_BAR_HEIGHT,
+    ICONS,
+)
+
+# Logical size of an indicator slot in the status bar. The status bar
+# gives the indicators after the battery its height less a pixel above and
+# below: the Wi-Fi and reachability icons are drawn to that height.
+INDICATOR_WIDTH = 16
+INDICATOR_HEIGHT = STATUS_BAR_HEIGHT - 2
+
+# Size of the battery indicator slot and its gauge
+BATTERY_SLOT_WIDTH = 24
+BATTERY_WIDTH = 16
+BATTERY_HEIGHT = 8
+
+# Number of steps shown by the battery gauge (one per pixel of the gauge)
+BATTERY_LEVELS = BATTERY_WIDTH - 2
+
+class StatusBarSprites(object):
+    '''
+    Atlas of the status bar icons for one theme. Every variant is drawn
+    once, with the same primitives the status bar used to draw on each
+    refresh, into a transparent image; the status bar then only pastes them.
+
+    The Wi-Fi and reachability icons are drawn to the height the status bar
+    gives their indicator, which is part of their key. Those for
+    INDICATOR_HEIGHT are built with the atlas, others the first time they
+    are pasted.
+    '''
+
+    def __init__(self, theme=THEME, scale=DISPLAY_SCALE):
+        self.theme = theme
+        self.scale = scale
+        self.sprites = {}
+
+        for state in ["normal", "low", "full", "charging"]:
+            for level in range(BATTERY_LEVELS + 1):
+                self.add(("battery", state, level), BATTERY_SLOT_WIDTH, STATUS_BAR_HEIGHT,
+                    self.draw_battery, state, level)
+
+        for level in ["low", "med", "high"]:
+            self.add(("temperature", level), INDICATOR_WIDTH, INDICATOR_HEIGHT,
+                self.draw_temperature, level)
+
+        for up in [False, True]:
+            for monitor in [False, True]:
+                for active in [False, True]:
+                    # Monitor mode interfaces are always drawn as up
+                    if monitor and not up:
+                        continue
+                    self.build(("wifi", INDICATOR_HEIGHT, up, monitor, active))
+
+        self.add(("bluetooth",), INDICATOR_WIDTH, INDICATOR_HEIGHT, self.draw_bluetooth)
+
+        for reachable in [False, True]:
+            self.build(("reachability", INDICATOR_HEIGHT, reachable))
+
+    def add(self, key, width, height, draw_function, *args):
+        image = Image.new("RGBA", (round(width * self.scale), round(height * self.scale)))
+        draw_function(create_draw(image, self.scale), *args)
+        self.sprites[key] = image
+
+    def build(self, key):
+        '''
+        Draws the sprite of a Wi-Fi or reachability key, on an image big
+        enough for the icon at its height
+        '''
+        kind, height = key[:2]
+        if kind == "wifi":
+            # the pie slice is drawn 3 px down
+            self.add(key, max(INDICATOR_WIDTH, height + 1), height + 4, self.draw_wifi, height, *key[2:])
+        elif kind == "reachability":
+            self.add(key, max(INDICATOR_WIDTH, height + 2), height, self.draw_reachability, height, *key[2:])
+        else:
+            raise KeyError(key)
+
+        return self.sprites[key]
+
+    def paste(self, image, key, x, y):
+        '''
+        Pastes the sprite with its top left corner at the logical position
+        '''
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.build(key)
+        image.paste(sprite, (round(x * self.scale), round(y * self.scale)), sprite)
+
+    def battery_key(self, status, charge):
+        '''
+        Returns the key of the battery sprite for the status and charge (%)
+        '''
+        if status == "charging":
+            state = "charging"
+        elif charge <= 25:
+            state = "low"
+        elif charge >= 100 and status == "not charging":
+            state = "full"
+        else:
+            state = "normal"
+
+        level = min(BATTERY_LEVELS, max(0, round(charge * BATTERY_LEVELS / 100)))
+        return ("battery", state, level)
+
+    def draw_battery(self, canvas, state, level):
+        theme = self.theme
+
+        # outline and terminal
+        bx, by = 3, 2
+        canvas.rounded_rectangle((bx, by, bx + BATTERY_WIDTH, by + BATTERY_HEIGHT), radius=1, outline=theme.status_bar_foreground)
+        bx = bx + BATTERY_WIDTH
+        by = by + 3
+        canvas.rectangle((bx , by, bx+1, by + 2), fill=theme.status_bar_foreground)
+
+        # charge level
+        bx, by = 2, 2
+        fill_color = {
+            "normal": theme.status_bar_foreground,
+            "low": theme.status_bar_battery_low,
+            "full": theme.status_bar_battery_full,
+            "charging": theme.status_bar_battery_full,
+        }[state]
+        if level >= 2:
+            canvas.rectangle((bx + 2, by + 2, bx + level, by + BATTERY_HEIGHT - 2), fill=fill_color)
+
+        # charging indicator (aka lighting bolt)
+        if state == "charging":
+            xy = [
+            (bx + BATTERY_WIDTH/2 + 1, by - 2),
+            (bx + BATTERY_WIDTH/2 - 4, by + BATTERY_HEIGHT/2 + 1),
+            (bx + BATTERY_WIDTH/2 - 1, by + BATTERY_HEIGHT/2 + 1),
+            (bx + BATTERY_WIDTH/2 - 1, by + BATTERY_HEIGHT + 2),
+            (bx + BATTERY_WIDTH/2 + 4, by + BATTERY_HEIGHT/2 - 1),
+            (bx + BATTERY_WIDTH/2 + 1, by + BATTERY_HEIGHT/2 - 1)
+            ]
+            canvas.polygon(xy, fill=theme.status_bar_foreground, outline=theme.status_bar_background)
+
+    def draw_temperature(self, canvas, level):
+        theme = self.theme
+        temp_color = {
+            "low": theme.status_bar_temp_low,
+            "med": theme.status_bar_temp_med,
+            "high": theme.status_bar_temp_high,
+        }[level]
+
+        x = (INDICATOR_WIDTH - 6) / 2
+        y = 0
+
+        # thermometer
+        canvas.ellipse((x, y + 7, x + 6, y + 13), fill=temp_color)
+        canvas.rounded_rectangle((x + 2, y + 1, x + 4, y + 11), fill=theme.status_bar_background, outline=temp_color, radius=1)
+
+        # marks
+        canvas.line((x + 6, y + 2, x + 7, y + 2), fill=temp_color)
+        canvas.line((x + 6, y + 4, x + 7, y + 4), fill=temp_color)
+        canvas.line((x + 6, y + 6, x + 7, y + 6), fill=temp_color)
+
+        # fill
+        top = {"low": 6, "med": 4, "high": 2}[level]
+        canvas.rounded_rectangle((x + 2, y + top, x + 4, y + 11), fill=temp_color, radius=1)
+
+    def draw_wifi(self, canvas, height, up, monitor, active):
+        theme = self.theme
+        fill_color = theme.status_bar_wifi_active if active else theme.status_bar_foreground
+
+        if up:
+            canvas.pieslice((0, 3, height, height + 3), 225, 315, fill=fill_color)
+            if monitor:
+                # the monitor mode 'eye'
+                canvas.ellipse((height/2 - 3, height/2 - 2, height/2 + 3, height/2), fill=theme.status_bar_background)
+                canvas.ellipse((height/2 - 1, height/2 - 2, height/2 + 1, height/2), fill=fill_color)
+        else:
+            canvas.pieslice((0, 3, height, height + 3), 225, 315, outline=fill_color)
+
+    def draw_bluetooth(self, canvas):
+        bluetooth_icon = chr(0xf128)
+        x = (INDICATOR_WIDTH - ICONS.getbbox(bluetooth_icon)[2])/2 + 1
+        canvas.text((x, 0), bluetooth_icon, font=ICONS, fill=self.theme.status_bar_foreground)
+
+    def draw_reachability(self, canvas, height, reachable):
+        theme = self.theme
+        canvas.ellipse((4, 2, height, height - 2), outline=theme.status_bar_foreground)
+        canvas.ellipse((7, 2, height - 3, height - 2), outline=theme.status_bar_foreground)
+        canvas.line((4, height/2, height, height/2), fill=theme.status_bar_foreground)
+
+        if not reachable:
+            canvas.line((3, 1, height, height - 2), fill=theme.status_bar_foreground, width=2)
+
+# Atlases already built, by theme name
+atlases = {}
+
+def status_bar_sprites(theme=THEME):
+    '''
+    Returns the status bar sprites for the theme, building them the first
+    time the theme is used
+    '''
+    sprites = atlases.get(theme.name)
+    if sprites is None:
+        sprites = StatusBarSprites(theme)
+        atlases[theme.name] = sprites
+    return sprites
+
+def rebuild_sprites(theme):
+    atlases.pop(theme.name, None)
+    status_bar_sprites(theme)
+
+on_theme_change(rebuild_sprites)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+processes.py - running processes, read from /proc
+
+The status bar ran `ps aux` for each monitor mode interface on every
+refresh of the home page to find out whether tcpdump or dumpcap was
+capturing on it, and the scanner ran `ps -p` to know whether its capture
+was still going. The process list is in /proc: ProcessTable reads the
+command lines from there once per refresh and pid_alive() asks the
+kernel with a null signal.
+"""
+
+import os
+import threading
+import time
+
+# Programs capturing from an interface given with -i / --interface, and
+# their other short options taking a value (so that `-ni wlan0` is read as
+# -n -i wlan0 but `-w /tmp/iface.pcap` is not read as an interface)
+CAPTURE_TOOLS = {
+    "tcpdump": "BCEFGMQTVWZcjmrswyz",
+    "dumpcap": "BCNZabcfksyw",
+}
+
+# Secs the process list is used for: the home page reads it for each
+# WLAN interface of a frame
+PROCESSES_TTL = 2
+
+def pid_alive(pid, proc_dir="/proc"):
+    '''
+    Returns True if the process is running. A zombie (exited, not waited
+    for yet) is not, and is reaped if it is a child of ours.
+    '''
+    pid = int(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # running, as another user
+        return True
+
+    try:
+        with open(os.path.join(proc_dir, str(pid), "stat")) as f:
+            # state follows the name, which is in brackets and may hold spaces
+            state = f.read().rpartition(")")[2].split()[0]
+    except (OSError, IndexError):
+        return True
+
+    if state != "Z":
+        return True
+
+    try:
+        os.waitpid(pid, os.WNOHANG)
+    except ChildProcessError:
+        pass
+    return False
+
+def capture_interfaces(argv):
+    '''
+    Returns the interfaces a tcpdump or dumpcap command line captures from
+    (the values of its -i and --interface options)
+    '''
+    value_options = CAPTURE_TOOLS.get(os.path.basename(argv[0]), "")
+
+    interfaces = []
+    args = iter(argv[1:])
+    for arg in args:
+        if arg == "--interface":
+            interfaces.append(next(args, ""))
+        elif arg.startswith("--interface="):
+            interfaces.append(arg[len("--interface="):])
+        elif arg.startswith("-") and not arg.startswith("--"):
+            # a cluster of short options, the first one taking a value
+            # takes the rest of the cluster or the next argument
+            for i, option in enumerate(arg[1:], 2):
+                if option == "i" or option in value_options:
+                    value = arg[i:] or next(args, "")
+                    if option == "i":
+                        interfaces.append(value)
+                    break
+
+    return [interface for interface in interfaces if interface]
+
+class ProcessTable(object):
+    '''
+    The command lines of the running processes, read from /proc/*/cmdline
+    and kept for PROCESSES_TTL secs, so the indicators of a frame share
+    one scan.
+    '''
+
+    def __init__(self, g_vars=None, proc_dir="/proc", clock=time.monotonic):
+        # (g_vars is unused, Services builds every service with it)
+        self.proc_dir = proc_dir
+        self.clock = clock
+        self.lock = threading.Lock()
+
+        self.cached = None
+        self.cached_at = 0
+
+    def scan(self):
+        '''
+        Returns the (pid, argv) of the processes running now. Kernel
+        threads (without a command line) are left out.
+        '''
+        processes = []
+        for name in os.listdir(self.proc_dir):
+            if not name.isdigit():
+                continue
+            try:
+                with open(os.path.join(self.proc_dir, name, "cmdline"), "rb") as f:
+                    cmdline = f.read()
+            except OSError:
+                # exited meanwhile
+                continue
+            if cmdline:
+                argv = [arg.decode(errors="replace") for arg in cmdline.rstrip(b"\0").split(b"\0")]
+                processes.append((int(name), argv))
+
+        return processes
+
+    def processes(self):
+        '''
+        Returns the (pid, argv) of the running processes, scanned at most
+        PROCESSES_TTL secs ago
+        '''
+        with self.lock:
+            if self.cached is None or self.clock() - self.cached_at >= PROCESSES_TTL:
+                self.cached = self.scan()
+                self.cached_at = self.clock()
+            return self.cached
+
+    def capture_tools(self, interface):
+        '''
+        Returns the names of the capture tools (tcpdump, dumpcap) capturing
+        from the interface
+        '''
+        tools = []
+        for _, argv in self.processes():
+            tool = os.path.basename(argv[0])
+            if tool in CAPTURE_TOOLS and interface in capture_interfaces(argv):
+                tools.append(tool)
+
+        return tools
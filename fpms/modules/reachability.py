@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import fcntl
+import http.client
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+
+from fpms.modules.constants import (
+    REACHABILITY_BACKOFF_MAX,
+    REACHABILITY_HTTP_HOST,
+    REACHABILITY_INTERVAL,
+    REACHABILITY_TCP_TARGETS,
+    REACHABILITY_TIMEOUT,
+)
+
+# Secs between checks of the IP addresses set on the device
+ADDRESS_POLL_INTERVAL = 2
+
+# Secs a round waits for its probes on top of their timeout: name
+# resolution (getaddrinfo) is not bounded by the socket timeout
+PROBE_ROUND_MARGIN = 1
+
+SIOCGIFADDR = 0x8915
+IF_INET6_FILE = "/proc/net/if_inet6"
+
+def if_addresses():
+    '''
+    Returns the set of IP addresses set on the device (for all interfaces),
+    read from the kernel rather than parsed from ifconfig
+    '''
+    addresses = set()
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for _, if_name in socket.if_nameindex():
+            try:
+                ifreq = struct.pack("256s", if_name.encode()[:15])
+                address = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, ifreq)[20:24]
+                addresses.add(socket.inet_ntoa(address))
+            except OSError:
+                # no IPv4 address on this interface
+                pass
+
+    try:
+        with open(IF_INET6_FILE) as f:
+            for line in f:
+                address = bytes.fromhex(line.split()[0])
+                addresses.add(socket.inet_ntop(socket.AF_INET6, address))
+    except (FileNotFoundError, IndexError, ValueError):
+        pass
+
+    return frozenset(addresses)
+
+def tcp_probe(host, port, timeout=REACHABILITY_TIMEOUT):
+    '''
+    Connects to the port, returns the time it took (secs)
+    '''
+    start = time.monotonic()
+    with socket.create_connection((host, port), timeout=timeout):
+        return time.monotonic() - start
+
+def http_probe(host, timeout=REACHABILITY_TIMEOUT):
+    '''
+    Sends a HEAD request to the web server, returns the time it took to
+    get the response (secs)
+    '''
+    start = time.monotonic()
+    connection = http.client.HTTPConnection(host, timeout=timeout)
+    try:
+        connection.request("HEAD", "/")
+        response = connection.getresponse()
+        if response.status >= 500:
+            raise OSError("HTTP status {}".format(response.status))
+        return time.monotonic() - start
+    finally:
+        connection.close()
+
+class ReachabilityResult(object):
+    '''
+    Outcome of a round of probes: whether the Internet could be reached,
+    the fastest probe's latency (secs, None if none succeeded) and when
+    the round finished (time.monotonic())
+    '''
+
+    def __init__(self, reachable, latency, timestamp):
+        self.reachable = reachable
+        self.latency = latency
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return "ReachabilityResult({}, latency={}, timestamp={})".format(
+            self.reachable, self.latency, self.timestamp)
+
+class ReachabilityMonitor(object):
+    '''
+    Background service testing whether the Internet can be reached.
+
+    Every round runs the probes (TCP connections, an HTTP HEAD request)
+    concurrently, each with a timeout: the Internet is reachable if any
+    of them succeeds. Rounds are scheduled on the monotonic clock, every
+    `interval` secs while reachable. While it is not, the interval doubles
+    on every failed round up to `max_backoff`, and a change of the IP
+    addresses set on the device (e.g. a cable plugged in and a lease
+    obtained) starts a new round straight away.
+
+    The last result is published to g_vars ('eth_last_reachability_result'
+    and 'eth_last_reachability_latency') for the home page indicator, which
+    reads it without waiting for the probes, and the listeners are called
+    when reachability changes.
+    '''
+
+    def __init__(self, g_vars, probes=None, addresses=if_addresses,
+        interval=REACHABILITY_INTERVAL, max_backoff=REACHABILITY_BACKOFF_MAX,
+        address_poll_interval=ADDRESS_POLL_INTERVAL,
+        round_timeout=REACHABILITY_TIMEOUT + PROBE_ROUND_MARGIN):
+
+        if probes is None:
+            probes = [lambda host=host, port=port: tcp_probe(host, port)
+                for host, port in REACHABILITY_TCP_TARGETS]
+            probes.append(lambda: http_probe(REACHABILITY_HTTP_HOST))
+
+        self.g_vars = g_vars
+        self.probes = probes
+        self.addresses = addresses
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.address_poll_interval = address_poll_interval
+        self.round_timeout = round_timeout
+
+        self.result = None
+        self.listeners = []
+        self.address_listeners = []
+
+        self.condition = threading.Condition()
+        self.wake_up = False
+        self.running = False
+        self.thread = None
+        self.executor = ThreadPoolExecutor(max_workers=max(1, len(probes)),
+            thread_name_prefix="reachability-probe")
+
+    def on_change(self, listener):
+        '''
+        Calls listener(result) when reachability changes
+        '''
+        self.listeners.append(listener)
+
+    def on_addresses_change(self, listener):
+        '''
+        Calls listener(addresses) when the IP addresses set on the device
+        change
+        '''
+        self.address_listeners.append(listener)
+
+    def start(self):
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+
+        self.thread = threading.Thread(name="reachability", target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+        if self.thread is not None:
+            self.thread.join()
+        self.executor.shutdown(wait=False)
+
+    def probe_now(self):
+        '''
+        Starts a new round of probes without waiting for the next one due
+        '''
+        with self.condition:
+            self.wake_up = True
+            self.condition.notify_all()
+
+    def probe(self):
+        '''
+        Runs the probes concurrently and returns their result. A round
+        with no probe succeeding within round_timeout secs is unreachable.
+        '''
+        futures = [self.executor.submit(probe) for probe in self.probes]
+
+        # The first probe to succeed is the fastest: the others finish in
+        # the background. Probes still waiting for a worker (busy with a
+        # hung name lookup of an earlier round) are not run.
+        try:
+            for future in as_completed(futures, timeout=self.round_timeout):
+                try:
+                    latency = future.result()
+                except Exception:
+                    continue
+                return ReachabilityResult(True, latency, time.monotonic())
+        except TimeoutError:
+            pass
+        finally:
+            for future in futures:
+                future.cancel()
+
+        return ReachabilityResult(False, None, time.monotonic())
+
+    def publish(self, result):
+        previous = self.result
+        self.result = result
+
+        self.g_vars.update(eth_last_reachability_result=result.reachable,
+            eth_last_reachability_latency=result.latency)
+
+        if previous is None or previous.reachable != result.reachable:
+            for listener in self.listeners:
+                listener(result)
+
+    def delay(self, failures):
+        '''
+        Returns the wait before the next round: the normal interval, doubled
+        for every failed round after the first, up to max_backoff
+        '''
+        if failures <= 1:
+            return self.interval
+        return min(self.max_backoff, self.interval * 2 ** (failures - 1))
+
+    def sleep(self, timeout):
+        '''
+        Waits for the timeout, returns True if woken up early (probe_now(),
+        stop())
+        '''
+        with self.condition:
+            if self.running and not self.wake_up:
+                self.condition.wait(timeout)
+
+            woken = self.wake_up or not self.running
+            self.wake_up = False
+            return woken
+
+    def run(self):
+        known_addresses = self.addresses()
+        failures = 0
+        next_round = time.monotonic()
+
+        while self.running:
+            result = self.probe()
+            self.publish(result)
+            failures = 0 if result.reachable else failures + 1
+
+            # Keep to the schedule, unless the round overran it
+            next_round = max(next_round + self.delay(failures), time.monotonic())
+
+            while True:
+                now = time.monotonic()
+                if now >= next_round:
+                    break
+
+                woken = self.sleep(min(next_round - now, self.address_poll_interval))
+                if not self.running:
+                    break
+
+                # Woken up by an address change (probe_now()) or not, the
+                # addresses are read again so that the change is only seen once
+                addresses = self.addresses()
+                changed = addresses != known_addresses
+                known_addresses = addresses
+
+                if changed:
+                    for listener in self.address_listeners:
+                        listener(addresses)
+
+                if woken or changed:
+                    # Probe again at once, on the normal schedule after
+                    failures = 0
+                    next_round = time.monotonic()
+                    break
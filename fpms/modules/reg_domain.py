@@ -2,6 +2,7 @@ import time
 import os
 import subprocess
 import fpms.modules.wlanpi_oled as oled
+from fpms.modules import commands
 import sys
 
 from fpms.modules.pages.simpletable import SimpleTable
@@ -24,7 +25,7 @@ class RegDomain(object):
     def show_reg_domain(self, g_vars):
         output = []
         try:
-            output = subprocess.check_output(f"{REG_DOMAIN_FILE} get", shell=True).decode().strip().split("\n")
+            output = commands.output([REG_DOMAIN_FILE, "get"]).split("\n")
         except subprocess.CalledProcessError as exc:
             print(exc)
             self.alert_obj.display_alert_error(g_vars, 'Failed to get domain or no domain configured')
@@ -38,7 +39,7 @@ class RegDomain(object):
         self.alert_obj.display_popup_alert(g_vars, 'Setting domain', delay=2)
 
         try:
-            alert_msg = subprocess.check_output(f"{REG_DOMAIN_FILE} set US --no-prompt", shell=True).decode()
+            alert_msg = commands.output([REG_DOMAIN_FILE, "set", "US", "--no-prompt"])
             time.sleep(1)
         except subprocess.CalledProcessError as exc:
             print(exc)
@@ -58,7 +59,7 @@ class RegDomain(object):
         self.alert_obj.display_popup_alert(g_vars, 'Setting domain', delay=2)
 
         try:
-            alert_msg = subprocess.check_output(f"{REG_DOMAIN_FILE} set CA --no-prompt", shell=True).decode()
+            alert_msg = commands.output([REG_DOMAIN_FILE, "set", "CA", "--no-prompt"])
             time.sleep(1)
         except subprocess.CalledProcessError as exc:
             print(exc)
@@ -77,7 +78,7 @@ class RegDomain(object):
         self.alert_obj.display_popup_alert(g_vars, 'Setting domain', delay=2)
 
         try:
-            alert_msg = subprocess.check_output(f"{REG_DOMAIN_FILE} set GB --no-prompt", shell=True).decode()
+            alert_msg = commands.output([REG_DOMAIN_FILE, "set", "GB", "--no-prompt"])
             time.sleep(1)
         except subprocess.CalledProcessError as exc:
             print(exc)
@@ -97,7 +98,7 @@ class RegDomain(object):
         self.alert_obj.display_popup_alert(g_vars, 'Setting domain', delay=2)
 
         try:
-            alert_msg = subprocess.check_output(f"{REG_DOMAIN_FILE} set BR --no-prompt", shell=True).decode()
+            alert_msg = commands.output([REG_DOMAIN_FILE, "set", "BR", "--no-prompt"])
             time.sleep(1)
         except subprocess.CalledProcessError as exc:
             print(exc)
@@ -117,7 +118,7 @@ class RegDomain(object):
         self.alert_obj.display_popup_alert(g_vars, 'Setting domain', delay=2)
 
         try:
-            alert_msg = subprocess.check_output(f"{REG_DOMAIN_FILE} set FR --no-prompt", shell=True).decode()
+            alert_msg = commands.output([REG_DOMAIN_FILE, "set", "FR", "--no-prompt"])
             time.sleep(1)
         except subprocess.CalledProcessError as exc:
             print(exc)
@@ -137,7 +138,7 @@ class RegDomain(object):
         self.alert_obj.display_popup_alert(g_vars, 'Setting domain', delay=2)
 
         try:
-            alert_msg = subprocess.check_output(f"{REG_DOMAIN_FILE} set CZ --no-prompt", shell=True).decode()
+            alert_msg = commands.output([REG_DOMAIN_FILE, "set", "CZ", "--no-prompt"])
             time.sleep(1)
         except subprocess.CalledProcessError as exc:
             print(exc)
@@ -157,7 +158,7 @@ class RegDomain(object):
         self.alert_obj.display_popup_alert(g_vars, 'Setting domain', delay=2)
 
         try:
-            alert_msg = subprocess.check_output(f"{REG_DOMAIN_FILE} set NL --no-prompt", shell=True).decode()
+            alert_msg = commands.output([REG_DOMAIN_FILE, "set", "NL", "--no-prompt"])
             time.sleep(1)
         except subprocess.CalledProcessError as exc:
             print(exc)
@@ -177,7 +178,7 @@ class RegDomain(object):
         self.alert_obj.display_popup_alert(g_vars, 'Setting domain', delay=2)
 
         try:
-            alert_msg = subprocess.check_output(f"{REG_DOMAIN_FILE} set DE --no-prompt", shell=True).decode()
+            alert_msg = commands.output([REG_DOMAIN_FILE, "set", "DE", "--no-prompt"])
             time.sleep(1)
         except subprocess.CalledProcessError as exc:
             print(exc)
@@ -197,7 +198,7 @@ class RegDomain(object):
         self.alert_obj.display_popup_alert(g_vars, 'Setting domain', delay=2)
 
         try:
-            alert_msg = subprocess.check_output(f"{REG_DOMAIN_FILE} set NO --no-prompt", shell=True).decode()
+            alert_msg = commands.output([REG_DOMAIN_FILE, "set", "NO", "--no-prompt"])
             time.sleep(1)
         except subprocess.CalledProcessError as exc:
             print(exc)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+"""
+scaling.py - resolution independent drawing
+
+Pages lay themselves out on a logical PAGE_WIDTH x PAGE_HEIGHT (128x128)
+grid. On larger panels (e.g. the 240x240 ST7789) the canvas is created at
+the panel's native size and the helpers below map the logical coordinates
+and font sizes onto it, so text and shapes are rendered sharp at full
+resolution instead of upscaling every finished frame.
+
+At a scale of 1 PIL fonts and drawing contexts are used directly, so
+128x128 panels pay nothing for this.
+"""
+
+from PIL import Image, ImageFont
+
+from fpms.modules.text import CachedDraw, native_font
+
+class ScaledFont(object):
+    '''
+    A TrueType font rendered at scale times its logical size. Metrics are
+    reported in logical units, so layout code can keep centring text on the
+    logical page.
+    '''
+
+    def __init__(self, path, size, scale):
+        self.size = size
+        self.scale = scale
+        self.font = ImageFont.truetype(path, max(1, round(size * scale)))
+
+    def getbbox(self, text, *args, **kwargs):
+        return tuple(value / self.scale for value in self.font.getbbox(text, *args, **kwargs))
+
+    def getlength(self, text, *args, **kwargs):
+        return self.font.getlength(text, *args, **kwargs) / self.scale
+
+    @property
+    def native(self):
+        return self.font
+
+def load_font(path, size, scale=1):
+    '''
+    Loads a TrueType font for drawing at the given scale
+    '''
+    if scale == 1:
+        return ImageFont.truetype(path, size)
+
+    return ScaledFont(path, size, scale)
+
+class ScaledDraw(object):
+    '''
+    Drawing context taking logical coordinates and drawing them onto a
+    native resolution image. Provides the subset of the ImageDraw API used
+    by the pages.
+    '''
+
+    def __init__(self, image, scale):
+        self.image = image
+        self.scale = scale
+        self.draw = CachedDraw(image)
+
+    def _xy(self, xy):
+        scale = self.scale
+        if xy and isinstance(xy[0], (int, float)):
+            return [value * scale for value in xy]
+
+        return [(x * scale, y * scale) for x, y in xy]
+
+    def _width(self, width):
+        # PIL draws a zero width line one pixel wide
+        return max(1, round(max(width, 1) * self.scale))
+
+    def text(self, xy, text, fill=None, font=None, *args, **kwargs):
+        self.draw.text(self._xy(xy), text, fill, font, *args, **kwargs)
+
+    def textbbox(self, xy, text, font=None, *args, **kwargs):
+        bbox = self.draw.textbbox(self._xy(xy), text, native_font(font), *args, **kwargs)
+        return tuple(value / self.scale for value in bbox)
+
+    def line(self, xy, fill=None, width=0, joint=None):
+        self.draw.line(self._xy(xy), fill, self._width(width), joint)
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        self.draw.rectangle(self._xy(xy), fill, outline, self._width(width))
+
+    def rounded_rectangle(self, xy, radius=0, fill=None, outline=None, width=1, **kwargs):
+        self.draw.rounded_rectangle(self._xy(xy), radius * self.scale, fill, outline,
+            self._width(width), **kwargs)
+
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        self.draw.ellipse(self._xy(xy), fill, outline, self._width(width))
+
+    def pieslice(self, xy, start, end, fill=None, outline=None, width=1):
+        self.draw.pieslice(self._xy(xy), start, end, fill, outline, self._width(width))
+
+    def arc(self, xy, start, end, fill=None, width=1):
+        self.draw.arc(self._xy(xy), start, end, fill, self._width(width))
+
+    def polygon(self, xy, fill=None, outline=None, width=1):
+        self.draw.polygon(self._xy(xy), fill, outline, self._width(width))
+
+    def point(self, xy, fill=None):
+        self.draw.point(self._xy(xy), fill)
+
+def create_draw(image, scale=1):
+    '''
+    Returns a drawing context for the image taking logical coordinates
+    '''
+    if scale == 1:
+        return CachedDraw(image)
+
+    return ScaledDraw(image, scale)
+
+def open_image(path, size, mode):
+    '''
+    Opens an image (splash screens, reboot/shutdown) and resizes it once to
+    the panel's native size
+    '''
+    image = Image.open(path).convert(mode)
+    if image.size != size:
+        image = image.resize(size, Image.LANCZOS)
+
+    return image
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from collections import deque
+
+# Kinds of events waking the main loop
+EVENT_BUTTON = "button"          # button presses are waiting to be handled
+EVENT_TICK = "tick"              # a timer is due (data: timer name)
+EVENT_DATA_CHANGED = "data"      # something shown may have changed (data: source)
+EVENT_QUIT = "quit"              # stop the main loop
+
+# Timers of the main loop
+TIMER_REFRESH = "refresh"            # re-runs the page on screen
+TIMER_HOUSEKEEPING = "housekeeping"  # Ethernet link check, screen saver
+
+# Refresh interval (secs) of the pages that do not declare one
+DEFAULT_REFRESH_INTERVAL = 2
+
+def refresh_interval(seconds):
+    '''
+    Decorator declaring how often (secs) the main loop re-runs a page.
+    None declares a static page, only drawn again on a button press or
+    a data change notification.
+    '''
+    def decorator(function):
+        function.refresh_interval = seconds
+        return function
+    return decorator
+
+def get_refresh_interval(page):
+    '''
+    Returns the refresh interval declared by the page function
+    '''
+    return getattr(page, "refresh_interval", DEFAULT_REFRESH_INTERVAL)
+
+class Scheduler(object):
+    '''
+    Event queue driving the main loop.
+
+    Any thread may post events (button presses, data change notifications);
+    they wake the loop at once rather than at its next poll. Named timers
+    tick at their own interval, so each page refreshes at its own rate
+    without holding up the others. Posted events are handled before due
+    timers, in the order they were posted.
+    '''
+
+    def __init__(self):
+        self.queue = deque()
+        self.condition = threading.Condition()
+
+        # Timer name -> [interval, deadline], guarded by the condition
+        self.timers = {}
+
+    def post(self, kind, data=None):
+        '''
+        Queues an event and wakes the loop
+        '''
+        with self.condition:
+            self.queue.append((kind, data))
+            self.condition.notify_all()
+
+    def set_timer(self, name, interval, restart=False):
+        '''
+        Ticks the timer every `interval` seconds, or stops it if interval is
+        None. A running timer keeps its period when the interval does not
+        change, unless restart is set.
+        '''
+        with self.condition:
+            timer = self.timers.get(name)
+            if interval is None:
+                self.timers.pop(name, None)
+            elif restart or timer is None or timer[0] != interval:
+                self.timers[name] = [interval, time.monotonic() + interval]
+            self.condition.notify_all()
+
+    def wait(self, timeout=None):
+        '''
+        Blocks until an event is posted or a timer is due and returns it as
+        a (kind, data) tuple, or None if the timeout expired first
+        '''
+        end = None if timeout is None else time.monotonic() + timeout
+
+        with self.condition:
+            while True:
+                if self.queue:
+                    return self.queue.popleft()
+
+                now = time.monotonic()
+                name, deadline = None, end
+                for timer_name, (interval, timer_deadline) in self.timers.items():
+                    if deadline is None or timer_deadline < deadline:
+                        name, deadline = timer_name, timer_deadline
+
+                if deadline is not None and deadline <= now:
+                    if name is None:
+                        return None
+
+                    # Skip the ticks missed while busy, rather than
+                    # running them in a burst
+                    timer = self.timers[name]
+                    timer[1] = deadline + timer[0]
+                    if timer[1] <= now:
+                        timer[1] = now + timer[0]
+                    return (EVENT_TICK, name)
+
+                self.condition.wait(None if deadline is None else deadline - now)
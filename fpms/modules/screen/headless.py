@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+from collections import deque
+
+from fpms.modules.screen.screen import AbstractScreen
+from fpms.modules.screen.utils import image_to_rgb565
+
+# Number of frames kept in memory
+HEADLESS_RING_SIZE = int(os.environ.get("FPMS_HEADLESS_RING", "16"))
+
+# Directory frames are written to (not written if empty) and their format:
+# "png" or "raw" (the big-endian RGB565 bytes an SPI panel would receive)
+HEADLESS_DIR = os.environ.get("FPMS_HEADLESS_DIR", "")
+HEADLESS_FORMAT = os.environ.get("FPMS_HEADLESS_FORMAT", "png")
+
+class Headless(AbstractScreen):
+    '''
+    Screen without hardware, for benchmarking and CI. Frames are kept in an
+    in-memory ring and optionally written to PNG or raw RGB565 files.
+
+    The stats count the bytes an RGB565 SPI panel would have been sent
+    (only the regions that changed, as for the real drivers) and time each
+    drawImage() call.
+    '''
+
+    def __init__(self, ring_size=HEADLESS_RING_SIZE, directory=HEADLESS_DIR, format=HEADLESS_FORMAT):
+        self.frames = deque(maxlen=ring_size)
+        self.directory = directory
+        self.format = format
+        self.flipped = False
+        self.awake = True
+        self.stats = {
+            'frames': 0,
+            'bytes': 0,
+            'draw_time': 0.0,
+            'max_draw_time': 0.0,
+        }
+
+    def init(self):
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        self.invalidate()
+        return True
+
+    def set_orientation(self, flipped):
+        self.flipped = flipped
+        self.invalidate()
+
+    def drawImage(self, image):
+        start = time.perf_counter()
+
+        regions = self.dirty_regions(image)
+        if regions:
+            for left, top, right, bottom in regions:
+                self.stats['bytes'] += (right - left) * (bottom - top) * 2
+
+            frame = image.copy()
+            self.frames.append(frame)
+
+            if self.directory:
+                self.save(frame, self.stats['frames'])
+
+            self.stats['frames'] += 1
+
+        elapsed = time.perf_counter() - start
+        self.stats['draw_time'] += elapsed
+        self.stats['max_draw_time'] = max(self.stats['max_draw_time'], elapsed)
+
+    def save(self, frame, index):
+        path = os.path.join(self.directory, "frame_{:06d}.{}".format(index, self.format))
+        if self.format == "raw":
+            with open(path, "wb") as f:
+                f.write(image_to_rgb565(frame))
+        else:
+            frame.save(path)
+
+    def clear(self):
+        self.invalidate()
+
+    def sleep(self):
+        self.awake = False
+        self.invalidate()
+
+    def wakeup(self):
+        self.awake = True
@@ -25,6 +25,8 @@ GPIO_CS = None
 BACKLIGHT_ACTIVE = None
 H_OFFSET = None
 V_OFFSET = None
+FRAMEBUFFER = "diff_to_previous"
+NUM_SEGMENTS = "16"
 
 if DISPLAY_TYPE == DISPLAY_TYPE_SSD1351:
     # ssd1351 128 x 128
@@ -181,29 +183,80 @@ if V_OFFSET:
     actual_args.append("--v-offset")
     actual_args.append(V_OFFSET)
 
+# Let luma only send the segments of the frame that changed
+if FRAMEBUFFER:
+    actual_args.append("--framebuffer")
+    actual_args.append(FRAMEBUFFER)
+
+if NUM_SEGMENTS:
+    actual_args.append("--num-segments")
+    actual_args.append(NUM_SEGMENTS)
+
+# SSD1351 segment re-map (A0h) settings: 65k colours, COM split and
+# reversed COM scan as set by luma, plus the column and COM scan direction
+# flipped for a display rotated by 180 degrees
+SSD1351_REMAP_NORMAL  = 0x70
+SSD1351_REMAP_FLIPPED = 0x62
+SSD1351_REMAP_BGR     = 0x04
+
 class Luma(AbstractScreen):
 
+    device = None
+    flipped = False
+
     def init(self):
         self.device = get_device(actual_args=actual_args)
         if PLATFORM == PLATFORM_PRO:
             # Reduce the contrast to also help reduce the noise
             # that's being produced by the display for some reason
             self.device.contrast(128)
+        self.set_orientation(self.flipped)
         return True
 
+    def set_orientation(self, flipped):
+        self.flipped = flipped
+        if self.device is None:
+            return
+
+        if DISPLAY_TYPE == DISPLAY_TYPE_SSD1351:
+            # Let the controller scan the panel the other way round
+            remap = SSD1351_REMAP_FLIPPED if flipped else SSD1351_REMAP_NORMAL
+            if COLOR_ORDER_BGR:
+                remap |= SSD1351_REMAP_BGR
+            self.device.command(0xA0, remap)
+        else:
+            # No hardware rotation wired up for this controller, use
+            # luma's rotate capability instead
+            self.device.rotate = 2 if flipped else 0
+
+        # The panel contents no longer match what we think was sent
+        self.invalidate()
+        framebuffer = getattr(self.device, "framebuffer", None)
+        if framebuffer is not None:
+            framebuffer.prev_image = None
+
     def drawImage(self, image):
         img = image.convert(self.device.mode)
+        # Frames are rendered at native size, this only catches strays
         width, height = img.size
         if DISPLAY_WIDTH != width or DISPLAY_HEIGHT != height:
             img = img.resize((DISPLAY_WIDTH, DISPLAY_HEIGHT), Image.LANCZOS)
 
+        # Nothing changed since the last frame, don't touch the device.
+        # Partial updates of changed regions are handled by luma's
+        # diff_to_previous framebuffer.
+        if not self.dirty_regions(img):
+            return
+
         self.device.display(img)
 
     def clear(self):
         self.device.clear()
+        self.invalidate()
 
     def sleep(self):
         self.device.clear()
+        self.invalidate()
         if PLATFORM != PLATFORM_PRO:
             self.device.backlight(False)
 
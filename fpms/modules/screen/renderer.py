@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import threading
+from collections import deque
+
+class Renderer(object):
+    '''
+    Owns a screen device and talks to it from a single render thread.
+
+    Any thread may submit frames or device commands (clear, sleep...). They
+    are queued and executed in order by the render thread, so callers never
+    block on SPI I/O and never interleave transfers. Consecutive frames
+    coalesce: a frame submitted while another is still waiting replaces it,
+    so only the latest one is drawn.
+    '''
+
+    def __init__(self, device):
+        self.device = device
+
+        # Pending (function, args) items, guarded by the condition
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.busy = False
+        self.thread = None
+
+        # Frame buffers no longer in use, reused for the next submissions
+        self.spare_frames = []
+
+        # Fingerprint of the last frame submitted (None forces a redraw)
+        self.last_fingerprint = None
+        self.fingerprint_context = None
+
+        self.stats = {
+            'sent': 0,
+            'skipped': 0,
+            'coalesced': 0,
+        }
+
+    def start(self):
+        '''
+        Starts the render thread. Until then work is done on the caller's
+        thread.
+        '''
+        if self.thread is None:
+            self.thread = threading.Thread(name="render", target=self.run)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.queue:
+                    self.condition.wait()
+                function, args = self.queue.popleft()
+                self.busy = True
+
+            try:
+                function(*args)
+            except Exception as ex:
+                print("Render error: " + str(ex))
+            finally:
+                with self.condition:
+                    self.busy = False
+                    self.condition.notify_all()
+
+    def submit(self, function, *args):
+        '''
+        Queues a device call for the render thread
+        '''
+        if self.thread is None:
+            function(*args)
+            return
+
+        with self.condition:
+            self.queue.append((function, args))
+            self.condition.notify_all()
+
+    def flush(self):
+        '''
+        Blocks until everything submitted so far has reached the device
+        '''
+        if self.thread is None or threading.current_thread() is self.thread:
+            return
+
+        with self.condition:
+            while self.queue or self.busy:
+                self.condition.wait()
+
+    def fingerprint(self, image):
+        digest = hashlib.blake2b(image.tobytes(), digest_size=16).digest()
+        return (self.fingerprint_context, image.mode, image.size, digest)
+
+    def invalidate(self, context=None):
+        '''
+        Forgets the last frame submitted, so the next one is always drawn.
+        The context (e.g. the orientation) becomes part of the fingerprint.
+        '''
+        with self.condition:
+            self.last_fingerprint = None
+            self.fingerprint_context = context
+
+    def draw(self, image, wait=False):
+        '''
+        Submits a copy of the image for drawing. The caller is free to keep
+        drawing on the image as soon as this returns. Set wait to block
+        until the frame is on the panel.
+        '''
+        frame_fingerprint = self.fingerprint(image)
+
+        with self.condition:
+            if frame_fingerprint == self.last_fingerprint:
+                # The panel already shows (or is about to show) this frame
+                self.stats['skipped'] += 1
+            elif self.thread is None:
+                self.last_fingerprint = frame_fingerprint
+                self.draw_frame(image, recycle=False)
+            else:
+                self.last_fingerprint = frame_fingerprint
+                self.enqueue_frame(image)
+
+        if wait:
+            self.flush()
+
+    def enqueue_frame(self, image):
+        # Called with the condition held
+        if self.queue and self.queue[-1][0] == self.draw_frame:
+            frame = self.queue[-1][1][0]
+            if frame.size == image.size and frame.mode == image.mode:
+                # Replace the frame still waiting to be drawn
+                frame.paste(image)
+                self.stats['coalesced'] += 1
+                return
+            self.queue.pop()
+            self.stats['coalesced'] += 1
+
+        frame = self.take_buffer(image)
+        self.queue.append((self.draw_frame, (frame,)))
+        self.condition.notify_all()
+
+    def take_buffer(self, image):
+        # Called with the condition held
+        while self.spare_frames:
+            frame = self.spare_frames.pop()
+            if frame.size == image.size and frame.mode == image.mode:
+                frame.paste(image)
+                return frame
+
+        return image.copy()
+
+    def draw_frame(self, frame, recycle=True):
+        self.device.drawImage(frame)
+        self.stats['sent'] += 1
+
+        if recycle:
+            with self.condition:
+                self.spare_frames.append(frame)
@@ -1,6 +1,16 @@
 from abc import ABC, abstractmethod
+from PIL import ImageChops
 
 class AbstractScreen(ABC):
+
+    # Number of horizontal bands the frame is split into when looking for
+    # changed regions. A menu scroll or a clock tick only touches one or two
+    # bands, so only those get sent to the panel.
+    dirty_bands = 8
+
+    # Copy of the last frame sent to the panel (None forces a full refresh)
+    last_frame = None
+
     @abstractmethod
     def init(self):
         pass
@@ -20,3 +30,57 @@ class AbstractScreen(ABC):
     @abstractmethod
     def wakeup(self):
         pass
+
+    @abstractmethod
+    def set_orientation(self, flipped):
+        pass
+
+    def invalidate(self):
+        '''
+        Forget the last frame sent, so the next one is sent in full. Must be
+        called whenever the panel contents change outside of drawImage()
+        (e.g. clear, sleep, orientation change).
+        '''
+        self.last_frame = None
+
+    def dirty_regions(self, image):
+        '''
+        Compares the image with the last frame sent and returns a list of
+        (left, top, right, bottom) boxes covering the pixels that changed.
+        Returns an empty list if nothing changed. The image is remembered as
+        the last frame sent.
+        '''
+        width, height = image.size
+
+        if self.last_frame is None or self.last_frame.size != image.size \
+            or self.last_frame.mode != image.mode:
+            self.last_frame = image.copy()
+            return [(0, 0, width, height)]
+
+        diff = ImageChops.difference(self.last_frame, image)
+        changed = diff.getbbox()
+        if changed is None:
+            return []
+
+        # Reuse the buffer we already hold rather than copying the frame
+        self.last_frame.paste(image)
+
+        regions = []
+        band_height = max(1, -(-height // self.dirty_bands))
+        for band_top in range(changed[1], changed[3], band_height):
+            band_bottom = min(band_top + band_height, changed[3])
+            box = diff.crop((0, band_top, width, band_bottom)).getbbox()
+            if box is None:
+                continue
+
+            box = (box[0], band_top + box[1], box[2], band_top + box[3])
+
+            # Merge with the previous region if they touch vertically
+            if regions and regions[-1][3] == box[1]:
+                previous = regions.pop()
+                box = (min(previous[0], box[0]), previous[1],
+                    max(previous[2], box[2]), box[3])
+
+            regions.append(box)
+
+        return regions
@@ -5,7 +5,10 @@ import spidev
 import time
 
 from gpiozero import *
+from PIL import Image
 from fpms.modules.screen.screen import AbstractScreen
+from fpms.modules.screen.utils import fill_chunks, image_to_rgb565
+from fpms.modules.themes import THEME
 
 LCD_WIDTH, LCD_HEIGHT, LCD_X, LCD_Y = 128, 128, 2, 1
 
@@ -14,6 +17,7 @@ LCD_Y_MAXPIXEL = 162  # LCD height maximum memory
 
 # scanning method
 SCAN_DIR_DFT = 6  # U2D_R2L
+SCAN_DIR_FLIPPED = 7  # D2U_L2R, SCAN_DIR_DFT rotated by 180 degrees
 
 class RaspberryPi:
     def __init__(self, spi=spidev.SpiDev(0, 0), spi_freq=40000000, rst=27, dc=25, bl=24, bl_freq=1000, i2c=None, i2c_freq=100000):
@@ -59,6 +63,12 @@ class RaspberryPi:
         if self.SPI:
             self.SPI.writebytes(data)
 
+    def spi_writebuffer(self, data):
+        # writebytes2 accepts any buffer object and splits it into
+        # transfers of the driver's maximum size internally
+        if self.SPI:
+            self.SPI.writebytes2(data)
+
     def bl_DutyCycle(self, duty):
         self.GPIO_BL_PIN.value = duty / 100
 
@@ -137,10 +147,19 @@ class LCD(RaspberryPi):
             5: 0x20, 6: 0x60, 7: 0xA0, 8: 0xE0
         }[Scan_dir]
 
-        if MemoryAccessReg_Data & 0x10 != 1:
-            self.LCD_X_Adjust, self.LCD_Y_Adjust = LCD_Y, LCD_X
+        # The 128x128 panel sits LCD_X columns and LCD_Y rows into the
+        # controller memory. Mirroring the row order (MY) moves it to the
+        # other end of the memory, and exchanging rows and columns (MV)
+        # swaps the two offsets.
+        column_adjust = LCD_X
+        row_adjust = LCD_Y
+        if MemoryAccessReg_Data & 0x80:
+            row_adjust = LCD_X_MAXPIXEL - LCD_HEIGHT - LCD_Y
+
+        if MemoryAccessReg_Data & 0x20:
+            self.LCD_X_Adjust, self.LCD_Y_Adjust = row_adjust, column_adjust
         else:
-            self.LCD_X_Adjust, self.LCD_Y_Adjust = LCD_X, LCD_Y
+            self.LCD_X_Adjust, self.LCD_Y_Adjust = column_adjust, row_adjust
 
         self.LCD_WriteReg(0x36)
         self.LCD_WriteData_8bit(MemoryAccessReg_Data | 0x08)
@@ -172,12 +191,18 @@ class LCD(RaspberryPi):
 
         self.LCD_WriteReg(0x2C)
 
-    def LCD_Clear(self):
-        _buffer = [0x00, 0x00] * (self.width * self.height)
-        self.LCD_SetWindows(0, 0, self.width, self.height)
+    def LCD_Clear(self, Color=0x0000):
+        self.LCD_FillRect(Color)
+
+    def LCD_FillRect(self, Color, Box=None):
+        if Box is None:
+            Box = (0, 0, self.width, self.height)
+        Xstart, Ystart, Xend, Yend = Box
+
+        self.LCD_SetWindows(Xstart, Ystart, Xend, Yend)
         self.digital_write(self.GPIO_DC_PIN, True)
-        for i in range(0, len(_buffer), 4096):
-            self.spi_writebyte(_buffer[i:i + 4096])
+        for chunk in fill_chunks(Color, (Xend - Xstart) * (Yend - Ystart)):
+            self.spi_writebuffer(chunk)
 
     def LCD_ShowImage(self, Image, Xstart, Ystart):
         if Image is None:
@@ -186,22 +211,18 @@ class LCD(RaspberryPi):
         if imwidth != self.width or imheight != self.height:
             raise ValueError(f'Image must be same dimensions as display ({self.width}x{self.height}).')
 
-        img = Image.load()
-        pix = []
+        self.LCD_ShowRegion(Image, (0, 0, self.width, self.height))
 
-        for y in range(self.height):
-            for x in range(self.width):
-                r, g, b = img[x, y]
-                pix1 = (r & 0xF8) | (g >> 5)
-                pix2 = ((g << 3) & 0xE0) | (b >> 3)
-                pix.append(pix1)
-                pix.append(pix2)
+    def LCD_ShowRegion(self, Image, Box):
+        Xstart, Ystart, Xend, Yend = Box
+        if Box == (0, 0) + Image.size:
+            pix = image_to_rgb565(Image)
+        else:
+            pix = image_to_rgb565(Image.crop(Box))
 
-        self.LCD_SetWindows(0, 0, self.width, self.height)
+        self.LCD_SetWindows(Xstart, Ystart, Xend, Yend)
         self.digital_write(self.GPIO_DC_PIN, True)
-
-        for i in range(0, len(pix), 4096):
-            self.spi_writebyte(pix[i:i+4096])
+        self.spi_writebuffer(pix)
 
     def LCD_Backlight(self, onOff):
         if onOff == True:
@@ -211,24 +232,49 @@ class LCD(RaspberryPi):
 
 class ST7735(AbstractScreen):
 
+    scan_dir = SCAN_DIR_DFT
+    device = None
+
     def init(self):
-        Lcd_ScanDir = SCAN_DIR_DFT  #SCAN_DIR_DFT = D2U_L2R
         self.device = LCD()
-        self.device.LCD_Init(Lcd_ScanDir)
-        self.device.LCD_Clear()
+        self.device.LCD_Init(self.scan_dir)
+        self.device.LCD_Clear(THEME.rgb565.display_background)
+        self.invalidate()
         return True
 
+    def set_orientation(self, flipped):
+        # Rotate in the controller (MADCTL) so frames are sent as-is
+        self.scan_dir = SCAN_DIR_FLIPPED if flipped else SCAN_DIR_DFT
+        if self.device:
+            self.device.LCD_SetGramScanWay(self.scan_dir)
+        self.invalidate()
+
     def drawImage(self, image):
+        # Frames are rendered at native size, this only catches strays
         width, height = image.size
         if LCD_WIDTH != width or LCD_HEIGHT != height:
             image = image.resize((LCD_WIDTH, LCD_HEIGHT), Image.LANCZOS)
-        self.device.LCD_ShowImage(image, 0, 0)
+
+        # Only send the parts of the frame that changed since the last one
+        for box in self.dirty_regions(image):
+            self.device.LCD_ShowRegion(image, box)
 
     def clear(self):
-        self.device.LCD_Clear()
+        # the page background, as the next frame paints it
+        self.device.LCD_Clear(THEME.rgb565.display_background)
+        self.invalidate()
+
+    def fill_rect(self, color, box=None):
+        '''
+        Fills the box (the whole panel by default) with a solid colour,
+        given as an (r, g, b) tuple or a 16-bit RGB565 value.
+        '''
+        self.device.LCD_FillRect(color, box)
+        self.invalidate()
 
     def sleep(self):
         self.device.LCD_Clear()
+        self.invalidate()
         self.device.LCD_Backlight(False)
 
     def wakeup(self):
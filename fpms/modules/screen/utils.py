@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+"""
+utils.py - frame conversion helpers shared by the screen drivers
+"""
+
+from PIL import Image, ImageChops
+
+# Lookup tables isolating the bits of each colour channel that end up in the
+# high and low bytes of a big-endian RGB565 pixel:
+#
+#   high byte: RRRRRGGG    low byte: GGGBBBBB
+#
+_RED_HIGH   = [value & 0xF8 for value in range(256)]
+_GREEN_HIGH = [value >> 5 for value in range(256)]
+_GREEN_LOW  = [(value << 3) & 0xE0 for value in range(256)]
+_BLUE_LOW   = [value >> 3 for value in range(256)]
+
+def image_to_rgb565(image):
+    '''
+    Packs a PIL image into a contiguous big-endian RGB565 buffer, ready to
+    be streamed to the display controller.
+
+    The conversion runs entirely inside PIL: each channel is masked through
+    a lookup table, the partial bytes are combined (the bits never overlap,
+    so a saturating add is a bitwise OR) and the high/low planes are
+    interleaved by packing them as a two-band "LA" image.
+    '''
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    red, green, blue = image.split()
+    high = ImageChops.add(red.point(_RED_HIGH), green.point(_GREEN_HIGH))
+    low = ImageChops.add(green.point(_GREEN_LOW), blue.point(_BLUE_LOW))
+
+    return Image.merge("LA", (high, low)).tobytes()
+
+# Number of pixels in each chunk streamed by a solid fill. 2048 pixels is
+# 4096 bytes, the default spidev transfer size.
+FILL_CHUNK_PIXELS = 2048
+
+# Preallocated fill chunks, keyed by RGB565 colour, least recently used
+# first. Only the last few colours are kept (the clear colour and a fill
+# colour or two), so callers filling with arbitrary colours do not grow it.
+FILL_CHUNKS_MAX = 4
+_fill_chunks = {}
+
+def color_to_rgb565(color):
+    '''
+    Returns the 16-bit RGB565 value of a colour given either as an (r, g, b)
+    tuple or as an already packed 16-bit integer.
+    '''
+    if isinstance(color, int):
+        return color & 0xFFFF
+
+    r, g, b = color[:3]
+    return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+
+def fill_chunks(color, pixels):
+    '''
+    Yields big-endian RGB565 buffers which, sent back to back, cover the
+    given number of pixels with a solid colour. The same preallocated chunk
+    is yielded repeatedly (the last one sliced as a memoryview), so a fill
+    never materializes the whole area in memory.
+    '''
+    value = color_to_rgb565(color)
+    chunk = _fill_chunks.pop(value, None)
+    if chunk is None:
+        chunk = value.to_bytes(2, "big") * FILL_CHUNK_PIXELS
+        if len(_fill_chunks) >= FILL_CHUNKS_MAX:
+            del _fill_chunks[next(iter(_fill_chunks))]
+    _fill_chunks[value] = chunk
+
+    full, remainder = divmod(pixels, FILL_CHUNK_PIXELS)
+    for _ in range(full):
+        yield chunk
+    if remainder:
+        yield memoryview(chunk)[:remainder * 2]
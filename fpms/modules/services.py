@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import inspect
+import threading
+
+class Services(object):
+    '''
+    Registry of the long-lived objects behind the pages and menu actions
+    (HomePage, Network, Scanner, Profiler...). Each class is built once, the
+    first time it is asked for, and the same instance is returned after
+    that, so a button press or page refresh does not construct objects,
+    re-read templates or start threads.
+
+    Classes whose constructor takes a `services` argument are given the
+    registry, to get the objects they use from it as well.
+    '''
+
+    def __init__(self, g_vars):
+        self.g_vars = g_vars
+        self.instances = {}
+
+        # Re-entrant: building a service may get the services it uses
+        self.lock = threading.RLock()
+
+    def get(self, service):
+        '''
+        Returns the instance of the service class, building it if necessary
+        '''
+        instance = self.instances.get(service)
+        if instance is not None:
+            return instance
+
+        with self.lock:
+            instance = self.instances.get(service)
+            if instance is None:
+                if "services" in inspect.signature(service).parameters:
+                    instance = service(self.g_vars, services=self)
+                else:
+                    instance = service(self.g_vars)
+                self.instances[service] = instance
+
+        return instance
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+
+from fpms.modules.constants import (
+    DISPLAY_ORIENTATION_NORMAL,
+    PAGE_SLEEP,
+)
+
+# Fields of the application state, with their initial value
+FIELDS = {
+
+    ##################################################
+    # Shared status signals (may be changed anywhere)
+    ##################################################
+    'display_orientation': DISPLAY_ORIENTATION_NORMAL, # Display module orientation
+    'drawing_in_progress': False,      # True when page being painted on screen
+    'shutdown_in_progress': False,     # True when shutdown or reboot started (D-Bus thread)
+    'screen_cleared': False,           # True when display cleared (e.g. screen save)
+    'display_state': 'page',           # current display state: 'page' or 'menu'
+    'sig_fired': False,                # Set to True when button handler fired
+    'option_selected': 0,              # Content of currently selected menu level
+    'current_menu_location': [0],      # Pointer to current location in menu structure
+    'current_scroll_selection': 0,     # where we currently are in scrolling table
+    'current_mode': 'classic',         # Currently selected mode (e.g. classic/server)
+    'start_up': True,                  # True if in initial (home page) start-up state
+    'disable_keys': False,             # Set to true when need to ignore key presses (read by the input threads)
+    'table_list_length': 0,            # Total length of currently displayed table
+    'table_pages': 1,                  # pages in current table
+    'button_press_count': 0,           # global count of button pressses
+    'last_button_press_count': -1,     # copy of count of button pressses used in main loop
+    'pageSleepCountdown': PAGE_SLEEP,  # Set page sleep control
+    'home_page_name': "Home",          # Display name for top level menu
+    'home_page_alternate': False,      # True if in alternate home page state
+    'blinker_status': False,           # Blinker status
+    'blinker_process': None,           # Port blinker process, while blinking
+    'eth_carrier_status': 0,           # Eth0 physical link status
+    'eth_last_reachability_result': False, # Last reachability state (reachability thread)
+    'eth_last_reachability_latency': None, # Last reachability probe latency, secs (reachability thread)
+    'scan_file': '',                   # Location to save scans
+    'scanner_status': False,           # True while a scan runs (scanner thread)
+    'profiler_beaconing': False,       # Indicates if the profiler is running
+    'profiler_last_profile_date': None, # The date of the last profile
+    'timezones_available': [],         # The list of Timezones the system can support
+    'timezone_selected': None,         # The timezone selected from the menu for use in other functions
+
+    ##################################################
+    # Set once at start-up
+    ##################################################
+    'wlanpi_ver': None,                # Version of the WLAN Pi image
+    'canvas': None,                    # Canvas the pages draw on
+    'image': None,                     # Back buffer of the canvas
+    'draw': None,                      # Drawing context of the back buffer
+    'reboot_image': None,              # Shown while rebooting
+    'shutdown_image': None,            # Shown while shutting down
+}
+
+# Fields only set while something is running
+OPTIONAL_FIELDS = [
+    'scanner_scandump_pid',            # Process of the scan saved to PCAP
+]
+
+# Results a page keeps while it is on screen (see result_cache), to page
+# through them without running its commands again
+RESULT_FIELDS = [
+    'about',                           # About page lines
+    'scanner_results',                 # Networks found by the scanner (scanner thread)
+    'speedtest_result_text',           # tablulated speedtest result data
+]
+
+class AppState(object):
+    '''
+    State shared by the main loop, the pages and the background threads
+    (button input, D-Bus, reachability, scanner), in place of a plain dict.
+
+    Fields are slots: misspelt names fail instead of adding keys, and
+    attribute access is cheap. The pages use it as a mapping
+    (state['display_state']), like the dict it replaces.
+
+    Each field is read and written atomically. Fields written together by
+    another thread are written with update() and read with snapshot(), both
+    under the state lock, so that a reader never sees half an update.
+
+    The page results (RESULT_FIELDS) are only kept while the page is on
+    screen: they are dropped when result_cache is reset (the page is left),
+    so they do not pile up over a long uptime.
+    '''
+
+    __slots__ = tuple(FIELDS) + tuple(OPTIONAL_FIELDS) + ('_result_cache', 'results', 'lock')
+
+    def __init__(self, **fields):
+        self.lock = threading.RLock()
+        self.results = {}
+        self._result_cache = False
+
+        for name, value in FIELDS.items():
+            # Copy the mutable defaults (lists), they are changed in place
+            setattr(self, name, list(value) if isinstance(value, list) else value)
+
+        for name, value in fields.items():
+            self[name] = value
+
+    @property
+    def result_cache(self):
+        '''
+        True while the page on screen has its results cached
+        '''
+        return self._result_cache
+
+    @result_cache.setter
+    def result_cache(self, cached):
+        with self.lock:
+            self._result_cache = cached
+            if not cached:
+                self.results.clear()
+
+    def __getitem__(self, name):
+        if name in RESULT_FIELDS:
+            return self.results[name]
+
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __setitem__(self, name, value):
+        if name in RESULT_FIELDS:
+            self.results[name] = value
+            return
+
+        try:
+            setattr(self, name, value)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __delitem__(self, name):
+        if name in RESULT_FIELDS:
+            del self.results[name]
+            return
+
+        try:
+            delattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __contains__(self, name):
+        if name in RESULT_FIELDS:
+            return name in self.results
+        if name == 'result_cache' or name in FIELDS or name in OPTIONAL_FIELDS:
+            return hasattr(self, name)
+        return False
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def update(self, **fields):
+        '''
+        Sets several fields at once, as seen by snapshot()
+        '''
+        with self.lock:
+            for name, value in fields.items():
+                self[name] = value
+
+    def snapshot(self, *names):
+        '''
+        Returns the values of the fields, read together
+        '''
+        with self.lock:
+            return tuple(self.get(name) for name in names)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+sysinfo.py - system metrics read from /proc and /sys
+
+The summary page used to get these from top, free, df and uptime, run
+through the shell on every refresh: hundreds of milliseconds of process
+start-up for a few numbers the kernel exposes as files.
+"""
+
+import glob
+import os
+import threading
+
+class SystemMetrics(object):
+    '''
+    Collects the system summary (CPU usage and load, memory, disk usage,
+    uptime and temperature) from the kernel's files.
+
+    The CPU usage is measured between two calls of cpu_percent(): the
+    first call (with no previous sample) gives the average since boot.
+    '''
+
+    def __init__(self, g_vars=None, proc_dir="/proc", sys_dir="/sys", root="/"):
+        # (g_vars is unused, Services builds every service with it)
+        self.proc_dir = proc_dir
+        self.sys_dir = sys_dir
+        self.root = root
+
+        self.previous_cpu = None
+        self.lock = threading.Lock()
+
+    def read(self, name):
+        with open(os.path.join(self.proc_dir, name)) as f:
+            return f.read()
+
+    def load_average(self):
+        '''
+        Returns the 1, 5 and 15 min load averages
+        '''
+        return tuple(float(value) for value in self.read("loadavg").split()[:3])
+
+    def cpu_times(self):
+        '''
+        Returns the total and idle (idle + iowait) CPU time since boot, in
+        clock ticks
+        '''
+        fields = [int(value) for value in self.read("stat").splitlines()[0].split()[1:]]
+
+        # guest time is counted in user time already
+        total = sum(fields[:8])
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+        return total, idle
+
+    def cpu_percent(self):
+        '''
+        Returns the CPU usage (%) since the previous call
+        '''
+        total, idle = self.cpu_times()
+
+        with self.lock:
+            previous_total, previous_idle = self.previous_cpu or (0, 0)
+            self.previous_cpu = (total, idle)
+
+        elapsed = total - previous_total
+        if elapsed <= 0:
+            return 0.0
+        return 100.0 * (elapsed - (idle - previous_idle)) / elapsed
+
+    def memory(self):
+        '''
+        Returns the used and total memory, in MiB (used is what is not
+        available, as free reports it)
+        '''
+        meminfo = {}
+        for line in self.read("meminfo").splitlines():
+            name, _, value = line.partition(":")
+            meminfo[name] = int(value.split()[0])
+
+        total = meminfo["MemTotal"]
+        available = meminfo.get("MemAvailable", meminfo.get("MemFree", 0))
+        return (total - available) // 1024, total // 1024
+
+    def disk_usage(self):
+        '''
+        Returns the used and total space (bytes) of the root filesystem and
+        the percentage used, as df computes it
+        '''
+        stat = os.statvfs(self.root)
+        total = stat.f_blocks * stat.f_frsize
+        used = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+        available = stat.f_bavail * stat.f_frsize
+
+        percent = 100.0 * used / (used + available) if used + available else 0.0
+        return used, total, percent
+
+    def uptime(self):
+        '''
+        Returns the time since boot (secs)
+        '''
+        return float(self.read("uptime").split()[0])
+
+    def temperature(self):
+        '''
+        Returns the temperature of the hottest thermal zone (°C), or None
+        if there are none
+        '''
+        temperatures = []
+        for path in glob.glob(os.path.join(self.sys_dir, "class/thermal/thermal_zone*/temp")):
+            try:
+                with open(path) as f:
+                    temperatures.append(int(f.read()) / 1000)
+            except (OSError, ValueError):
+                # zone not readable (e.g. sensor powered down)
+                pass
+
+        return max(temperatures) if temperatures else None
+
+def format_uptime(seconds):
+    '''
+    Formats the uptime as uptime -p does, abbreviated: "1w 2d 3h 4m"
+    '''
+    minutes = int(seconds) // 60
+    weeks, minutes = divmod(minutes, 7 * 24 * 60)
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+
+    parts = ["{}{}".format(value, unit)
+        for value, unit in [(weeks, "w"), (days, "d"), (hours, "h")] if value]
+    if minutes or not parts:
+        parts.append("{}m".format(minutes))
+    return " ".join(parts)
@@ -1,17 +1,20 @@
 import fpms.modules.wlanpi_oled as oled
 import os
-import subprocess
 import socket
 import random
 import tzupdate
 import time
+import re
+import math
 
-from PIL import ImageFont
+from fpms.modules import commands
 from fpms.modules.env_utils import EnvUtils
 from fpms.modules.pages.alert import *
 from fpms.modules.pages.display import *
 from fpms.modules.pages.simpletable import *
 from fpms.modules.pages.pagedtable import *
+from fpms.modules.cache import *
+from fpms.modules.sysinfo import SystemMetrics, format_uptime
 from fpms.modules.constants import (
     IMAGE_DIR,
     SMART_FONT,
@@ -19,12 +22,22 @@ from fpms.modules.constants import (
     FONT12,
     FONT13,
     FONTB14,
+    FONTB18,
     TIME_ZONE_FILE,
+    UPDATES_CHECK_TIMEOUT,
+    UPDATES_TTL,
 )
 
 class System(object):
 
-    def __init__(self, g_vars):
+    def __init__(self, g_vars, services=None):
+
+        # results of the commands run for the pages, shared with the
+        # other pages through the service registry
+        self.cache = services.get(ResultCache) if services else ResultCache()
+
+        # system metrics of the summary page (keeps the previous CPU sample)
+        self.metrics = services.get(SystemMetrics) if services else SystemMetrics()
 
         # grab a screeb obj
         self.display_obj = Display(g_vars)
@@ -63,10 +76,6 @@ class System(object):
         Summary page - taken from original bakebit script
         '''
 
-        # The commands here take quite a while to execute, so lock screen early
-        # (normally done by page drawing function)
-        g_vars['drawing_in_progress'] = True
-
         # figure out our IP
         IP = ''
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -81,42 +90,38 @@ class System(object):
 
         ipStr = f"IP: {IP}"
 
-        # determine CPU load
-        cmd = "top -bn1 | grep load | awk '{printf \"CPU Load: %.2f\", $(NF-2)}'"
+        # Read from /proc and /sys: cheap enough to refresh the page every
+        # second, the CPU usage being measured since the previous refresh
+        metrics = self.metrics
+
+        # determine CPU usage and load
         try:
-            CPU = subprocess.check_output(cmd, shell=True).decode()
-        except:
+            CPU = "CPU: {:.0f}% Load: {:.2f}".format(metrics.cpu_percent(), metrics.load_average()[0])
+        except (OSError, ValueError, IndexError):
             CPU = "unknown"
 
         # determine mem useage
-        cmd = "free -m | awk 'NR==2{printf \"Mem: %s/%sMB %.2f%%\", $3,$2,$3*100/$2 }'"
         try:
-            MemUsage = subprocess.check_output(cmd, shell=True).decode()
-        except:
+            used, total = metrics.memory()
+            MemUsage = "Mem: %s/%sMB %.2f%%" % (used, total, used * 100 / total)
+        except (OSError, ValueError, KeyError, ZeroDivisionError):
             MemUsage = "unknown"
 
         # determine disk util
-        cmd = "df -h | awk '$NF==\"/\"{printf \"Disk: %d/%dGB %s\", $3,$2,$5}'"
         try:
-            Disk = subprocess.check_output(cmd, shell=True).decode()
-        except:
+            used, total, percent = metrics.disk_usage()
+            Disk = "Disk: %d/%dGB %d%%" % (used / 1024**3, total / 1024**3, math.ceil(percent))
+        except OSError:
             Disk = "unknown"
 
         # determine temp
-        try:
-            tempI = int(open('/sys/class/thermal/thermal_zone0/temp').read())
-        except:
-            tempI = "unknown"
-
-        if tempI > 1000:
-            tempI = tempI/1000
-        tempStr = "CPU Temp: %sC" % str(round(tempI, 1))
+        temperature = metrics.temperature()
+        tempStr = "CPU Temp: %sC" % (round(temperature, 1) if temperature is not None else "unknown")
 
         # determine uptime
-        cmd = "uptime -p | sed -r 's/up|,//g' | sed -r 's/\s*week[s]?/w/g' | sed -r 's/\s*day[s]?/d/g' | sed -r 's/\s*hour[s]?/h/g' | sed -r 's/\s*minute[s]?/m/g'"
         try:
-            uptime = subprocess.check_output(cmd, shell=True).decode().strip()
-        except:
+            uptime = format_uptime(metrics.uptime())
+        except (OSError, ValueError):
             uptime = "unknown"
 
         uptimeStr = f"Up: {uptime}"
@@ -149,7 +154,7 @@ class System(object):
         if g_vars['result_cache'] == False:
             try:
                 time.tzset()
-                timezone = subprocess.check_output(f"{TIME_ZONE_FILE} get", shell=True).decode()
+                timezone = commands.output([TIME_ZONE_FILE, "get"])
                 g_vars['timezone_selected'] = timezone
             except:
                 pass
@@ -162,7 +167,7 @@ class System(object):
         # Clear display prior to painting new item
         self.display_obj.clear_display(g_vars)
 
-        clock_font = ImageFont.truetype('fonts/DejaVuSansMono-Bold.ttf', 18)
+        clock_font = FONTB18
         margin = 2
 
         # Draw time
@@ -170,7 +175,7 @@ class System(object):
         text_size = clock_font.getbbox(text)
         x = (PAGE_WIDTH - text_size[2])/2
         y = PAGE_HEIGHT/8
-        g_vars['draw'].text((x, y), text, font=clock_font, fill=THEME.text_important_color.value)
+        g_vars['draw'].text((x, y), text, font=clock_font, fill=THEME.text_important_color)
         y = y + text_size[1] + margin
 
         # Draw date
@@ -178,7 +183,7 @@ class System(object):
         text_size = FONT13.getbbox(text)
         x = (PAGE_WIDTH - text_size[2])/2
         y = y + margin * 7
-        g_vars['draw'].text((x, y), text, font=FONT13, fill=THEME.text_color.value)
+        g_vars['draw'].text((x, y), text, font=FONT13, fill=THEME.text_color)
         y = y + text_size[1] + margin
 
         # Draw city
@@ -186,7 +191,7 @@ class System(object):
         text_size = FONT11.getbbox(text)
         x = (PAGE_WIDTH - text_size[2])/2
         y = y + margin * 8
-        g_vars['draw'].text((x, y), text, font=FONT11, fill=THEME.text_secondary_color.value)
+        g_vars['draw'].text((x, y), text, font=FONT11, fill=THEME.text_secondary_color)
         y = y + text_size[1] + margin
 
         # Draw timezone
@@ -194,9 +199,9 @@ class System(object):
         text_size = FONT11.getbbox(text)
         x = (PAGE_WIDTH - text_size[2])/2
         y = y + margin * 6
-        g_vars['draw'].text((x, y), text, font=FONT11, fill=THEME.text_color.value)
+        g_vars['draw'].text((x, y), text, font=FONT11, fill=THEME.text_color)
 
-        oled.drawImage(g_vars['image'])
+        self.display_obj.present(g_vars)
 
         g_vars['display_state'] = 'page'
         g_vars['drawing_in_progress'] = False
@@ -274,33 +279,41 @@ class System(object):
         g_vars["disable_keys"] = False
 
 
-    def check_for_updates(self, g_vars):
+    @cached(UPDATES_TTL)
+    def available_updates(self):
+        '''
+        Returns the list of WLAN Pi packages with an update available
+        '''
+        return self.list_updates()
 
-        if g_vars['result_cache'] == False:
+    def list_updates(self):
+        '''
+        Runs wlanpi-update and returns the WLAN Pi packages it lists, as
+        "package:version"
+        '''
+        output = commands.output(["/usr/bin/wlanpi-update"], timeout=UPDATES_CHECK_TIMEOUT)
+        return [re.sub(r"/.*:", ":", "{}:{}".format(commands.field(line, 1), commands.field(line, 2)))
+            for line in commands.grep(output.splitlines(), "^wlanpi-")]
 
-            self.alert_obj.display_popup_alert(g_vars, "Checking for updates, please wait...")
+    def check_for_updates(self, g_vars):
 
-            updates = ""
-            try:
-                g_vars["disable_keys"] = True
-                output = subprocess.check_output("/usr/bin/wlanpi-update", shell=True).decode()
-                new_packages = subprocess.check_output("echo '" + output + "' | grep ^wlanpi- | awk '{ print $1\":\"$2 }' | sed 's/\/.*:/:/g'", shell=True).decode().strip()
-                if len(new_packages) > 0:
-                    updates = new_packages.split('\n')
-            except:
-                updates = None
-            finally:
-                g_vars["disable_keys"] = False
+        if g_vars['result_cache'] == False and not is_cached(self.available_updates):
+            self.alert_obj.display_popup_alert(g_vars, "Checking for updates, please wait...")
 
-            g_vars['updates'] = updates
-            g_vars['result_cache'] = True
+        try:
+            g_vars["disable_keys"] = True
+            updates = self.available_updates()
+        except:
+            updates = None
+        finally:
+            g_vars["disable_keys"] = False
 
-        updates = g_vars['updates']
+        g_vars['result_cache'] = True
 
         if updates == None:
             self.alert_obj.display_alert_error(g_vars, "Failed to check for updates.", title="Error")
         elif len(updates) > 0:
-            self.simple_table_obj.display_simple_table(g_vars, g_vars['updates'], title="Updates found")
+            self.simple_table_obj.display_simple_table(g_vars, updates, title="Updates found")
         else:
             self.alert_obj.display_alert_info(g_vars, "All WLAN Pi packages are up-to-date.", title="No updates found")
 
@@ -311,12 +324,13 @@ class System(object):
             self.alert_obj.display_popup_alert(g_vars, "Checking for updates, please wait...")
 
             try:
-                output = subprocess.check_output("/usr/bin/wlanpi-update", shell=True).decode()
-                new_packages = subprocess.check_output("echo '" + output + "' | grep ^wlanpi- | awk '{ print $1\":\"$2 }' | sed 's/\/.*:/:/g'", shell=True).decode().strip()
+                new_packages = self.list_updates()
                 try:
                     if len(new_packages) > 0:
                         self.alert_obj.display_popup_alert(g_vars, "Installing updates, please wait...")
-                        subprocess.check_output("/usr/bin/wlanpi-update -u", shell=True).decode().strip()
+                        # (no timeout: killing an install half way would leave dpkg broken)
+                        commands.output(["/usr/bin/wlanpi-update", "-u"], timeout=None)
+                        self.cache.clear(System.available_updates.cache_name)
                         self.alert_obj.display_alert_info(g_vars, "Packages updated successfully.", title="Success")
                     else:
                         self.alert_obj.display_alert_error(g_vars, "Nothing to update.", title="Install updates")
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+"""
+text.py - cached text measurement and rendering
+
+The same strings (menu labels, table titles, status bar text) are measured
+and drawn on every repaint, and each PIL call re-runs the FreeType layout.
+The fonts in constants.py are wrapped in CachedFont, which remembers the
+measurements, and the drawing contexts handed to the pages rasterize each
+string once and paste the cached bitmap afterwards.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw
+
+class LRUCache(object):
+    '''
+    A dict with a maximum size, evicting the least recently used entries.
+    Safe to share between the button and main loop threads.
+    '''
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self.lock:
+            try:
+                value = self.entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+# Rasterized strings shared by all the drawing contexts
+text_cache = LRUCache(maxsize=512)
+
+def native_font(font):
+    '''
+    Returns the PIL font object to hand to the real drawing calls
+    '''
+    return getattr(font, "native", font)
+
+class CachedFont(object):
+    '''
+    Wraps a font (a PIL FreeTypeFont or a ScaledFont), remembering the
+    bounding box and length of the strings measured with it.
+    '''
+
+    def __init__(self, font, maxsize=256):
+        self.metrics = font
+        self.native = native_font(font)
+        self.size = font.size
+        self.cache = LRUCache(maxsize)
+
+    def getbbox(self, text, *args, **kwargs):
+        if args or kwargs:
+            return self.metrics.getbbox(text, *args, **kwargs)
+
+        key = ("bbox", text)
+        bbox = self.cache.get(key)
+        if bbox is None:
+            bbox = self.metrics.getbbox(text)
+            self.cache.put(key, bbox)
+        return bbox
+
+    def getlength(self, text, *args, **kwargs):
+        if args or kwargs:
+            return self.metrics.getlength(text, *args, **kwargs)
+
+        key = ("length", text)
+        length = self.cache.get(key)
+        if length is None:
+            length = self.metrics.getlength(text)
+            self.cache.put(key, length)
+        return length
+
+def render_text(font, text, start):
+    '''
+    Rasterizes the string into an "L" mask, positioned as PIL would draw it
+    at an origin with the given fractional part
+    '''
+    native = native_font(font)
+    bbox = native.getbbox(text)
+    mask = Image.new("L", (max(1, bbox[2] + 2), max(1, bbox[3] + 2)))
+    ImageDraw.Draw(mask).text(start, text, fill=255, font=native)
+    return mask
+
+class CachedDraw(ImageDraw.ImageDraw):
+    '''
+    ImageDraw pasting cached bitmaps for plain single line text drawn with a
+    CachedFont. Anything else is handed over to PIL.
+    '''
+
+    def __init__(self, im, mode=None):
+        super().__init__(im, mode)
+        self.target = im
+
+    def text(self, xy, text, fill=None, font=None, anchor=None, *args, **kwargs):
+        if not isinstance(font, CachedFont) or fill is None or anchor or args or kwargs \
+            or not isinstance(text, str) or "\n" in text or "\r" in text:
+            return super().text(xy, text, fill, native_font(font), anchor, *args, **kwargs)
+
+        # Match PIL: the integer part positions the bitmap, the fractional
+        # part is used when rasterizing
+        x, y = xy
+        start = (math.modf(x)[0], math.modf(y)[0])
+
+        key = (font, text, start)
+        mask = text_cache.get(key)
+        if mask is None:
+            mask = render_text(font, text, start)
+            text_cache.put(key, mask)
+
+        self.target.paste(fill, (int(x), int(y)), mask)
@@ -5,9 +5,11 @@ themes.py - display themes
 """
 
 from enum import Enum
+from PIL import Image, ImageDraw
 from fpms.modules.env_utils import EnvUtils
 from fpms.modules.constants import PLATFORM
 from fpms.modules.platform import *
+from fpms.modules.screen.utils import color_to_rgb565
 
 class BlackAndWhiteTheme(Enum):
     display_background            = "black"
@@ -138,5 +140,65 @@ class DarkTheme(Enum):
     alert_popup_foreground        = "white"
     alert_popup_background        = "#5b616b"
 
+def resolve_color(color):
+    '''
+    Resolves a theme color (a name, "#rrggbb" string or number) to the RGB
+    tuple PIL would draw with it on an RGB image
+    '''
+    if isinstance(color, str) and color.isdigit():
+        color = int(color)
+
+    image = Image.new("RGB", (1, 1))
+    ImageDraw.Draw(image).point((0, 0), fill=color)
+    return image.getpixel((0, 0))
+
+class Colors(object):
+    '''
+    Plain attribute holder for a table of theme colors
+    '''
+    pass
+
+class CompiledTheme(object):
+    '''
+    A theme with every color resolved once to an RGB tuple, so drawing
+    calls neither look up Enum members nor have PIL parse color names.
+    The RGB565 words the SPI panel fills with are in the rgb565 table,
+    e.g. THEME.rgb565.display_background.
+
+    The same object is updated in place by set_theme(), so modules holding
+    a reference to THEME see the new colors.
+    '''
+
+    def __init__(self, theme):
+        self.load(theme)
+
+    def load(self, theme):
+        self.name = theme.__name__
+        self.rgb565 = Colors()
+        # Members sharing a value are aliases in an Enum, so go through
+        # __members__ to get all of them
+        for name, member in theme.__members__.items():
+            color = resolve_color(member.value)
+            setattr(self, name, color)
+            setattr(self.rgb565, name, color_to_rgb565(color))
+
+# Functions called with the theme after a theme change, to rebuild caches
+# that depend on its colors
+theme_change_hooks = []
+
+def on_theme_change(hook):
+    '''
+    Registers a function called with the theme whenever it changes
+    '''
+    theme_change_hooks.append(hook)
+
+def set_theme(theme):
+    '''
+    Switches the display theme and rebuilds everything derived from it
+    '''
+    THEME.load(theme)
+    for hook in theme_change_hooks:
+        hook(THEME)
+
 # Set theme
-THEME = DarkTheme
+THEME = CompiledTheme(DarkTheme)
@@ -2,6 +2,7 @@ import time
 import os
 import subprocess
 import fpms.modules.wlanpi_oled as oled
+from fpms.modules import commands
 import sys
 import tzupdate
 
@@ -54,7 +55,7 @@ class TimeZone(object):
             timezone_selected = g_vars['timezone_selected']
 
             try:
-                alert_msg = subprocess.check_output(f"{TIME_ZONE_FILE} set {timezone_selected}", shell=True).decode()
+                alert_msg = commands.output([TIME_ZONE_FILE, "set", timezone_selected])
                 self.alert_obj.display_alert_info(g_vars, timezone_selected, title="Success")
             except subprocess.CalledProcessError as exc:
                 print(exc)
@@ -74,7 +75,7 @@ class TimeZone(object):
 
             try:
                 timezone = tzupdate.get_timezone("")
-                subprocess.check_output(f"{TIME_ZONE_FILE} set {timezone}", shell=True).decode()
+                commands.output([TIME_ZONE_FILE, "set", timezone])
                 self.alert_obj.display_alert_info(g_vars, timezone, title="Success")
             except:
                 self.alert_obj.display_alert_error(g_vars, "Failed to set timezone.", title="Error")
@@ -2,15 +2,20 @@ import subprocess
 import os.path
 import os
 import time
+import re
 
 from PIL import Image
 
+from fpms.modules import commands
+
 from fpms.modules.pages.alert import *
 from fpms.modules.pages.simpletable import *
 from fpms.modules.pages.pagedtable import *
 from fpms.modules.env_utils import EnvUtils
 from fpms.modules.constants import (
     REACHABILITY_FILE,
+    REACHABILITY_SCRIPT_TIMEOUT,
+    SPEEDTEST_TIMEOUT,
     BLINKER_FILE,
     UFW_FILE,
 )
@@ -45,11 +50,13 @@ class Utils(object):
             self.alert_obj.display_popup_alert(g_vars, "Running...")
 
             speedtest_info = []
-            speedtest_cmd = "/opt/wlanpi/pipx/bin/speedtest-cli --secure | egrep -w \"Testing from|Download|Upload\" | sed -r 's/Testing from.*?\(/My IP: /g; s/\)\.\.\.//g; s/Download/D/g; s/Upload/U/g; s/bit\/s/bps/g'"
-
             try:
-                speedtest_output = subprocess.check_output(speedtest_cmd, shell=True).decode().strip()
-                speedtest_info = speedtest_output.split('\n')
+                speedtest_output = commands.output(["/opt/wlanpi/pipx/bin/speedtest-cli", "--secure"],
+                    timeout=SPEEDTEST_TIMEOUT)
+                for line in commands.grep(speedtest_output.splitlines(), r"\b(Testing from|Download|Upload)\b"):
+                    line = re.sub(r"Testing from.*\(", "My IP: ", line)
+                    line = line.replace(")...", "").replace("Download", "D").replace("Upload", "U")
+                    speedtest_info.append(line.replace("bit/s", "bps"))
             except subprocess.CalledProcessError as exc:
                 output = exc.output.decode()
                 self.alert_obj.display_alert_error(g_vars, output)
@@ -112,8 +119,8 @@ class Utils(object):
         try:
             g_vars['disable_keys'] = True
 
-            reachability_output = subprocess.check_output(
-                REACHABILITY_FILE, shell=True).decode()
+            reachability_output = commands.output([REACHABILITY_FILE],
+                timeout=REACHABILITY_SCRIPT_TIMEOUT)
             reachability_info = reachability_output.split('\n')
 
             if len(reachability_info) == 0:
@@ -146,11 +153,9 @@ class Utils(object):
         if g_vars['result_cache'] == True:
             return
 
-        cmd = "grep -E '^ssid|^wpa_passphrase' /etc/hostapd/hostapd.conf | cut -d '=' -f2"
-
         try:
             data = []
-            ssid, passphrase = subprocess.check_output(cmd, shell=True, stderr=subprocess.DEVNULL).decode().strip().split("\n")
+            ssid, passphrase = EnvUtils().get_hostapd_credentials()
             data.append(ssid.center(21, " "))
             data.append(passphrase.center(21, " "))
         except:
@@ -178,12 +183,13 @@ class Utils(object):
         Return a list of non-Linux USB interfaces found with the lsusb command
         '''
 
-        lsusb = r'/usr/bin/lsusb | /bin/grep -v Linux | /usr/bin/cut -d\  -f7-'
         lsusb_info = []
 
         try:
-            lsusb_output = subprocess.check_output(lsusb, shell=True).decode()
-            lsusb_info = lsusb_output.split('\n')
+            lsusb_output = commands.output(["/usr/bin/lsusb"])
+            # the device names (7th field on), Linux root hubs left out
+            lsusb_info = [" ".join(line.split(" ")[6:]) for line in lsusb_output.splitlines()
+                if "Linux" not in line]
         except subprocess.CalledProcessError as exc:
             output = exc.output.decode()
             #error_descr = "Issue getting usb info using lsusb command"
@@ -227,8 +233,7 @@ class Utils(object):
         if g_vars['result_cache'] == False:
 
             try:
-                ufw_output = subprocess.check_output(
-                    "sudo {} status".format(ufw_file), shell=True).decode()
+                ufw_output = commands.output(["sudo", ufw_file, "status"])
                 ufw_info = ufw_output.split('\n')
                 g_vars['result_cache'] = ufw_info  # cache results
             except Exception as ex:
@@ -1,41 +1,70 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import os
-from PIL import Image
-
 from fpms.modules.constants import (
     DISPLAY_TYPE,
+    DISPLAY_TYPE_HEADLESS,
     DISPLAY_TYPE_ST7735,
     DISPLAY_ORIENTATION_FLIPPED,
     DISPLAY_ORIENTATION_NORMAL
 )
-from fpms.modules.screen.st7735 import ST7735
-from fpms.modules.screen.luma import Luma
+from fpms.modules.screen.renderer import Renderer
 
-# Initialize device based on the display type
-device = ST7735() if DISPLAY_TYPE == DISPLAY_TYPE_ST7735 else Luma()
+# Initialize device based on the display type. The drivers are imported
+# here so a headless run needs none of the hardware libraries.
+if DISPLAY_TYPE == DISPLAY_TYPE_HEADLESS:
+    from fpms.modules.screen.headless import Headless
+    device = Headless()
+elif DISPLAY_TYPE == DISPLAY_TYPE_ST7735:
+    from fpms.modules.screen.st7735 import ST7735
+    device = ST7735()
+else:
+    from fpms.modules.screen.luma import Luma
+    device = Luma()
 orientation = DISPLAY_ORIENTATION_NORMAL
 
-# Initialize the device
+# All access to the device goes through the render thread
+renderer = Renderer(device)
+
+# Count of frames sent to the device, skipped as duplicates and replaced
+# by a newer frame before being sent
+frame_stats = renderer.stats
+
+# Initialize the device and start the render thread
 def init():
     device.init()
+    renderer.start()
+
+# Queue an image to be drawn on the display, set wait to block until it is
+def drawImage(image, wait=False):
+    renderer.draw(image, wait)
+
+# Block until all queued frames and commands have reached the display
+def flush():
+    renderer.flush()
+
+# Set the display orientation, rotation is done by the device itself
+def set_orientation(new_orientation):
+    global orientation
+    orientation = new_orientation
+    renderer.submit(device.set_orientation, orientation == DISPLAY_ORIENTATION_FLIPPED)
+    invalidate()
 
-# Draw an image on the display
-def drawImage(image):
-    if orientation == DISPLAY_ORIENTATION_FLIPPED:
-        device.drawImage(image.transpose(Image.Transpose.ROTATE_180))
-    else:
-        device.drawImage(image)
+# Forget the last frame sent, so the next one is always drawn
+def invalidate():
+    renderer.invalidate(orientation)
 
 # Clear the display
 def clear():
-    device.clear()
+    renderer.submit(device.clear)
+    invalidate()
 
 # Put the display to sleep
 def sleep():
-    device.sleep()
+    renderer.submit(device.sleep)
+    invalidate()
 
 # Wake up the display
 def wakeup():
-    device.wakeup()
+    renderer.submit(device.wakeup)
+    invalidate()
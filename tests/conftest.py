@@ -0,0 +1,5 @@
+import os
+
+# The pages import the display driver: use the headless one so that they can
+# be tested without display hardware or the SPI libraries
+os.environ.setdefault("FPMS_DISPLAY", "headless")
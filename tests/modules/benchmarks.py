@@ -0,0 +1,249 @@
+"""
+Helpers for the render benchmarks (test_benchmarks.py).
+
+Each case paints a page into a Canvas whose output is a Headless screen
+behind a Renderer, the same path the pages take on the device, and records
+the time and memory allocated per frame. The system commands the pages run
+are answered by FakeSystem, so the figures only depend on the drawing code.
+
+Environment:
+    FPMS_BENCH_FRAMES     frames rendered per case (default 20)
+    FPMS_BENCH_BUDGET_MS  maximum median frame time, in ms (default 100)
+    FPMS_BENCH_BASELINE   JSON results of a previous run to compare with
+    FPMS_BENCH_THRESHOLD  slowdown (or allocation growth) allowed over the
+                          baseline, as a ratio (default 1.5)
+    FPMS_BENCH_SAVE       file the results of this run are written to, to
+                          be used as a baseline later
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+from fakes import (
+    FakeNetlinkSocket,
+    address_message,
+    link_message,
+    nl80211_dumps,
+    station_message,
+    wireless_interface_message,
+)
+from fpms.modules import commands, netlink, nl80211
+from fpms.modules.pages.canvas import Canvas
+from fpms.modules.screen.headless import Headless
+from fpms.modules.screen.renderer import Renderer
+from fpms.modules.state import AppState
+from fpms.modules.constants import (
+    DISPLAY_HEIGHT,
+    DISPLAY_MODE,
+    DISPLAY_SCALE,
+    DISPLAY_WIDTH,
+    IFCONFIG_FILE,
+)
+
+BENCH_FRAMES = int(os.environ.get("FPMS_BENCH_FRAMES", "20"))
+BENCH_BUDGET_MS = float(os.environ.get("FPMS_BENCH_BUDGET_MS", "100"))
+BENCH_BASELINE = os.environ.get("FPMS_BENCH_BASELINE", "")
+BENCH_THRESHOLD = float(os.environ.get("FPMS_BENCH_THRESHOLD", "1.5"))
+BENCH_SAVE = os.environ.get("FPMS_BENCH_SAVE", "")
+
+# Frames traced for allocations (tracing slows drawing down, so the frames
+# timed are not traced)
+ALLOCATION_FRAMES = 5
+
+ETHTOOL_OUTPUT = """Settings for eth0:
+\tSpeed: 1000Mb/s
+\tDuplex: Full
+\tLink detected: yes
+"""
+
+BATTERY_STATUS = """POWER_SUPPLY_PRESENT=1
+POWER_SUPPLY_STATUS=Discharging
+POWER_SUPPLY_VOLTAGE_NOW=3900000
+"""
+
+class FakeSystem(object):
+    '''
+    Answers the commands run by the pages with canned output. Commands are
+    matched on a substring of their command line, the first match wins;
+    unmatched commands fail. The network and WLAN interfaces are read from
+    fake netlink sockets (rtnetlink and nl80211). The shell commands left
+    (subprocess) are answered the same way, subprocess.run() succeeding for
+    the commands listed in `succeeding` only.
+    '''
+
+    def __init__(self):
+        self.outputs = [
+            ("ethtool", ETHTOOL_OUTPUT),
+            ("hostname -d", ""),
+            ("hostname", "wlanpi-bench"),
+            ("hciconfig", "hci0:\tType: Primary  Bus: UART\n\tUP RUNNING\n"),
+        ]
+        self.netlink_dumps = {
+            netlink.RTM_GETLINK: [
+                link_message(2, "eth0"),
+                link_message(3, "wlan0"),
+                link_message(4, "wlan1", if_type=netlink.ARPHRD_IEEE80211_RADIOTAP),
+                link_message(5, "usb0", carrier=False),
+            ],
+            netlink.RTM_GETADDR: [
+                address_message(2, "192.168.42.10"),
+                address_message(3, "172.16.0.1"),
+                address_message(5, "169.254.42.1", 16),
+            ],
+        }
+        self.wireless_dumps = nl80211_dumps(
+            [
+                wireless_interface_message(3, "wlan0", 0, nl80211.NL80211_IFTYPE_AP, frequency=5180, ssid="WLAN Pi"),
+                wireless_interface_message(4, "wlan1", 1, nl80211.NL80211_IFTYPE_MONITOR, frequency=2412),
+            ],
+            [station_message(3, "02:00:00:00:00:0{}".format(i)) for i in range(1, 4)])
+        self.succeeding = [
+            f"{IFCONFIG_FILE} wlan",
+            "hciconfig",
+        ]
+
+    def run_command(self, argv, *args, **kwargs):
+        cmd = " ".join(str(arg) for arg in argv)
+        for pattern, output in self.outputs:
+            if pattern in cmd:
+                return commands.CommandResult(argv, 0, output, False, 0.0)
+        return commands.CommandResult(argv, 1, "", False, 0.0)
+
+    def check_output(self, cmd, *args, **kwargs):
+        for pattern, output in self.outputs:
+            if pattern in cmd:
+                return output.encode()
+        raise subprocess.CalledProcessError(1, cmd)
+
+    def run(self, cmd, *args, check=False, **kwargs):
+        returncode = 0 if any(pattern in cmd for pattern in self.succeeding) else 1
+        if check and returncode:
+            raise subprocess.CalledProcessError(returncode, cmd)
+        return subprocess.CompletedProcess(cmd, returncode)
+
+    def open_netlink_socket(self, protocol, groups):
+        if protocol == nl80211.NETLINK_GENERIC:
+            return FakeNetlinkSocket(self.wireless_dumps)
+        return FakeNetlinkSocket(self.netlink_dumps)
+
+    def install(self, monkeypatch, tmp_path):
+        from fpms.modules import battery
+        from fpms.modules.apps.profiler import Profiler
+
+        monkeypatch.setattr(commands, "run", self.run_command)
+        monkeypatch.setattr(netlink, "open_netlink_socket", self.open_netlink_socket)
+        monkeypatch.setattr(subprocess, "check_output", self.check_output)
+        monkeypatch.setattr(subprocess, "run", self.run)
+
+        battery_file = tmp_path / "battery"
+        battery_file.write_text(BATTERY_STATUS)
+        monkeypatch.setattr(battery, "BATTERY_STATUS_FILE", str(battery_file))
+        monkeypatch.setattr(Profiler, "profiler_interface", lambda self: "wlan1")
+
+def headless_g_vars(screen=None):
+    '''
+    Returns the state the pages need, drawing to a headless screen
+    '''
+    if screen is None:
+        screen = Headless()
+    screen.init()
+    renderer = Renderer(screen)
+    canvas = Canvas((DISPLAY_WIDTH, DISPLAY_HEIGHT), DISPLAY_SCALE, DISPLAY_MODE, output=renderer.draw)
+
+    return AppState(
+        canvas=canvas,
+        image=canvas.back,
+        draw=canvas.draw,
+        eth_last_reachability_result=True,
+        eth_last_reachability_latency=0.02,
+    )
+
+def load_baseline():
+    if not BENCH_BASELINE:
+        return {}
+
+    with open(BENCH_BASELINE) as f:
+        return json.load(f)
+
+def save_result(name, result):
+    if not BENCH_SAVE:
+        return
+
+    results = {}
+    if os.path.exists(BENCH_SAVE):
+        with open(BENCH_SAVE) as f:
+            results = json.load(f)
+
+    results[name] = result
+    with open(BENCH_SAVE, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+def measure(render, frames=BENCH_FRAMES):
+    '''
+    Calls render(frame) for each frame and returns the median and worst
+    frame time (ms) and the median peak allocation per frame (KiB). The
+    allocations are those seen by tracemalloc: Python objects, not the pixel
+    buffers PIL allocates itself.
+    '''
+    # Warm up the caches (text, sprites, frame buffers)
+    render(0)
+
+    times = []
+    for frame in range(frames):
+        start = time.perf_counter()
+        render(frame)
+        times.append((time.perf_counter() - start) * 1000)
+
+    allocations = []
+    tracemalloc.start()
+    try:
+        for frame in range(min(frames, ALLOCATION_FRAMES)):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            render(frame)
+            _, peak = tracemalloc.get_traced_memory()
+            allocations.append((peak - current) / 1024)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'frame_ms': statistics.median(times),
+        'max_frame_ms': max(times),
+        'alloc_kib': statistics.median(allocations),
+    }
+
+def check_regression(name, result, baseline=None):
+    '''
+    Returns the list of the limits the result exceeds: the frame budget and,
+    when the case has a baseline, the allowed slowdown or allocation growth
+    '''
+    failures = []
+
+    if result['frame_ms'] > BENCH_BUDGET_MS:
+        failures.append(f"{name}: {result['frame_ms']:.2f} ms per frame, "
+                        f"budget is {BENCH_BUDGET_MS:.2f} ms")
+
+    if baseline:
+        for key in ['frame_ms', 'alloc_kib']:
+            limit = baseline[key] * BENCH_THRESHOLD
+            if result[key] > limit:
+                failures.append(f"{name}: {key} {result[key]:.2f}, "
+                                f"baseline {baseline[key]:.2f} x {BENCH_THRESHOLD}")
+
+    return failures
+
+def benchmark(name, render, frames=BENCH_FRAMES):
+    '''
+    Measures the case, prints its figures and returns the limits exceeded
+    '''
+    result = measure(render, frames)
+    print(f"\n{name} ({DISPLAY_WIDTH}x{DISPLAY_HEIGHT}): "
+          f"{result['frame_ms']:.2f} ms/frame (max {result['max_frame_ms']:.2f} ms), "
+          f"{result['alloc_kib']:.1f} KiB allocated/frame")
+
+    save_result(name, result)
+    return check_regression(name, result, load_baseline().get(name))
@@ -1,3 +1,13 @@
+import errno
+import queue
+import socket
+import struct
+
+from fpms.modules import netlink, nl80211
+
+# Id the fake kernel gives the nl80211 family
+NL80211_FAMILY_ID = 0x1c
+
 class Alert():
     def __init__(self, *args, **kwargs):
         self.args = args
@@ -15,3 +25,145 @@ class SimpleTable():
     def display_simple_table(self, *args, **kwargs):
         self.args = args
         self.kwargs = kwargs
+
+class FakeNetlinkSocket():
+    '''
+    Netlink socket answering requests with canned messages: `dumps` maps a
+    request type (e.g. RTM_GETLINK), or a generic netlink family and
+    command, to the messages of its reply. Requests without a reply fail
+    with ENOENT. Messages fed with feed() are received as if multicast by
+    the kernel.
+    '''
+
+    def __init__(self, dumps=None, timeout=0.05):
+        self.dumps = dumps or {}
+        self.timeout = timeout
+        self.datagrams = queue.Queue()
+        self.requests = []
+        self.memberships = []
+        self.closed = False
+
+    def send(self, data):
+        _, msg_type, flags, seq, _ = netlink.NLMSGHDR.unpack_from(data)
+        self.requests.append((msg_type, data))
+
+        key = (msg_type, data[netlink.NLMSGHDR.size])
+        messages = self.dumps.get(key, self.dumps.get(msg_type))
+        if messages is None:
+            error = struct.pack("=i", -errno.ENOENT) + data[:netlink.NLMSGHDR.size]
+            self.datagrams.put(netlink.pack_message(netlink.NLMSG_ERROR, 0, seq, error))
+            return len(data)
+
+        reply = b"".join(replace_seq(message, seq) for message in messages)
+        if flags & netlink.NLM_F_DUMP:
+            reply += netlink.pack_message(netlink.NLMSG_DONE, netlink.NLM_F_MULTI, seq, b"\0" * 4)
+        self.datagrams.put(reply)
+        return len(data)
+
+    def setsockopt(self, level, option, value):
+        self.memberships.append(value)
+
+    def feed(self, datagram):
+        self.datagrams.put(datagram)
+
+    def recv(self, size):
+        try:
+            datagram = self.datagrams.get(timeout=self.timeout)
+        except queue.Empty:
+            raise socket.timeout("timed out")
+        if isinstance(datagram, Exception):
+            raise datagram
+        return datagram
+
+    def close(self):
+        self.closed = True
+
+def replace_seq(message, seq):
+    '''
+    Returns the netlink message with its sequence number replaced
+    '''
+    return message[:8] + struct.pack("=L", seq) + message[12:]
+
+def link_message(index, name, flags=0x1, carrier=True, if_type=1, msg_type=16):
+    '''
+    Returns a RTM_NEWLINK (or RTM_DELLINK) message for the interface
+    '''
+    payload = netlink.IFINFOMSG.pack(0, if_type, index, flags, 0)
+    payload += netlink.pack_attribute(netlink.IFLA_IFNAME, name.encode() + b"\0")
+    payload += netlink.pack_attribute(netlink.IFLA_CARRIER, bytes([1 if carrier else 0]))
+    return netlink.pack_message(msg_type, 0, 0, payload)
+
+def address_message(index, address, prefixlen=24, msg_type=20):
+    '''
+    Returns a RTM_NEWADDR (or RTM_DELADDR) message for the IP address
+    '''
+    family = socket.AF_INET6 if ":" in address else socket.AF_INET
+    value = socket.inet_pton(family, address)
+    payload = netlink.IFADDRMSG.pack(family, prefixlen, 0, 0, index)
+    payload += netlink.pack_attribute(netlink.IFA_ADDRESS, value)
+    payload += netlink.pack_attribute(netlink.IFA_LOCAL, value)
+    return netlink.pack_message(msg_type, 0, 0, payload)
+
+def genl_message(family, cmd, attributes, flags=netlink.NLM_F_MULTI):
+    '''
+    Returns a generic netlink message of the family, with the attributes
+    (type: value) in order
+    '''
+    payload = nl80211.GENLMSGHDR.pack(cmd, 1, 0)
+    payload += b"".join(netlink.pack_attribute(attr_type, value) for attr_type, value in attributes.items())
+    return netlink.pack_message(family, flags, 0, payload)
+
+def family_message(family_id, name, groups):
+    '''
+    Returns the controller's reply describing a generic netlink family and
+    its multicast groups (name: id)
+    '''
+    mcast_groups = b"".join(
+        netlink.pack_attribute(i + 1,
+            netlink.pack_attribute(nl80211.CTRL_ATTR_MCAST_GRP_ID, struct.pack("=I", group_id)) +
+            netlink.pack_attribute(nl80211.CTRL_ATTR_MCAST_GRP_NAME, group.encode() + b"\0"))
+        for i, (group, group_id) in enumerate(groups.items()))
+    return genl_message(nl80211.GENL_ID_CTRL, 1, {
+        nl80211.CTRL_ATTR_FAMILY_ID: struct.pack("=H", family_id),
+        nl80211.CTRL_ATTR_FAMILY_NAME: name.encode() + b"\0",
+        nl80211.CTRL_ATTR_MCAST_GROUPS: mcast_groups,
+    }, flags=0)
+
+def wireless_interface_message(index, name, phy, if_type, mac="02:00:00:00:00:01", frequency=None, ssid=None,
+        cmd=nl80211.NL80211_CMD_NEW_INTERFACE):
+    '''
+    Returns a NL80211_CMD_NEW_INTERFACE message for the WLAN interface
+    '''
+    attributes = {
+        nl80211.NL80211_ATTR_IFINDEX: struct.pack("=I", index),
+        nl80211.NL80211_ATTR_IFNAME: name.encode() + b"\0",
+        nl80211.NL80211_ATTR_WIPHY: struct.pack("=I", phy),
+        nl80211.NL80211_ATTR_IFTYPE: struct.pack("=I", if_type),
+        nl80211.NL80211_ATTR_MAC: bytes.fromhex(mac.replace(":", "")),
+    }
+    if frequency is not None:
+        attributes[nl80211.NL80211_ATTR_WIPHY_FREQ] = struct.pack("=I", frequency)
+    if ssid is not None:
+        attributes[nl80211.NL80211_ATTR_SSID] = ssid.encode()
+    return genl_message(NL80211_FAMILY_ID, cmd, attributes)
+
+def station_message(index, mac):
+    '''
+    Returns a NL80211_CMD_NEW_STATION message for a client of the interface
+    '''
+    return genl_message(NL80211_FAMILY_ID, nl80211.NL80211_CMD_NEW_STATION, {
+        nl80211.NL80211_ATTR_IFINDEX: struct.pack("=I", index),
+        nl80211.NL80211_ATTR_MAC: bytes.fromhex(mac.replace(":", "")),
+    })
+
+def nl80211_dumps(interfaces, stations=()):
+    '''
+    Returns the dumps of a fake kernel with nl80211: its family, the
+    interfaces and the stations messages
+    '''
+    return {
+        (nl80211.GENL_ID_CTRL, nl80211.CTRL_CMD_GETFAMILY):
+            [family_message(NL80211_FAMILY_ID, "nl80211", {"config": 5, "scan": 6, "mlme": 8})],
+        (NL80211_FAMILY_ID, nl80211.NL80211_CMD_GET_INTERFACE): list(interfaces),
+        (NL80211_FAMILY_ID, nl80211.NL80211_CMD_GET_STATION): list(stations),
+    }
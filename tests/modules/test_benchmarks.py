@@ -0,0 +1,125 @@
+"""
+Render benchmarks. Run with `pytest -s tests/modules/test_benchmarks.py` to
+see the figures; see benchmarks.py for the budget and baseline settings.
+"""
+
+import pytest
+
+from benchmarks import FakeSystem, benchmark, headless_g_vars
+from fpms.modules.nav.menu import MenuTree
+from fpms.modules.pages.alert import Alert
+from fpms.modules.pages.homepage import HomePage
+from fpms.modules.pages.page import Page
+from fpms.modules.pages.pagedtable import PagedTable
+from fpms.modules.pages.simpletable import SimpleTable
+from fpms.modules.screen.headless import Headless
+
+
+def build_menu(depth, width=12):
+    """Returns a menu `depth` levels deep with `width` options per level"""
+    if depth == 0:
+        return lambda g_vars: None
+
+    submenu = build_menu(depth - 1, width)
+    return [{"name": f"Level {depth} option {i}", "action": submenu} for i in range(width)]
+
+
+@pytest.fixture
+def screen():
+    return Headless()
+
+
+@pytest.fixture
+def g_vars(monkeypatch, tmp_path, screen):
+    FakeSystem().install(monkeypatch, tmp_path)
+    return headless_g_vars(screen)
+
+
+@pytest.mark.parametrize("mode", ["classic", "hotspot", "wiperf", "server", "bridge"])
+def test_benchmark_home_page(g_vars, screen, mode):
+    """Measures the home page of each mode"""
+    # Arrange
+    g_vars["current_mode"] = mode
+    home_page = HomePage(g_vars)
+    # Act
+    failures = benchmark(f"home_page[{mode}]", lambda frame: home_page.home_page_pro(g_vars, None))
+    # Assert
+    assert screen.stats["frames"] > 0
+    assert not failures, "\n".join(failures)
+
+
+@pytest.mark.parametrize("depth", [1, 2, 4])
+def test_benchmark_menu_page(g_vars, screen, depth):
+    """Measures a menu page at several depths, moving the selection"""
+    # Arrange
+    menu = MenuTree(build_menu(depth))
+    page = Page(g_vars)
+
+    def render(frame):
+        g_vars["current_menu_location"] = [3] * (depth - 1) + [frame % 12]
+        page.draw_page(g_vars, menu)
+
+    # Act
+    failures = benchmark(f"draw_page[depth {depth}]", render)
+    # Assert
+    assert screen.stats["frames"] > 1
+    assert not failures, "\n".join(failures)
+
+
+def test_benchmark_paged_table(g_vars):
+    """Measures paging through a large list"""
+    # Arrange
+    items = [f"Item {i}: {i * 7919 % 100000}" for i in range(1000)]
+    paged_table = PagedTable(g_vars)
+
+    def render(frame):
+        g_vars["current_scroll_selection"] = frame
+        paged_table.display_list_as_paged_table(g_vars, items, title="Large list")
+
+    # Act
+    failures = benchmark("display_paged_table[1000 items]", render)
+    # Assert
+    assert g_vars["table_pages"] > 100
+    assert not failures, "\n".join(failures)
+
+
+def test_benchmark_simple_table(g_vars, screen):
+    """Measures scrolling a simple table one line at a time"""
+    # Arrange
+    items = [f"Line {i}" for i in range(500)]
+    simple_table = SimpleTable(g_vars)
+
+    def render(frame):
+        g_vars["current_scroll_selection"] = frame
+        simple_table.display_simple_table(g_vars, items, title="Simple table")
+
+    # Act
+    failures = benchmark("display_simple_table[500 items]", render)
+    # Assert
+    assert screen.stats["frames"] > 1
+    assert not failures, "\n".join(failures)
+
+
+def test_benchmark_alert(g_vars, screen):
+    """Measures a full screen alert"""
+    # Arrange
+    alert = Alert(g_vars)
+    # Act
+    failures = benchmark("display_alert_error", lambda frame: alert.display_alert_error(
+        g_vars, "Unable to reach the server, check the Ethernet cable"))
+    # Assert
+    assert screen.stats["frames"] > 0
+    assert not failures, "\n".join(failures)
+
+
+def test_benchmark_popup_alert(g_vars, screen):
+    """Measures a pop-up drawn over the page on screen"""
+    # Arrange
+    alert = Alert(g_vars)
+    Page(g_vars).draw_page(g_vars, MenuTree(build_menu(2)))
+    # Act
+    failures = benchmark("display_popup_alert", lambda frame: alert.display_popup_alert(
+        g_vars, f"Saved {frame} files", delay=0))
+    # Assert
+    assert screen.stats["frames"] > 1
+    assert not failures, "\n".join(failures)
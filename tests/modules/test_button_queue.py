@@ -0,0 +1,73 @@
+from fpms.modules.nav.button_queue import ButtonQueue, KeyRepeater
+
+MS = 1000000
+
+
+def test_navigation_presses_coalesce():
+    """Tests presses queued during a slow render become one step count"""
+    # Arrange
+    queue = ButtonQueue()
+    # Act
+    for i in range(3):
+        queue.push("down", i * MS)
+    queue.push("center", 3 * MS)
+    queue.push("center", 4 * MS)
+    events = queue.drain()
+    # Assert
+    assert [(event.button, event.count) for event in events] == [("down", 3), ("center", 1), ("center", 1)]
+    assert events[0].timestamp_ns == 0
+    assert queue.stats["coalesced"] == 2
+    assert len(queue) == 0
+
+
+def test_queue_is_bounded():
+    """Tests the oldest presses are dropped when the UI falls behind"""
+    # Arrange
+    queue = ButtonQueue(maxsize=2)
+    # Act
+    for button in ["left", "right", "center"]:
+        queue.push(button, 0)
+    # Assert
+    assert [event.button for event in queue.drain()] == ["right", "center"]
+    assert queue.stats["dropped"] == 1
+
+
+def test_ready_callback_fires_when_the_queue_fills():
+    """Tests the UI thread is woken once per batch of presses"""
+    # Arrange
+    wakeups = []
+    queue = ButtonQueue(on_ready=lambda: wakeups.append(True))
+    # Act
+    queue.push("up", 0)
+    queue.push("left", 0)
+    queue.drain()
+    queue.push("right", 0)
+    # Assert
+    assert len(wakeups) == 2
+
+
+def test_held_button_repeats_with_acceleration():
+    """Tests repeats start after the delay and come faster and faster"""
+    # Arrange
+    repeater = KeyRepeater(delay=0.5, interval=0.2, acceleration=0.5, min_interval=0.05)
+    # Act
+    repeater.press("down", 0)
+    early = repeater.due(400 * MS)
+    repeats = repeater.due(1000 * MS)
+    # Assert
+    assert early == []
+    assert [timestamp // MS for button, timestamp in repeats] == [500, 700, 800, 850, 900, 950, 1000]
+    assert repeater.timeout(1000 * MS) == 0.05
+
+
+def test_released_button_stops_repeating():
+    """Tests a released button is not repeated and only navigation repeats"""
+    # Arrange
+    repeater = KeyRepeater(delay=0.5)
+    repeater.press("up", 0)
+    repeater.press("center", 0)
+    # Act
+    repeater.release("up", 100 * MS)
+    # Assert
+    assert repeater.due(2000 * MS) == []
+    assert repeater.timeout(2000 * MS) is None
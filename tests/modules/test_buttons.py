@@ -0,0 +1,57 @@
+import pytest
+
+from benchmarks import FakeSystem, headless_g_vars
+from fpms.modules.nav.buttons import Button
+
+
+def noop():
+    pass
+
+
+MENU = [{"name": f"Option {i}", "action": noop} for i in range(5)]
+
+
+@pytest.fixture
+def g_vars(monkeypatch, tmp_path):
+    FakeSystem().install(monkeypatch, tmp_path)
+    g_vars = headless_g_vars()
+    g_vars["display_state"] = "menu"
+    return g_vars
+
+
+def test_menu_down_moves_several_steps_with_one_draw(g_vars):
+    """Tests coalesced presses move the selection by their count, wrapping"""
+    # Arrange
+    g_vars["current_menu_location"] = [3]
+    button = Button(g_vars, MENU)
+    # Act
+    button.menu_down(g_vars, MENU, steps=3)
+    # Assert
+    assert g_vars["current_menu_location"] == [1]
+    assert g_vars["canvas"].stats["presented"] == 1
+
+
+def test_menu_up_moves_several_steps(g_vars):
+    """Tests moving up past the first item wraps to the end of the list"""
+    # Arrange
+    g_vars["current_menu_location"] = [1]
+    button = Button(g_vars, MENU)
+    # Act
+    button.menu_up(g_vars, MENU, steps=2)
+    # Assert
+    assert g_vars["current_menu_location"] == [4]
+
+
+def test_table_scroll_stops_at_the_last_page(g_vars):
+    """Tests scrolling a table by a step count stays within its pages"""
+    # Arrange
+    g_vars["display_state"] = "page"
+    g_vars["current_menu_location"] = [0, 1]
+    g_vars["table_pages"] = 4
+    g_vars["current_scroll_selection"] = 1
+    g_vars["option_selected"] = noop
+    button = Button(g_vars, MENU)
+    # Act
+    button.menu_down(g_vars, MENU, steps=5)
+    # Assert
+    assert g_vars["current_scroll_selection"] == 3
@@ -0,0 +1,153 @@
+import threading
+
+import pytest
+
+from fpms.modules.cache import (
+    INVALIDATE_INTERFACES,
+    INVALIDATE_MODE,
+    ResultCache,
+    cached,
+    is_cached,
+)
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Provider(object):
+    def __init__(self, cache):
+        self.cache = cache
+        self.calls = 0
+
+    @cached(30, invalidated_by=[INVALIDATE_INTERFACES])
+    def addresses(self, interface):
+        self.calls += 1
+        return [f"{interface} {self.calls}"]
+
+
+def test_results_are_fetched_once_within_the_ttl():
+    """Tests a second call within the TTL is a hit"""
+    # Arrange
+    clock = Clock()
+    provider = Provider(ResultCache(clock=clock))
+    # Act
+    first = provider.addresses("eth0")
+    clock.now += 29
+    second = provider.addresses("eth0")
+    # Assert
+    assert first == second == ["eth0 1"]
+    assert provider.cache.stats["misses"] == 1
+    assert provider.cache.stats["hits"] == 1
+
+
+def test_results_are_cached_by_arguments():
+    """Tests each set of arguments has its own result"""
+    # Arrange
+    provider = Provider(ResultCache())
+    # Act
+    provider.addresses("eth0")
+    # Assert
+    assert is_cached(provider.addresses, "eth0")
+    assert not is_cached(provider.addresses, "wlan0")
+
+
+def test_stale_results_are_returned_while_refreshed():
+    """Tests an expired result is shown while a new one is fetched in the background"""
+    # Arrange
+    clock = Clock()
+    cache = ResultCache(clock=clock)
+    provider = Provider(cache)
+    refreshed = threading.Event()
+    cache.on_refresh(lambda key: refreshed.set())
+    provider.addresses("eth0")
+    clock.now += 31
+    # Act
+    stale = provider.addresses("eth0")
+    assert refreshed.wait(timeout=5)
+    fresh = provider.addresses("eth0")
+    # Assert
+    assert stale == ["eth0 1"]
+    assert fresh == ["eth0 2"]
+    assert cache.stats["stale"] == 1
+    assert cache.stats["refreshes"] == 1
+
+
+def test_results_too_old_are_fetched_again():
+    """Tests a result far past its TTL is not shown"""
+    # Arrange
+    clock = Clock()
+    provider = Provider(ResultCache(clock=clock))
+    provider.addresses("eth0")
+    clock.now += 3000
+    # Act
+    result = provider.addresses("eth0")
+    # Assert
+    assert result == ["eth0 2"]
+
+
+def test_refresh_does_not_replace_a_result_fetched_after_invalidation():
+    """Tests a refresh started before an invalidation does not overwrite the result fetched after it"""
+    # Arrange
+    clock = Clock()
+    cache = ResultCache(clock=clock)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_fetch():
+        started.set()
+        release.wait(timeout=5)
+        return "fetched-before-mode-change"
+
+    cache.get("wlans", lambda: "first", 10, invalidated_by=[INVALIDATE_MODE])
+    clock.now += 11
+    cache.get("wlans", slow_fetch, 10, invalidated_by=[INVALIDATE_MODE])
+    assert started.wait(timeout=5)
+    # Act
+    cache.invalidate(INVALIDATE_MODE)
+    after = cache.get("wlans", lambda: "fetched-after-mode-change", 10, invalidated_by=[INVALIDATE_MODE])
+    refresh = [thread for thread in threading.enumerate() if thread.name == "cache-refresh"]
+    release.set()
+    for thread in refresh:
+        thread.join(timeout=5)
+    cached = cache.get("wlans", lambda: "fetched-again", 10, invalidated_by=[INVALIDATE_MODE])
+    # Assert
+    assert after == cached == "fetched-after-mode-change"
+    assert cache.stats["refreshes"] == 0
+
+
+def test_invalidation_drops_dependent_results_only():
+    """Tests an event drops the results invalidated by it"""
+    # Arrange
+    cache = ResultCache()
+    provider = Provider(cache)
+    provider.addresses("eth0")
+    cache.get("updates", lambda: [], 3600)
+    # Act
+    cache.invalidate(INVALIDATE_MODE)
+    kept = is_cached(provider.addresses, "eth0")
+    cache.invalidate(INVALIDATE_INTERFACES)
+    # Assert
+    assert kept
+    assert not is_cached(provider.addresses, "eth0")
+    assert cache.contains("updates")
+    assert cache.stats["invalidated"] == 1
+
+
+def test_failures_are_not_cached():
+    """Tests an exception from the provider is passed on and not cached"""
+    # Arrange
+    cache = ResultCache()
+
+    def fail():
+        raise OSError("command failed")
+
+    # Act
+    with pytest.raises(OSError):
+        cache.get("publicip", fail, 300)
+    # Assert
+    assert not cache.contains("publicip")
@@ -0,0 +1,88 @@
+from PIL import Image
+
+from fpms.modules.pages.canvas import Canvas
+from fpms.modules.screen.renderer import Renderer
+
+
+class FakeDevice:
+    """Keeps the frames drawn on the panel"""
+
+    def __init__(self):
+        self.frames = []
+
+    def drawImage(self, image):
+        self.frames.append(image.copy())
+
+
+def test_present_publishes_the_back_buffer():
+    """Tests presenting sends the painted frame and keeps the back buffer"""
+    # Arrange
+    sent = []
+    canvas = Canvas((128, 128), output=lambda image, wait: sent.append(image.copy()))
+    # Act
+    canvas.draw.rectangle((0, 0, 10, 10), fill="white")
+    canvas.present()
+    # Assert
+    assert sent[0].getbbox() == (0, 0, 11, 11)
+    assert canvas.back.getbbox() == (0, 0, 11, 11)
+    assert canvas.snapshot().getbbox() == (0, 0, 11, 11)
+
+
+def test_drawing_after_present_does_not_touch_the_front_buffer():
+    """Tests a half painted page is never seen by readers of the front"""
+    # Arrange
+    canvas = Canvas((128, 128))
+    canvas.present()
+    # Act
+    canvas.draw.rectangle((0, 0, 10, 10), fill="white")
+    # Assert
+    assert canvas.snapshot().getbbox() is None
+
+
+def test_restore_discards_partial_drawing():
+    """Tests a pop-up can start from the frame currently on screen"""
+    # Arrange
+    canvas = Canvas((128, 128))
+    canvas.draw.rectangle((0, 0, 10, 10), fill="white")
+    canvas.present()
+    canvas.draw.rectangle((50, 50, 60, 60), fill="white")
+    # Act
+    canvas.restore()
+    # Assert
+    assert canvas.back.getbbox() == (0, 0, 11, 11)
+
+
+def test_buffers_are_reused_between_frames():
+    """Tests presenting does not allocate new frame buffers"""
+    # Arrange
+    canvas = Canvas((128, 128))
+    back, front, draw = canvas.back, canvas.front, canvas.draw
+    # Act
+    for i in range(5):
+        canvas.draw.rectangle((i, i, i + 1, i + 1), fill="white")
+        canvas.present()
+    # Assert
+    assert (canvas.back, canvas.front, canvas.draw) == (back, front, draw)
+    assert canvas.stats["presented"] == 5
+
+
+def test_benchmark_present_throughput():
+    """
+    Measures the frames per second the page layer can hand to the render
+    thread. Run with `pytest -s` to see the figures.
+    """
+    # Arrange
+    device = FakeDevice()
+    renderer = Renderer(device)
+    renderer.start()
+    canvas = Canvas((240, 240), scale=240 / 128, output=renderer.draw)
+    # Act
+    for i in range(200):
+        canvas.draw.rectangle((0, 0, 128, 128), fill=(i, 0, 0))
+        canvas.present()
+    renderer.flush()
+    # Assert
+    print(f"\nCanvas 240x240: {canvas.throughput():.0f} fps presented, "
+          f"{renderer.stats['sent']} sent, {renderer.stats['coalesced']} coalesced")
+    assert renderer.stats["sent"] + renderer.stats["coalesced"] == 200
+    assert device.frames[-1].getpixel((0, 0)) == (199, 0, 0)
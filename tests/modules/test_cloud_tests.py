@@ -1,6 +1,25 @@
 import pytest
 import sys
 
+from fpms.modules import commands
+from fpms.modules.constants import CLOUD_TEST_TIMEOUT, ETHTOOL_FILE
+
+ETHTOOL_ARGV = (ETHTOOL_FILE, "eth0")
+IP_ARGV = ("ip", "address", "show", "eth0")
+CURL_ARGV = ("curl", "-k", "-s", "--max-time", str(CLOUD_TEST_TIMEOUT),
+    "-o", "/dev/null", "-w", "%{http_code}", "https://ep-terminator.mistsys.net/test")
+
+
+def ethtool_output(link):
+    return "Settings for eth0:\n\tSpeed: 1000Mb/s\n\tDuplex: Full\n\tLink detected: {}\n".format(link)
+
+
+def ip_output(address):
+    inet = "    inet {}/24 brd 192.0.2.255 scope global eth0\n".format(address) if address else ""
+    return ("2: eth0: <BROADCAST,MULTICAST,UP,LOWER_UP> mtu 1500 state UP\n"
+        "    link/ether dc:a6:32:01:02:03 brd ff:ff:ff:ff:ff:ff\n" + inet +
+        "    inet6 fe80::dea6:32ff:fe01:203/64 scope link\n")
+
 
 @pytest.fixture
 def patch_imports():
@@ -8,6 +27,24 @@ def patch_imports():
     sys.modules["fpms.modules.pages.simpletable"] = __import__("fakes")
 
 
+def fake_commands(monkeypatch, outputs):
+    """
+    Answers the commands whose argv is in outputs with the output given,
+    unlisted commands fail. Returns the argv lists run, with their timeouts.
+    """
+    calls = []
+
+    def faked_run(argv, timeout=commands.COMMAND_TIMEOUT, **kwargs):
+        argv = tuple(str(arg) for arg in argv)
+        calls.append((argv, timeout))
+        if argv in outputs:
+            return commands.CommandResult(list(argv), 0, outputs[argv], False, 0.0)
+        return commands.CommandResult(list(argv), 1, "", False, 0.0)
+
+    monkeypatch.setattr(commands, "run", faked_run)
+    return calls
+
+
 def test_test_mist_cloud_cached(patch_imports):
     """Tests the fall through if the results cached value is true"""
     # Arrange
@@ -37,25 +74,17 @@ def test_test_mist_cloud_all_checks_pass(patch_imports, monkeypatch):
     test_return_code = {"set": "200", "expected": "HTTP: OK"}
     test_socket = {"set": True, "expected": "DNS: OK"}
 
-    def faked_eth0(*args, **kwargs):
-        if args[0] == "/sbin/ethtool eth0 | grep 'Link detected'| awk '{print $3}'":
-            return test_link_state["set"].encode("utf-8")
-        if (
-            args[0]
-            == "ip address show eth0 | grep 'inet ' | awk '{print $2}' | awk -F'/' '{print $1}'"
-        ):
-            return test_ip["set"].encode("utf-8")
-        if (
-            args[0]
-            == 'curl -k -s -o /dev/null -w "%{http_code}" https://ep-terminator.mistsys.net/test'
-        ):
-            return test_return_code["set"].encode("utf-8")
+    outputs = {
+        ETHTOOL_ARGV: ethtool_output(test_link_state["set"]),
+        IP_ARGV: ip_output(test_ip["set"]),
+        CURL_ARGV: test_return_code["set"],
+    }
 
     def faked_socket(*args, **kwargs):
         if args[0] == "ep-terminator.mistsys.net":
             test_socket["set"]
 
-    monkeypatch.setattr("subprocess.check_output", faked_eth0)
+    calls = fake_commands(monkeypatch, outputs)
     monkeypatch.setattr("socket.gethostbyname", faked_socket)
 
     # Act
@@ -72,6 +101,12 @@ def test_test_mist_cloud_all_checks_pass(patch_imports, monkeypatch):
         ],
     )
     assert test_object.simple_table_obj.kwargs == {"title": "Mist Cloud"}
+    # run without a shell, the probe bounded by a timeout
+    assert calls == [
+        (ETHTOOL_ARGV, commands.COMMAND_TIMEOUT),
+        (IP_ARGV, commands.COMMAND_TIMEOUT),
+        (CURL_ARGV, CLOUD_TEST_TIMEOUT),
+    ]
 
 
 @pytest.mark.parametrize(
@@ -85,11 +120,9 @@ def test_test_mist_cloud_eth0_down(patch_imports, monkeypatch, nic_state):
     test_g_vars = {"result_cache": False}
     test_link_state = {"set": nic_state[0], "expected": nic_state[1]}
 
-    def faked_eth0(*args, **kwargs):
-        if args[0] == "/sbin/ethtool eth0 | grep 'Link detected'| awk '{print $3}'":
-            return test_link_state["set"].encode("utf-8")
+    outputs = {ETHTOOL_ARGV: ethtool_output(test_link_state["set"])}
 
-    monkeypatch.setattr("subprocess.check_output", faked_eth0)
+    fake_commands(monkeypatch, outputs)
 
     # Act
     test_object = CloudUtils(g_vars=test_g_vars)
@@ -111,16 +144,12 @@ def test_test_mist_cloud_eth0_up_no_ip(patch_imports, monkeypatch):
     test_link_state = {"set": "yes", "expected": "Eth0 Port Up: YES"}
     test_ip = {"set": "", "expected": "MyIP: None"}
 
-    def faked_eth0(*args, **kwargs):
-        if args[0] == "/sbin/ethtool eth0 | grep 'Link detected'| awk '{print $3}'":
-            return test_link_state["set"].encode("utf-8")
-        if (
-            args[0]
-            == "ip address show eth0 | grep 'inet ' | awk '{print $2}' | awk -F'/' '{print $1}'"
-        ):
-            return test_ip["set"].encode("utf-8")
+    outputs = {
+        ETHTOOL_ARGV: ethtool_output(test_link_state["set"]),
+        IP_ARGV: ip_output(test_ip["set"]),
+    }
 
-    monkeypatch.setattr("subprocess.check_output", faked_eth0)
+    fake_commands(monkeypatch, outputs)
 
     # Act
     test_object = CloudUtils(g_vars=test_g_vars)
@@ -148,20 +177,16 @@ def test_test_mist_cloud_eth0_up_has_ip_no_dns(patch_imports, monkeypatch):
     test_ip = {"set": "192.0.2.1", "expected": "MyIP: 192.0.2.1"}
     test_socket = {"expected": "DNS: FAIL"}
 
-    def faked_eth0(*args, **kwargs):
-        if args[0] == "/sbin/ethtool eth0 | grep 'Link detected'| awk '{print $3}'":
-            return test_link_state["set"].encode("utf-8")
-        if (
-            args[0]
-            == "ip address show eth0 | grep 'inet ' | awk '{print $2}' | awk -F'/' '{print $1}'"
-        ):
-            return test_ip["set"].encode("utf-8")
+    outputs = {
+        ETHTOOL_ARGV: ethtool_output(test_link_state["set"]),
+        IP_ARGV: ip_output(test_ip["set"]),
+    }
 
     def faked_socket(*args, **kwargs):
         if args[0] == "ep-terminator.mistsys.net":
             raise Exception
 
-    monkeypatch.setattr("subprocess.check_output", faked_eth0)
+    fake_commands(monkeypatch, outputs)
     monkeypatch.setattr("socket.gethostbyname", faked_socket)
 
     # Act
@@ -191,25 +216,17 @@ def test_test_mist_cloud_eth0_up_has_ip_has_dns_no_200(patch_imports, monkeypatc
     test_return_code = {"set": "418", "expected": "HTTP: FAIL"}
     test_socket = {"set": True, "expected": "DNS: OK"}
 
-    def faked_eth0(*args, **kwargs):
-        if args[0] == "/sbin/ethtool eth0 | grep 'Link detected'| awk '{print $3}'":
-            return test_link_state["set"].encode("utf-8")
-        if (
-            args[0]
-            == "ip address show eth0 | grep 'inet ' | awk '{print $2}' | awk -F'/' '{print $1}'"
-        ):
-            return test_ip["set"].encode("utf-8")
-        if (
-            args[0]
-            == 'curl -k -s -o /dev/null -w "%{http_code}" https://ep-terminator.mistsys.net/test'
-        ):
-            return test_return_code["set"].encode("utf-8")
+    outputs = {
+        ETHTOOL_ARGV: ethtool_output(test_link_state["set"]),
+        IP_ARGV: ip_output(test_ip["set"]),
+        CURL_ARGV: test_return_code["set"],
+    }
 
     def faked_socket(*args, **kwargs):
         if args[0] == "ep-terminator.mistsys.net":
             test_socket["set"]
 
-    monkeypatch.setattr("subprocess.check_output", faked_eth0)
+    fake_commands(monkeypatch, outputs)
     monkeypatch.setattr("socket.gethostbyname", faked_socket)
 
     # Act
@@ -226,3 +243,34 @@ def test_test_mist_cloud_eth0_up_has_ip_has_dns_no_200(patch_imports, monkeypatc
         ],
     )
     assert test_object.simple_table_obj.kwargs == {"title": "Mist Cloud"}
+
+
+def test_test_mist_cloud_http_probe_times_out(patch_imports, monkeypatch):
+    """Tests a probe getting no response fails the test instead of raising"""
+    # Arrange
+    from fpms.modules.cloud_tests import CloudUtils
+
+    test_g_vars = {"result_cache": False}
+    outputs = {
+        ETHTOOL_ARGV: ethtool_output("yes"),
+        IP_ARGV: ip_output("192.0.2.1"),
+    }
+    fake_commands(monkeypatch, outputs)
+    monkeypatch.setattr("socket.gethostbyname", lambda host: "192.0.2.2")
+    real_run = commands.run
+
+    def timed_out_curl(argv, **kwargs):
+        if argv[0] == "curl":
+            return commands.CommandResult(argv, None, "", False, CLOUD_TEST_TIMEOUT)
+        return real_run(argv, **kwargs)
+
+    monkeypatch.setattr(commands, "run", timed_out_curl)
+
+    # Act
+    test_object = CloudUtils(g_vars=test_g_vars)
+    test_object.test_mist_cloud(test_g_vars)
+    # Assert
+    assert test_object.simple_table_obj.args == (
+        {"result_cache": True, "disable_keys": False},
+        ["Eth0 Port Up: YES", "MyIP: 192.0.2.1", "DNS: OK", "HTTP: FAIL"],
+    )
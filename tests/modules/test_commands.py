@@ -0,0 +1,123 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+from fpms.modules import commands
+from fpms.modules.processes import pid_alive
+
+
+def test_runs_argv_without_a_shell():
+    """Tests arguments are passed as they are, not interpreted by a shell"""
+    # Arrange
+    argv = ["echo", "wlan0 | grep $HOME; true"]
+    # Act
+    result = commands.run(argv)
+    # Assert
+    assert result.ok
+    assert result.stdout == "wlan0 | grep $HOME; true\n"
+    assert not result.truncated
+
+
+def test_output_raises_on_failure():
+    """Tests a failing or missing command raises a CalledProcessError, as the pages expect"""
+    # Act / Assert
+    with pytest.raises(subprocess.CalledProcessError) as exc:
+        commands.output(["false"])
+    assert exc.value.returncode == 1
+
+    with pytest.raises(commands.CommandError) as exc:
+        commands.output(["/nonexistent/command"])
+    assert exc.value.returncode == 127
+
+
+def test_hung_command_is_killed():
+    """Tests a command running past its timeout is killed and reported as timed out"""
+    # Act
+    result = commands.run(["sleep", "10"], timeout=0.2)
+    # Assert
+    assert result.returncode is None
+    assert result.elapsed < 5
+
+    with pytest.raises(commands.CommandError) as exc:
+        commands.output(["sleep", "10"], timeout=0.2)
+    assert exc.value.timed_out
+
+
+def test_children_of_a_hung_command_are_killed():
+    """Tests the processes a timed out command started are killed with it, not left holding its output"""
+    # Arrange
+    script = "sleep 10 & echo $!; wait"
+    # Act
+    result = commands.run(["sh", "-c", script], timeout=0.5)
+    # Assert
+    assert result.returncode is None
+    assert result.elapsed < 5
+    child = int(result.stdout.split()[0])
+    # (SIGKILL is delivered asynchronously)
+    deadline = time.monotonic() + 2
+    while pid_alive(child) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not pid_alive(child)
+
+
+def test_no_timeout():
+    """Tests a command given no timeout runs to completion"""
+    # Act
+    result = commands.run(["sh", "-c", "sleep 0.3; echo done"], timeout=None)
+    # Assert
+    assert result.ok
+    assert result.stdout == "done\n"
+
+
+def test_output_is_capped():
+    """Tests output past the maximum is discarded, the command still running to the end"""
+    # Arrange
+    argv = [sys.executable, "-c", "print('x' * 100000)"]
+    # Act
+    result = commands.run(argv, max_output=1000)
+    # Assert
+    assert result.ok
+    assert len(result.stdout) == 1000
+    assert result.truncated
+
+
+def test_stderr_is_captured_on_request():
+    """Tests standard error is only kept with the output when asked for (as 2>&1)"""
+    # Arrange
+    argv = [sys.executable, "-c", "import sys; sys.stderr.write('nl80211 not found')"]
+    # Act
+    discarded = commands.run(argv)
+    captured = commands.run(argv, stderr=True)
+    # Assert
+    assert discarded.stdout == ""
+    assert captured.stdout == "nl80211 not found"
+
+
+def test_time_is_recorded_by_command():
+    """Tests calls, failures and timings are recorded for each executable"""
+    # Arrange
+    commands.stats.pop("true", None)
+    commands.stats.pop("false", None)
+    # Act
+    commands.run(["/bin/true"])
+    commands.run(["true"])
+    commands.run(["false"])
+    # Assert
+    assert commands.stats["true"]["calls"] == 2
+    assert commands.stats["true"]["failures"] == 0
+    assert commands.stats["false"]["failures"] == 1
+    assert commands.stats["true"]["max_time"] <= commands.stats["true"]["time"]
+
+
+def test_filters_replace_the_pipelines():
+    """Tests grep and field pick out lines and fields like grep and awk"""
+    # Arrange
+    lines = ["phy#0", "\tInterface wlan0", "\t\ttype managed", "\tinterface wlan1"]
+    # Act
+    interfaces = [commands.field(line, 2) for line in commands.grep(lines, "interface", ignore_case=True)]
+    # Assert
+    assert interfaces == ["wlan0", "wlan1"]
+    assert commands.field("ssid=WLAN Pi", 2, "=") == "WLAN Pi"
+    assert commands.field("phy#0", 3) == ""
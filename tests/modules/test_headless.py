@@ -0,0 +1,48 @@
+from PIL import Image, ImageDraw
+
+from fpms.modules.screen.headless import Headless
+
+
+def test_frames_are_kept_in_a_ring():
+    """Tests only the most recent frames are kept in memory"""
+    # Arrange
+    screen = Headless(ring_size=2)
+    screen.init()
+    # Act
+    for colour in ["red", "green", "blue"]:
+        screen.drawImage(Image.new("RGB", (128, 128), colour))
+    # Assert
+    assert [frame.getpixel((0, 0)) for frame in screen.frames] == [(0, 128, 0), (0, 0, 255)]
+    assert screen.stats["frames"] == 3
+
+
+def test_bytes_count_only_changed_regions():
+    """Tests the byte count models the partial refresh of the real drivers"""
+    # Arrange
+    screen = Headless()
+    screen.init()
+    image = Image.new("RGB", (128, 128))
+    screen.drawImage(image)
+    # Act
+    ImageDraw.Draw(image).rectangle((0, 0, 9, 9), fill="white")
+    screen.drawImage(image)
+    screen.drawImage(image)
+    # Assert
+    assert screen.stats["bytes"] == 128 * 128 * 2 + 10 * 10 * 2
+    assert screen.stats["frames"] == 2
+    assert screen.stats["draw_time"] > 0
+
+
+def test_frames_are_written_to_files(tmp_path):
+    """Tests frames can be saved as PNG or raw RGB565"""
+    # Arrange
+    png = Headless(directory=str(tmp_path / "png"))
+    raw = Headless(directory=str(tmp_path / "raw"), format="raw")
+    png.init()
+    raw.init()
+    # Act
+    png.drawImage(Image.new("RGB", (128, 128), "white"))
+    raw.drawImage(Image.new("RGB", (128, 128), "white"))
+    # Assert
+    assert Image.open(tmp_path / "png" / "frame_000000.png").getpixel((0, 0)) == (255, 255, 255)
+    assert (tmp_path / "raw" / "frame_000000.raw").read_bytes() == b"\xff\xff" * 128 * 128
@@ -0,0 +1,71 @@
+from fpms.modules.nav.menu import MenuTree
+
+
+def action():
+    pass
+
+
+MENU = [
+    {"name": "Network", "action": [
+        {"name": "Interfaces", "action": action},
+        {"name": "LLDP Neighbour", "action": action},
+    ]},
+    {"name": "A very long submenu name", "action": [
+        {"name": "Confirm", "action": action},
+    ]},
+    {"name": "About", "action": action},
+]
+
+
+def test_nodes_are_linked_and_indexed_by_location():
+    """Tests a location resolves to its node without walking the menu"""
+    # Arrange
+    tree = MenuTree(MENU)
+    # Act
+    node = tree.node([0, 1])
+    # Assert
+    assert node.name == "LLDP Neighbour"
+    assert node.parent.name == "Network"
+    assert node.previous.name == "Interfaces"
+    assert node.next is None
+    assert tree.node([0, 2]) is None
+
+
+def test_labels_are_precomputed():
+    """Tests sub-menu labels are shortened as the menu page draws them"""
+    # Arrange
+    tree = MenuTree(MENU)
+    # Act
+    node = tree.node([1])
+    # Assert
+    assert node.submenu
+    assert node.label == "A very long su.."
+    assert node.selected_label == "A very long s.."
+    assert node.title == "A VERY LONG S.."
+    assert tree.node([2]).label == "About"
+
+
+def test_resolve_wraps_past_the_end_of_a_list():
+    """Tests moving off the end of a list goes back to its first item"""
+    # Arrange
+    tree = MenuTree(MENU)
+    location = [0, 2]
+    # Act
+    node = tree.resolve(location)
+    # Assert
+    assert node.name == "Interfaces"
+    assert location == [0, 0]
+
+
+def test_shortcuts_are_looked_up_by_name():
+    """Tests shortcuts give the location, plus the action for a page"""
+    # Arrange
+    tree = MenuTree(MENU)
+    # Act
+    page = tree.shortcut(["Network", "LLDP Neighbour"])
+    submenu = tree.shortcut(["Network"])
+    missing = tree.shortcut(["Network", "Routes"])
+    # Assert
+    assert page == [0, 1, action]
+    assert submenu == [0]
+    assert missing == []
@@ -0,0 +1,151 @@
+import errno
+import threading
+
+from fakes import FakeNetlinkSocket, address_message, link_message
+from fpms.modules import netlink
+from fpms.modules.netlink import InterfaceMonitor, InterfaceTable, parse_messages
+
+# RTM_NEWADDR for 192.0.2.2/24 on eth0 (index 4), as sent by the kernel
+RECORDED_NEWADDR = bytes.fromhex(
+    "58000000140002000000000000000000021880000400000008000100c0000202"
+    "08000200c000020208000400c00002ff090003006574683000000000080008008000"
+    "000014000600ffffffffffffffff0c0000000c000000")
+
+
+def fake_monitor(sock):
+    return InterfaceMonitor(open_socket=lambda protocol, groups: sock)
+
+
+def dumps():
+    return {
+        netlink.RTM_GETLINK: [link_message(1, "lo"), link_message(4, "eth0", carrier=False)],
+        netlink.RTM_GETADDR: [address_message(1, "127.0.0.1", 8), RECORDED_NEWADDR],
+    }
+
+
+def test_table_is_built_from_recorded_messages():
+    """Tests links and addresses from the kernel's messages end up in the table"""
+    # Arrange
+    table = InterfaceTable()
+    # Act
+    for data in [link_message(4, "eth0"), RECORDED_NEWADDR]:
+        for msg_type, _, _, payload in parse_messages(data):
+            table.apply(msg_type, payload)
+    # Assert
+    eth0 = table.interfaces[4]
+    assert eth0.name == "eth0"
+    assert eth0.up and eth0.carrier
+    assert eth0.ipv4_addresses() == ["192.0.2.2"]
+
+
+def test_snapshot_loads_the_table_on_demand():
+    """Tests the pages can read the interfaces before the monitor is started"""
+    # Arrange
+    sock = FakeNetlinkSocket(dumps())
+    monitor = fake_monitor(sock)
+    # Act
+    interfaces = monitor.snapshot()
+    # Assert
+    assert [interface.name for interface in interfaces] == ["lo", "eth0"]
+    assert monitor.ipv4_address("eth0") == "192.0.2.2"
+    assert monitor.ipv4_address("wlan0") is None
+    assert monitor.addresses() == frozenset(["127.0.0.1", "192.0.2.2"])
+    assert [msg_type for msg_type, _ in sock.requests] == [netlink.RTM_GETLINK, netlink.RTM_GETADDR]
+
+
+def test_changes_are_published():
+    """Tests carrier and address changes reach the listeners"""
+    # Arrange
+    sock = FakeNetlinkSocket(dumps())
+    monitor = fake_monitor(sock)
+    carrier_changes = []
+    address_changes = []
+    done = threading.Event()
+    monitor.on_carrier_change(lambda interface: carrier_changes.append((interface.name, interface.carrier)))
+    monitor.on_addresses_change(lambda addresses: (address_changes.append(addresses), done.set()))
+    # Act
+    assert monitor.start()
+    sock.feed(link_message(4, "eth0", carrier=True))
+    sock.feed(address_message(4, "192.0.2.2", msg_type=netlink.RTM_DELADDR))
+    done.wait(2)
+    monitor.stop()
+    # Assert
+    assert carrier_changes == [("eth0", True)]
+    assert address_changes == [frozenset(["127.0.0.1"])]
+    assert monitor.interface("eth0").carrier
+    assert sock.closed
+
+
+def test_lost_messages_reload_the_table():
+    """Tests a receive buffer overrun loads the table again, reporting what changed"""
+    # Arrange
+    sock = FakeNetlinkSocket(dumps())
+    monitor = fake_monitor(sock)
+    removed = []
+    done = threading.Event()
+    monitor.on_remove(lambda interface: (removed.append(interface.name), done.set()))
+    assert monitor.start()
+    # Act
+    sock.dumps[netlink.RTM_GETLINK] = [link_message(1, "lo")]
+    sock.dumps[netlink.RTM_GETADDR] = [address_message(1, "127.0.0.1", 8)]
+    sock.feed(OSError(errno.ENOBUFS, "No buffer space available"))
+    done.wait(2)
+    monitor.stop()
+    # Assert
+    assert removed == ["eth0"]
+    assert [interface.name for interface in monitor.snapshot()] == ["lo"]
+
+
+def test_start_fails_without_netlink():
+    """Tests the monitor reports it cannot run when netlink is not available"""
+    # Arrange
+    def no_netlink(protocol, groups):
+        raise OSError(errno.EAFNOSUPPORT, "Address family not supported by protocol")
+    monitor = InterfaceMonitor(open_socket=no_netlink)
+    # Act / Assert
+    assert not monitor.start()
+    assert monitor.snapshot() == []
+
+
+def test_overruns_while_reloading_are_retried():
+    """Tests the table is reloaded when messages are lost again while it is, and changes are still applied after"""
+    # Arrange
+    sock = FakeNetlinkSocket(dumps())
+    monitor = fake_monitor(sock)
+    reloaded = threading.Event()
+    carrier_changes = []
+    done = threading.Event()
+    monitor.on_link_change(lambda interface: reloaded.set())
+    monitor.on_carrier_change(lambda interface: (carrier_changes.append(interface.carrier), done.set()))
+    assert monitor.start()
+    # Act
+    sock.dumps[netlink.RTM_GETLINK].append(link_message(5, "wlan0"))
+    sock.feed(OSError(errno.ENOBUFS, "No buffer space available"))
+    sock.feed(OSError(errno.ENOBUFS, "No buffer space available"))
+    reloaded.wait(2)
+    sock.feed(link_message(4, "eth0", carrier=True))
+    done.wait(2)
+    running = monitor.running
+    monitor.stop()
+    # Assert
+    assert running
+    assert carrier_changes == [True]
+    assert [interface.name for interface in monitor.snapshot()] == ["lo", "eth0", "wlan0"]
+
+
+def test_monitor_stops_when_the_table_cannot_be_reloaded():
+    """Tests the monitor gives up (and reads load the table) when reloading it keeps failing"""
+    # Arrange
+    sock = FakeNetlinkSocket(dumps())
+    monitor = fake_monitor(sock)
+    assert monitor.start()
+    # Act
+    for _ in range(netlink.RESYNC_ATTEMPTS + 1):
+        sock.feed(OSError(errno.ENOBUFS, "No buffer space available"))
+    monitor.thread.join(2)
+    sock.dumps[netlink.RTM_GETLINK] = [link_message(1, "lo")]
+    sock.dumps[netlink.RTM_GETADDR] = []
+    # Assert
+    assert not monitor.running
+    assert sock.closed
+    assert [interface.name for interface in monitor.snapshot()] == ["lo"]
@@ -0,0 +1,122 @@
+import threading
+
+from fakes import (
+    NL80211_FAMILY_ID,
+    FakeNetlinkSocket,
+    nl80211_dumps,
+    station_message,
+    wireless_interface_message,
+)
+from fpms.modules import nl80211
+from fpms.modules.nl80211 import WirelessMonitor
+
+
+class FakeKernel(object):
+    '''
+    Opens a fake netlink socket on the same dumps for each request
+    '''
+
+    def __init__(self, dumps):
+        self.dumps = dumps
+        self.sockets = []
+
+    def open_socket(self, protocol, groups):
+        sock = FakeNetlinkSocket(self.dumps)
+        self.sockets.append(sock)
+        return sock
+
+    def interface_dumps(self):
+        return sum(1 for sock in self.sockets for msg_type, data in sock.requests
+            if msg_type == NL80211_FAMILY_ID and data[16] == nl80211.NL80211_CMD_GET_INTERFACE)
+
+
+def interfaces():
+    return [
+        wireless_interface_message(5, "wlan1", 1, nl80211.NL80211_IFTYPE_MONITOR, frequency=2437),
+        wireless_interface_message(3, "wlan0", 0, nl80211.NL80211_IFTYPE_AP, "dc:a6:32:01:02:03", 5180, "WLAN Pi"),
+        wireless_interface_message(4, "wlan0mon", 0, nl80211.NL80211_IFTYPE_MONITOR),
+    ]
+
+
+def test_interfaces_are_read_from_nl80211():
+    """Tests the PHY, type, MAC address, frequency and SSID of the interfaces come from nl80211"""
+    # Arrange
+    kernel = FakeKernel(nl80211_dumps(interfaces()))
+    monitor = WirelessMonitor(open_socket=kernel.open_socket)
+    # Act
+    wlans = monitor.interfaces()
+    # Assert
+    assert [(wlan.phy, wlan.name, wlan.mode) for wlan in wlans] == [
+        (0, "wlan0", "AP"), (0, "wlan0mon", "monitor"), (1, "wlan1", "monitor")]
+    wlan0 = monitor.interface("wlan0")
+    assert (wlan0.mac, wlan0.frequency, wlan0.ssid) == ("dc:a6:32:01:02:03", 5180, "WLAN Pi")
+    assert wlans[1].frequency is None and wlans[1].ssid is None
+    assert monitor.interface("wlan2") is None
+    # (not started, so nothing is cached)
+    assert kernel.interface_dumps() == 3
+
+
+def test_dump_is_cached_until_a_change_is_multicast():
+    """Tests the interfaces are dumped again only after nl80211 reports a change"""
+    # Arrange
+    kernel = FakeKernel(nl80211_dumps(interfaces()))
+    monitor = WirelessMonitor(open_socket=kernel.open_socket)
+    changed = threading.Event()
+    monitor.on_change(changed.set)
+    assert monitor.start()
+    events = kernel.sockets[0]
+    # Act
+    first = monitor.interfaces()
+    second = monitor.interfaces()
+    kernel.dumps[(NL80211_FAMILY_ID, nl80211.NL80211_CMD_GET_INTERFACE)] = interfaces()[:2]
+    events.feed(wireless_interface_message(4, "wlan0mon", 0, nl80211.NL80211_IFTYPE_MONITOR,
+        cmd=nl80211.NL80211_CMD_DEL_INTERFACE))
+    changed.wait(2)
+    third = monitor.interfaces()
+    monitor.stop()
+    # Assert
+    assert events.memberships == [5, 8]
+    assert len(first) == len(second) == 3
+    assert [wlan.name for wlan in third] == ["wlan0", "wlan1"]
+    assert kernel.interface_dumps() == 2
+    assert events.closed
+
+
+def test_dump_expires_after_max_age():
+    """Tests a dump is not used longer than WIRELESS_MAX_AGE, as some changes are not multicast"""
+    # Arrange
+    now = [100.0]
+    kernel = FakeKernel(nl80211_dumps(interfaces()))
+    monitor = WirelessMonitor(open_socket=kernel.open_socket, clock=lambda: now[0])
+    assert monitor.start()
+    # Act
+    monitor.interfaces()
+    now[0] += nl80211.WIRELESS_MAX_AGE - 1
+    monitor.interfaces()
+    now[0] += 1
+    monitor.interfaces()
+    monitor.stop()
+    # Assert
+    assert kernel.interface_dumps() == 2
+
+
+def test_station_count():
+    """Tests the clients of an AP are counted from a station dump of its interface"""
+    # Arrange
+    stations = [station_message(3, "02:00:00:00:00:01"), station_message(3, "02:00:00:00:00:02")]
+    kernel = FakeKernel(nl80211_dumps(interfaces(), stations))
+    monitor = WirelessMonitor(open_socket=kernel.open_socket)
+    # Act / Assert
+    assert monitor.station_count("wlan0") == 2
+    assert monitor.station_count("wlan2") is None
+
+
+def test_no_interfaces_without_nl80211():
+    """Tests there are no WLAN interfaces when the kernel has no nl80211 family"""
+    # Arrange
+    kernel = FakeKernel({})
+    monitor = WirelessMonitor(open_socket=kernel.open_socket)
+    # Act / Assert
+    assert not monitor.start()
+    assert monitor.interfaces() == []
+    assert monitor.station_count("wlan0") is None
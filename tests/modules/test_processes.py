@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from fpms.modules import processes
+from fpms.modules.processes import ProcessTable, capture_interfaces, pid_alive
+
+
+@pytest.fixture
+def proc_dir(tmp_path):
+    def add(pid, *argv):
+        (tmp_path / str(pid)).mkdir()
+        (tmp_path / str(pid) / "cmdline").write_bytes(b"".join(arg.encode() + b"\0" for arg in argv))
+
+    add(1, "/sbin/init")
+    add(2)  # kernel thread
+    add(310, "/usr/bin/dumpcap", "-n", "-i", "wlan0mon", "-w", "/tmp/wireshark.pcapng")
+    add(420, "sudo", "tcpdump", "-ni", "wlan1")
+    add(421, "tcpdump", "-ni", "wlan1")
+    add(530, "tcpdump", "-w", "/tmp/wlan0.pcap", "-i", "eth0")
+    (tmp_path / "self").mkdir()
+    return tmp_path
+
+
+def test_capture_interfaces_are_read_from_the_options():
+    """Tests the interfaces are found in -i, clustered short options and --interface"""
+    # Act / Assert
+    assert capture_interfaces(["tcpdump", "-ni", "wlan0"]) == ["wlan0"]
+    assert capture_interfaces(["tcpdump", "-iwlan1", "-c", "5"]) == ["wlan1"]
+    assert capture_interfaces(["tcpdump", "--interface=eth0"]) == ["eth0"]
+    assert capture_interfaces(["dumpcap", "-i", "wlan0", "--interface", "wlan1"]) == ["wlan0", "wlan1"]
+    assert capture_interfaces(["tcpdump", "-w", "/tmp/iface.pcap", "-r", "-i"]) == []
+
+
+def test_capture_tools_by_interface(proc_dir):
+    """Tests the tools capturing from an interface are found in the process list"""
+    # Arrange
+    table = ProcessTable(proc_dir=str(proc_dir))
+    # Act / Assert
+    assert table.capture_tools("wlan0mon") == ["dumpcap"]
+    assert table.capture_tools("wlan1") == ["tcpdump"]
+    assert table.capture_tools("wlan0") == []
+    assert [pid for pid, _ in table.processes()].count(2) == 0
+
+
+def test_process_list_is_scanned_once_per_ttl(proc_dir):
+    """Tests the process list is read again only once PROCESSES_TTL has passed"""
+    # Arrange
+    now = [100.0]
+    table = ProcessTable(proc_dir=str(proc_dir), clock=lambda: now[0])
+    table.capture_tools("wlan1")
+    os.remove(proc_dir / "421" / "cmdline")
+    # Act
+    cached = table.capture_tools("wlan1")
+    now[0] += processes.PROCESSES_TTL
+    scanned = table.capture_tools("wlan1")
+    # Assert
+    assert cached == ["tcpdump"]
+    assert scanned == []
+
+
+def test_pid_alive():
+    """Tests a running process is alive, and neither an exited nor a zombie one is"""
+    # Arrange
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    zombie = subprocess.Popen([sys.executable, "-c", "pass"])
+    for _ in range(100):
+        with open("/proc/{}/stat".format(zombie.pid)) as f:
+            if f.read().rpartition(")")[2].split()[0] == "Z":
+                break
+        time.sleep(0.02)
+    # Act / Assert
+    assert pid_alive(os.getpid())
+    assert not pid_alive(exited.pid)
+    assert not pid_alive(zombie.pid)
+    # the zombie was reaped
+    assert not os.path.exists("/proc/{}".format(zombie.pid))
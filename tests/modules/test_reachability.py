@@ -0,0 +1,113 @@
+import threading
+import time
+
+from fpms.modules.reachability import ReachabilityMonitor, if_addresses
+from fpms.modules.state import AppState
+
+
+def failing_probe():
+    raise OSError("Network is unreachable")
+
+
+def test_probe_reports_the_fastest_success():
+    """Tests the Internet is reachable if any probe succeeds"""
+    # Arrange
+    monitor = ReachabilityMonitor({}, probes=[failing_probe, lambda: 0.25, lambda: 0.05])
+    # Act
+    result = monitor.probe()
+    # Assert
+    assert result.reachable
+    assert result.latency in (0.25, 0.05)
+
+
+def test_probe_fails_when_every_probe_fails():
+    """Tests a round with no successful probe is unreachable, with no latency"""
+    # Arrange
+    monitor = ReachabilityMonitor({}, probes=[failing_probe, failing_probe])
+    # Act
+    result = monitor.probe()
+    # Assert
+    assert not result.reachable
+    assert result.latency is None
+
+
+def test_probe_round_is_bounded():
+    """Tests a round gives up on probes hung past the round timeout (e.g. in name resolution)"""
+    # Arrange
+    release = threading.Event()
+
+    def hung_probe():
+        release.wait(timeout=5)
+        raise OSError("Temporary failure in name resolution")
+
+    monitor = ReachabilityMonitor({}, probes=[hung_probe, hung_probe], round_timeout=0.1)
+    # Act
+    start = time.monotonic()
+    result = monitor.probe()
+    elapsed = time.monotonic() - start
+    release.set()
+    monitor.executor.shutdown(wait=True)
+    # Assert
+    assert not result.reachable
+    assert result.latency is None
+    assert elapsed < 2
+
+
+def test_publish_notifies_changes_only():
+    """Tests the result goes to g_vars and listeners hear about changes"""
+    # Arrange
+    g_vars = AppState()
+    changes = []
+    monitor = ReachabilityMonitor(g_vars, probes=[lambda: 0.01])
+    monitor.on_change(changes.append)
+    # Act
+    monitor.publish(monitor.probe())
+    monitor.publish(monitor.probe())
+    # Assert
+    assert g_vars["eth_last_reachability_result"] is True
+    assert g_vars["eth_last_reachability_latency"] == 0.01
+    assert len(changes) == 1
+
+
+def test_delay_backs_off_while_unreachable():
+    """Tests failed rounds double the wait, up to the maximum"""
+    # Arrange
+    monitor = ReachabilityMonitor({}, probes=[], interval=30, max_backoff=300)
+    # Act
+    delays = [monitor.delay(failures) for failures in range(6)]
+    # Assert
+    assert delays == [30, 30, 60, 120, 240, 300]
+
+
+def test_address_change_probes_at_once():
+    """Tests a new IP address starts a round without waiting for the next"""
+    # Arrange
+    rounds = []
+    probed = threading.Semaphore(0)
+    addresses = [frozenset(), frozenset(["192.168.1.10"])]
+
+    def probe():
+        rounds.append(probe)
+        probed.release()
+        return 0.01
+
+    monitor = ReachabilityMonitor({}, probes=[probe],
+        addresses=lambda: addresses[min(len(rounds), 1)], interval=60,
+        address_poll_interval=0.01)
+    # Act
+    monitor.start()
+    try:
+        assert probed.acquire(timeout=5)
+        assert probed.acquire(timeout=5)
+    finally:
+        monitor.stop()
+    # Assert
+    assert len(rounds) >= 2
+
+
+def test_if_addresses_includes_loopback():
+    """Tests the addresses are read from the kernel"""
+    # Act
+    addresses = if_addresses()
+    # Assert
+    assert "127.0.0.1" in addresses
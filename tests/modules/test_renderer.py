@@ -0,0 +1,94 @@
+import threading
+
+from PIL import Image
+
+from fpms.modules.screen.renderer import Renderer
+
+
+class FakeDevice:
+    """Records what reaches the device, optionally blocking each draw"""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self.drawing = threading.Event()
+
+    def drawImage(self, image):
+        self.drawing.set()
+        self.release.wait()
+        self.calls.append(("draw", image.getpixel((0, 0))))
+
+    def clear(self):
+        self.calls.append(("clear",))
+
+
+def frame(colour):
+    return Image.new("RGB", (8, 8), colour)
+
+
+def test_frames_waiting_for_the_device_coalesce():
+    """Tests only the latest of several queued frames is drawn"""
+    # Arrange
+    device = FakeDevice()
+    renderer = Renderer(device)
+    renderer.start()
+    device.release.clear()
+    renderer.draw(frame((1, 0, 0)))
+    device.drawing.wait(1)
+    # Act
+    for colour in [(2, 0, 0), (3, 0, 0), (4, 0, 0)]:
+        renderer.draw(frame(colour))
+    device.release.set()
+    renderer.flush()
+    # Assert
+    assert device.calls == [("draw", (1, 0, 0)), ("draw", (4, 0, 0))]
+    assert renderer.stats["sent"] == 2
+    assert renderer.stats["coalesced"] == 2
+
+
+def test_commands_run_in_order_with_frames():
+    """Tests a clear is not overtaken by a frame submitted after it"""
+    # Arrange
+    device = FakeDevice()
+    renderer = Renderer(device)
+    renderer.start()
+    # Act
+    renderer.draw(frame((1, 0, 0)))
+    renderer.submit(device.clear)
+    renderer.invalidate()
+    renderer.draw(frame((1, 0, 0)), wait=True)
+    # Assert
+    assert device.calls == [("draw", (1, 0, 0)), ("clear",), ("draw", (1, 0, 0))]
+
+
+def test_caller_can_keep_drawing_after_submitting():
+    """Tests the queued frame is a copy, not the caller's canvas"""
+    # Arrange
+    device = FakeDevice()
+    renderer = Renderer(device)
+    renderer.start()
+    device.release.clear()
+    canvas = frame((1, 0, 0))
+    renderer.draw(frame((9, 0, 0)))
+    device.drawing.wait(1)
+    # Act
+    renderer.draw(canvas)
+    canvas.putpixel((0, 0), (5, 0, 0))
+    device.release.set()
+    renderer.flush()
+    # Assert
+    assert device.calls[-1] == ("draw", (1, 0, 0))
+
+
+def test_unchanged_frames_are_skipped():
+    """Tests a frame identical to the last one submitted is not queued"""
+    # Arrange
+    device = FakeDevice()
+    renderer = Renderer(device)
+    # Act
+    renderer.draw(frame((1, 0, 0)))
+    renderer.draw(frame((1, 0, 0)))
+    # Assert
+    assert device.calls == [("draw", (1, 0, 0))]
+    assert renderer.stats["skipped"] == 1
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from fpms.modules.scaling import ScaledDraw, ScaledFont, create_draw, load_font
+
+FONT_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "fpms", "fonts", "DejaVuSansMono-Bold.ttf")
+
+# The 240x240 ST7789 rendering the 128x128 logical page
+SCALE = 240 / 128
+
+
+def test_scale_one_returns_plain_pil_objects():
+    """Tests 128x128 panels keep using PIL directly"""
+    # Arrange
+    image = Image.new("RGB", (128, 128))
+    # Act / Assert
+    assert isinstance(load_font(FONT_PATH, 10), ImageFont.FreeTypeFont)
+    assert isinstance(create_draw(image), ImageDraw.ImageDraw)
+
+
+def test_scaled_font_reports_logical_metrics():
+    """Tests text centring on the logical page stays correct when scaled"""
+    # Arrange
+    font = load_font(FONT_PATH, 10, SCALE)
+    # Act
+    width = font.getbbox("Home")[2]
+    # Assert
+    assert isinstance(font, ScaledFont)
+    assert font.font.size == 19
+    assert width == pytest.approx(ImageFont.truetype(FONT_PATH, 10).getbbox("Home")[2], rel=0.15)
+
+
+def test_scaled_draw_renders_at_native_resolution():
+    """Tests logical coordinates land on the matching native pixels"""
+    # Arrange
+    image = Image.new("RGB", (240, 240))
+    draw = create_draw(image, SCALE)
+    # Act
+    draw.rectangle((0, 0, 128, 16), fill="white")
+    draw.text((0, 64), "Hi", font=load_font(FONT_PATH, 10, SCALE), fill="white")
+    # Assert
+    assert isinstance(draw, ScaledDraw)
+    assert image.crop((0, 0, 240, 40)).getbbox() == (0, 0, 240, 31)
+    top = image.crop((0, 40, 240, 240)).getbbox()[1] + 40
+    assert 120 <= top < 130
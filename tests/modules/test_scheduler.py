@@ -0,0 +1,97 @@
+import threading
+import time
+
+from fpms.modules.scheduler import (
+    DEFAULT_REFRESH_INTERVAL,
+    EVENT_BUTTON,
+    EVENT_TICK,
+    Scheduler,
+    get_refresh_interval,
+    refresh_interval,
+)
+
+
+def test_posted_event_wakes_the_loop_at_once():
+    """Tests an event posted from another thread ends the wait immediately"""
+    # Arrange
+    scheduler = Scheduler()
+    scheduler.set_timer("refresh", 10)
+    threading.Timer(0.01, scheduler.post, args=(EVENT_BUTTON, "down")).start()
+    # Act
+    start = time.monotonic()
+    event = scheduler.wait()
+    # Assert
+    assert event == (EVENT_BUTTON, "down")
+    assert time.monotonic() - start < 1
+
+
+def test_events_are_handled_before_due_timers():
+    """Tests button presses are not held up behind timer ticks"""
+    # Arrange
+    scheduler = Scheduler()
+    scheduler.set_timer("refresh", 0.01)
+    time.sleep(0.02)
+    scheduler.post(EVENT_BUTTON, "up")
+    # Act
+    events = [scheduler.wait(), scheduler.wait()]
+    # Assert
+    assert events == [(EVENT_BUTTON, "up"), (EVENT_TICK, "refresh")]
+
+
+def test_timers_tick_at_their_own_interval():
+    """Tests a fast timer ticks several times while a slow one waits"""
+    # Arrange
+    scheduler = Scheduler()
+    scheduler.set_timer("fast", 0.01)
+    scheduler.set_timer("slow", 10)
+    # Act
+    events = [scheduler.wait(timeout=1) for i in range(3)]
+    # Assert
+    assert events == [(EVENT_TICK, "fast")] * 3
+
+
+def test_stopped_timer_does_not_tick():
+    """Tests a static page (no interval) is not refreshed"""
+    # Arrange
+    scheduler = Scheduler()
+    scheduler.set_timer("refresh", 0.01)
+    # Act
+    scheduler.set_timer("refresh", None)
+    # Assert
+    assert scheduler.wait(timeout=0.05) is None
+
+
+def test_restart_postpones_the_next_tick():
+    """Tests the refresh period starts over after a button redrew the page"""
+    # Arrange
+    scheduler = Scheduler()
+    scheduler.set_timer("refresh", 0.2)
+    time.sleep(0.15)
+    # Act
+    scheduler.set_timer("refresh", 0.2)
+    kept = scheduler.wait(timeout=0.1)
+    scheduler.set_timer("refresh", 0.2, restart=True)
+    restarted = scheduler.wait(timeout=0.1)
+    # Assert
+    assert kept == (EVENT_TICK, "refresh")
+    assert restarted is None
+
+
+def test_pages_declare_their_refresh_interval():
+    """Tests the decorator and the default for undeclared pages"""
+    # Arrange
+    @refresh_interval(None)
+    def static_page():
+        pass
+
+    @refresh_interval(0.5)
+    def live_page():
+        pass
+
+    def other_page():
+        pass
+
+    # Act
+    intervals = [get_refresh_interval(page) for page in [static_page, live_page, other_page]]
+    # Assert
+    assert intervals == [None, 0.5, DEFAULT_REFRESH_INTERVAL]
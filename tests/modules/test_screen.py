@@ -0,0 +1,60 @@
+from PIL import Image, ImageDraw
+
+from fpms.modules.screen.screen import AbstractScreen
+
+
+class FakeScreen(AbstractScreen):
+    def init(self):
+        return True
+
+    def drawImage(self, image):
+        pass
+
+    def clear(self):
+        pass
+
+    def sleep(self):
+        pass
+
+    def wakeup(self):
+        pass
+
+    def set_orientation(self, flipped):
+        pass
+
+
+def test_dirty_regions_first_frame_is_full():
+    """Tests the first frame after start-up (or invalidate) is sent in full"""
+    # Arrange
+    screen = FakeScreen()
+    image = Image.new("RGB", (128, 128))
+    # Act / Assert
+    assert screen.dirty_regions(image) == [(0, 0, 128, 128)]
+    screen.invalidate()
+    assert screen.dirty_regions(image) == [(0, 0, 128, 128)]
+
+
+def test_dirty_regions_unchanged_frame():
+    """Tests nothing is sent when the frame did not change"""
+    # Arrange
+    screen = FakeScreen()
+    image = Image.new("RGB", (128, 128))
+    screen.dirty_regions(image)
+    # Act / Assert
+    assert screen.dirty_regions(image.copy()) == []
+
+
+def test_dirty_regions_separate_changes():
+    """Tests a clock tick and a menu highlight move produce separate boxes"""
+    # Arrange
+    screen = FakeScreen()
+    image = Image.new("RGB", (128, 128))
+    screen.dirty_regions(image)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((4, 2, 30, 11), fill="white")
+    draw.rectangle((0, 100, 127, 113), fill="yellow")
+    # Act
+    regions = screen.dirty_regions(image)
+    # Assert
+    assert regions == [(4, 2, 31, 12), (0, 100, 128, 114)]
+    assert screen.dirty_regions(image) == []
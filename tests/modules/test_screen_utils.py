@@ -0,0 +1,132 @@
+import random
+import timeit
+
+import pytest
+from PIL import Image
+
+from fpms.modules.screen import utils as screen_utils
+from fpms.modules.screen.utils import (
+    FILL_CHUNK_PIXELS,
+    FILL_CHUNKS_MAX,
+    color_to_rgb565,
+    fill_chunks,
+    image_to_rgb565,
+)
+
+
+def legacy_rgb565(image):
+    """The per-pixel conversion loop previously used by LCD.LCD_ShowImage"""
+    width, height = image.size
+    img = image.load()
+    pix = []
+
+    for y in range(height):
+        for x in range(width):
+            r, g, b = img[x, y]
+            pix.append((r & 0xF8) | (g >> 5))
+            pix.append(((g << 3) & 0xE0) | (b >> 3))
+
+    return pix
+
+
+@pytest.fixture
+def synthetic_frame():
+    """A 128x128 frame with every pixel set to a random colour"""
+    rng = random.Random(1234)
+    image = Image.new("RGB", (128, 128))
+    image.putdata([
+        (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        for _ in range(128 * 128)
+    ])
+    return image
+
+
+def test_image_to_rgb565_matches_legacy_packing(synthetic_frame):
+    """Tests the packed buffer is byte-for-byte what the old loop produced"""
+    # Act
+    packed = image_to_rgb565(synthetic_frame)
+    # Assert
+    assert len(packed) == 128 * 128 * 2
+    assert list(packed) == legacy_rgb565(synthetic_frame)
+
+
+@pytest.mark.parametrize(
+    "colour, expected",
+    [
+        ((255, 255, 255), b"\xff\xff"),
+        ((0, 0, 0), b"\x00\x00"),
+        ((255, 0, 0), b"\xf8\x00"),
+        ((0, 255, 0), b"\x07\xe0"),
+        ((0, 0, 255), b"\x00\x1f"),
+    ],
+)
+def test_image_to_rgb565_is_big_endian(colour, expected):
+    """Tests the high byte of each pixel is sent first"""
+    # Arrange
+    image = Image.new("RGB", (1, 1), colour)
+    # Act / Assert
+    assert image_to_rgb565(image) == expected
+
+
+def test_image_to_rgb565_converts_other_modes():
+    """Tests non-RGB frames (e.g. splash screen PNGs) are converted first"""
+    # Arrange
+    image = Image.new("RGBA", (2, 2), (255, 0, 0, 128))
+    # Act / Assert
+    assert image_to_rgb565(image) == b"\xf8\x00" * 4
+
+
+def test_benchmark_rgb565_packing(synthetic_frame):
+    """
+    Micro-benchmark comparing the legacy per-pixel loop with the packed path.
+    Run with `pytest -s` to see the timings.
+    """
+    # Act
+    legacy = min(timeit.repeat(lambda: legacy_rgb565(synthetic_frame), number=5, repeat=3)) / 5
+    packed = min(timeit.repeat(lambda: image_to_rgb565(synthetic_frame), number=5, repeat=3)) / 5
+    print(f"\nRGB565 128x128: legacy {legacy * 1000:.2f} ms, packed {packed * 1000:.2f} ms "
+          f"({legacy / packed:.0f}x)")
+    # Assert
+    assert packed < legacy
+
+
+@pytest.mark.parametrize(
+    "colour, expected",
+    [
+        ((255, 255, 255), 0xFFFF),
+        ((255, 0, 0), 0xF800),
+        ((0, 255, 0), 0x07E0),
+        ((0, 0, 255), 0x001F),
+        (0x1234, 0x1234),
+    ],
+)
+def test_color_to_rgb565(colour, expected):
+    """Tests tuples are packed like image pixels and ints pass through"""
+    # Act / Assert
+    assert color_to_rgb565(colour) == expected
+
+
+def test_fill_chunks_cover_area_with_reused_buffer():
+    """Tests a fill streams exactly the area, reusing one preallocated chunk"""
+    # Arrange
+    pixels = 128 * 128 + 5
+    # Act
+    chunks = list(fill_chunks((255, 0, 0), pixels))
+    # Assert
+    assert b"".join(chunks) == b"\xf8\x00" * pixels
+    assert all(chunk is chunks[0] for chunk in chunks[:-1])
+    assert next(fill_chunks(0xF800, 1)).obj is chunks[0]
+
+
+def test_fill_chunks_keep_the_last_colours_only():
+    """Tests filling with many colours keeps a few chunks, the most recently used"""
+    # Arrange
+    clear = next(fill_chunks(0x0000, FILL_CHUNK_PIXELS))
+    # Act
+    for value in range(1, 100):
+        next(fill_chunks(value, 1))
+        next(fill_chunks(0x0000, 1))
+    # Assert
+    assert len(screen_utils._fill_chunks) == FILL_CHUNKS_MAX
+    assert next(fill_chunks(0x0000, FILL_CHUNK_PIXELS)) is clear
+    assert 1 not in screen_utils._fill_chunks
@@ -0,0 +1,49 @@
+import threading
+
+import pytest
+
+from benchmarks import FakeSystem, headless_g_vars
+from fpms.modules.apps.scanner import Scanner
+from fpms.modules.nav.buttons import Button
+from fpms.modules.network import Network
+from fpms.modules.pages.homepage import HomePage
+from fpms.modules.services import Services
+
+
+@pytest.fixture
+def g_vars(monkeypatch, tmp_path):
+    FakeSystem().install(monkeypatch, tmp_path)
+    return headless_g_vars()
+
+
+def test_services_are_built_once(g_vars):
+    """Tests the registry returns the same instance on every call"""
+    # Arrange
+    services = Services(g_vars)
+    # Act
+    first = services.get(Network)
+    second = services.get(Network)
+    # Assert
+    assert first is second
+
+
+def test_services_share_the_objects_they_use(g_vars):
+    """Tests the home page and buttons get their objects from the registry"""
+    # Arrange
+    services = Services(g_vars)
+    # Act
+    home_page = services.get(HomePage)
+    button = Button(g_vars, [], services)
+    # Assert
+    assert home_page.scanner_obj is services.get(Scanner)
+    assert button.homepage_obj is home_page
+
+
+def test_home_page_does_not_start_threads(g_vars):
+    """Tests building the home page leaves the running threads alone"""
+    # Arrange
+    threads = threading.active_count()
+    # Act
+    Services(g_vars).get(HomePage)
+    # Assert
+    assert threading.active_count() == threads
@@ -0,0 +1,86 @@
+import pytest
+from PIL import Image, ImageDraw
+
+from fpms.modules.constants import STATUS_BAR_HEIGHT
+from fpms.modules.pages.sprites import StatusBarSprites, status_bar_sprites
+from fpms.modules.themes import THEME
+
+
+def status_bar():
+    return Image.new("RGB", (128, 24), THEME.status_bar_background)
+
+
+def baseline_wifi(canvas, x, y, height, status_up, monitor_mode, fill_color):
+    # the drawing of HomePage.wifi_indicator before the sprites
+    if status_up or monitor_mode:
+        canvas.pieslice((x, y + 3, x + height, y + height + 3), 225, 315, fill=fill_color)
+        if monitor_mode:
+            canvas.ellipse((x + height/2 - 3, y + height/2 - 2, x + height/2 + 3, y + height/2), fill=THEME.status_bar_background)
+            canvas.ellipse((x + height/2 - 1, y + height/2 - 2, x + height/2 + 1, y + height/2), fill=fill_color)
+    else:
+        canvas.pieslice((x, y + 3, x + height, y + height + 3), 225, 315, outline=fill_color)
+
+
+def baseline_reachability(canvas, x, y, height, reachable):
+    # the drawing of HomePage.reachability_indicator before the sprites
+    canvas.ellipse((x + 4, y + 2, x + height, y + height - 2), outline=THEME.status_bar_foreground)
+    canvas.ellipse((x + 7, y + 2, x + height - 3, y + height - 2), outline=THEME.status_bar_foreground)
+    canvas.line((x + 4, y + height/2, x + height, y + height/2), fill=THEME.status_bar_foreground)
+
+    if reachable != True:
+        canvas.line((x + 3, y + 1, x + height, y + height - 2), fill=THEME.status_bar_foreground, width=2)
+
+
+# The height status_bar() gives the indicators (its own, less 2 px), and a
+# taller one
+HEIGHTS = [STATUS_BAR_HEIGHT - 2, STATUS_BAR_HEIGHT]
+
+
+@pytest.mark.parametrize("height", HEIGHTS)
+@pytest.mark.parametrize("reachable", [False, True])
+def test_reachability_sprite_matches_primitives(height, reachable):
+    """Tests pasting the sprite gives what the status bar used to draw, at the height it is given"""
+    # Arrange
+    x, y = 60, 1
+    expected = status_bar()
+    baseline_reachability(ImageDraw.Draw(expected), x, y, height, reachable)
+    actual = status_bar()
+    # Act
+    StatusBarSprites(scale=1).paste(actual, ("reachability", height, reachable), x, y)
+    # Assert
+    assert actual.tobytes() == expected.tobytes()
+
+
+@pytest.mark.parametrize("height", HEIGHTS)
+@pytest.mark.parametrize("up, monitor, active", [
+    (False, False, False), (True, False, False), (True, False, True), (True, True, False), (True, True, True)])
+def test_wifi_sprite_matches_primitives(height, up, monitor, active):
+    """Tests pasting the sprite gives what the status bar used to draw, monitor 'eye' included"""
+    # Arrange
+    x, y = 44, 1
+    fill_color = THEME.status_bar_wifi_active if active else THEME.status_bar_foreground
+    expected = status_bar()
+    baseline_wifi(ImageDraw.Draw(expected), x, y, height, up, monitor, fill_color)
+    actual = status_bar()
+    # Act
+    StatusBarSprites(scale=1).paste(actual, ("wifi", height, up, monitor, active), x, y)
+    # Assert
+    assert actual.tobytes() == expected.tobytes()
+
+
+def test_battery_key_quantizes_charge():
+    """Tests each charge maps onto one of the pre-rendered gauge levels"""
+    # Arrange
+    sprites = status_bar_sprites()
+    # Act / Assert
+    assert sprites.battery_key("discharging", 100) == ("battery", "normal", 14)
+    assert sprites.battery_key("not charging", 100) == ("battery", "full", 14)
+    assert sprites.battery_key("discharging", 20) == ("battery", "low", 3)
+    assert sprites.battery_key("charging", 0) == ("battery", "charging", 0)
+    assert sprites.battery_key("discharging", 50) in sprites.sprites
+
+
+def test_atlas_is_built_once_per_theme():
+    """Tests the status bar reuses the same atlas on every refresh"""
+    # Act / Assert
+    assert status_bar_sprites() is status_bar_sprites()
@@ -0,0 +1,74 @@
+import pytest
+
+from fpms.modules.state import AppState
+
+
+def test_fields_are_read_and_written_as_a_mapping():
+    """Tests the pages can use the state like the dict it replaces"""
+    # Arrange
+    state = AppState(current_mode="hotspot")
+    # Act
+    state["display_state"] = "menu"
+    # Assert
+    assert state.display_state == "menu"
+    assert state["current_mode"] == "hotspot"
+    assert state["current_menu_location"] == [0]
+
+
+def test_unknown_fields_are_rejected():
+    """Tests a misspelt field fails rather than adding a key"""
+    # Arrange
+    state = AppState()
+    # Act / Assert
+    with pytest.raises(KeyError):
+        state["display_sate"] = "menu"
+    with pytest.raises(KeyError):
+        state["display_sate"]
+
+
+def test_mutable_defaults_are_not_shared():
+    """Tests each state gets its own lists"""
+    # Arrange
+    first = AppState()
+    second = AppState()
+    # Act
+    first["current_menu_location"].append(1)
+    # Assert
+    assert second["current_menu_location"] == [0]
+
+
+def test_optional_fields_can_be_unset():
+    """Tests fields only set while something runs can be checked and deleted"""
+    # Arrange
+    state = AppState()
+    assert "scanner_scandump_pid" not in state
+    # Act
+    state["scanner_scandump_pid"] = 1234
+    present = "scanner_scandump_pid" in state
+    del state["scanner_scandump_pid"]
+    # Assert
+    assert present
+    assert "scanner_scandump_pid" not in state
+
+
+def test_results_are_dropped_when_the_page_is_left():
+    """Tests page results only live while result_cache is set"""
+    # Arrange
+    state = AppState()
+    state["result_cache"] = True
+    state["about"] = ["WLAN Pi"]
+    # Act
+    state["result_cache"] = False
+    # Assert
+    assert "about" not in state
+    assert state.results == {}
+
+
+def test_update_and_snapshot_work_on_several_fields():
+    """Tests fields written together are read together"""
+    # Arrange
+    state = AppState()
+    # Act
+    state.update(eth_last_reachability_result=True, eth_last_reachability_latency=0.02)
+    # Assert
+    assert state.snapshot("eth_last_reachability_result", "eth_last_reachability_latency") == (True, 0.02)
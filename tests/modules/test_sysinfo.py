@@ -0,0 +1,72 @@
+import pytest
+
+from fpms.modules.sysinfo import SystemMetrics, format_uptime
+
+MEMINFO = """MemTotal:        3884096 kB
+MemFree:         2874528 kB
+MemAvailable:    3372032 kB
+Buffers:           47796 kB
+"""
+
+
+@pytest.fixture
+def metrics(tmp_path):
+    proc_dir = tmp_path / "proc"
+    proc_dir.mkdir()
+    (proc_dir / "loadavg").write_text("0.52 0.34 0.20 1/180 4242\n")
+    (proc_dir / "meminfo").write_text(MEMINFO)
+    (proc_dir / "uptime").write_text("788645.21 3112532.58\n")
+    (proc_dir / "stat").write_text("cpu  100 0 100 700 100 0 0 0 0 0\ncpu0 100 0 100 700 100 0 0 0 0 0\n")
+
+    sys_dir = tmp_path / "sys"
+    for zone, temp in [("thermal_zone0", "48312\n"), ("thermal_zone1", "51000\n")]:
+        (sys_dir / "class/thermal" / zone).mkdir(parents=True)
+        (sys_dir / "class/thermal" / zone / "temp").write_text(temp)
+
+    return SystemMetrics(proc_dir=str(proc_dir), sys_dir=str(sys_dir), root=str(tmp_path))
+
+
+def test_reads_load_memory_and_uptime(metrics):
+    """Tests the figures top, free and uptime gave are read from /proc"""
+    # Act / Assert
+    assert metrics.load_average() == (0.52, 0.34, 0.20)
+    assert metrics.memory() == ((3884096 - 3372032) // 1024, 3884096 // 1024)
+    assert format_uptime(metrics.uptime()) == "1w 2d 3h 4m"
+
+
+def test_cpu_usage_is_measured_between_samples(metrics):
+    """Tests the CPU usage is the busy share of the time since the previous sample"""
+    # Arrange
+    first = metrics.cpu_percent()
+    with open(metrics.proc_dir + "/stat", "w") as f:
+        # 100 more ticks, 25 of them idle
+        f.write("cpu  150 0 125 725 100 0 0 0 0 0\n")
+    # Act
+    second = metrics.cpu_percent()
+    # Assert
+    assert first == pytest.approx(20.0)
+    assert second == pytest.approx(75.0)
+
+
+def test_temperature_is_the_hottest_zone(metrics, tmp_path):
+    """Tests the temperature is read from the thermal zones, None without any"""
+    # Act / Assert
+    assert metrics.temperature() == 51.0
+    assert SystemMetrics(sys_dir=str(tmp_path / "none")).temperature() is None
+
+
+def test_disk_usage_of_the_root_filesystem(metrics):
+    """Tests the disk usage is read with statvfs"""
+    # Act
+    used, total, percent = metrics.disk_usage()
+    # Assert
+    assert 0 < used <= total
+    assert 0 < percent <= 100
+
+
+def test_uptime_is_formatted_like_uptime_p():
+    """Tests the uptime is abbreviated like the uptime -p | sed pipeline did"""
+    # Act / Assert
+    assert format_uptime(30) == "0m"
+    assert format_uptime(3 * 3600) == "3h"
+    assert format_uptime(86400 + 60) == "1d 1m"
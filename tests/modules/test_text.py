@@ -0,0 +1,65 @@
+import os
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from fpms.modules.scaling import create_draw, load_font
+from fpms.modules.text import CachedDraw, CachedFont, LRUCache, text_cache
+
+FONT_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "fpms", "fonts", "DejaVuSansMono-Bold.ttf")
+
+
+@pytest.mark.parametrize("fill", ["white", (10, 200, 30), 255])
+@pytest.mark.parametrize("xy", [(12, 3), (12.5, 3.5), (-3, -2), (120.25, 120.7)])
+def test_cached_text_matches_pil(fill, xy):
+    """Tests pasting the cached bitmap gives exactly what PIL draws"""
+    # Arrange
+    font = ImageFont.truetype(FONT_PATH, 11)
+    expected = Image.new("RGB", (128, 128), (20, 40, 60))
+    actual = expected.copy()
+    ImageDraw.Draw(expected).text(xy, "Network >", fill=fill, font=font)
+    # Act
+    CachedDraw(actual).text(xy, "Network >", fill=fill, font=CachedFont(font))
+    # Assert
+    assert actual.tobytes() == expected.tobytes()
+
+
+def test_text_is_rasterized_once():
+    """Tests repainting a label reuses the cached bitmap in any colour"""
+    # Arrange
+    font = CachedFont(load_font(FONT_PATH, 11))
+    draw = create_draw(Image.new("RGB", (128, 128)))
+    draw.text((12, 20), "Bluetooth", font=font, fill="white")
+    entries, hits = len(text_cache), text_cache.hits
+    # Act
+    draw.text((12, 34), "Bluetooth", font=font, fill="black")
+    # Assert
+    assert len(text_cache) == entries
+    assert text_cache.hits == hits + 1
+
+
+def test_font_metrics_are_cached():
+    """Tests measuring the same string twice only runs the layout once"""
+    # Arrange
+    font = CachedFont(load_font(FONT_PATH, 12, 240 / 128))
+    # Act
+    first = font.getbbox("SYSTEM")
+    second = font.getbbox("SYSTEM")
+    # Assert
+    assert first == second
+    assert (font.cache.hits, font.cache.misses) == (1, 1)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Tests the cache stays bounded and keeps recently used entries"""
+    # Arrange
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    # Act
+    cache.put("c", 3)
+    # Assert
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
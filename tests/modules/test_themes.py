@@ -0,0 +1,41 @@
+from fpms.modules.pages.sprites import status_bar_sprites
+from fpms.modules.screen.utils import color_to_rgb565
+from fpms.modules.themes import THEME, DarkTheme, LightTheme, CompiledTheme, set_theme
+
+
+def test_colors_are_resolved_to_rgb_tuples():
+    """Tests theme colors need no parsing when drawing"""
+    # Arrange
+    theme = CompiledTheme(DarkTheme)
+    # Act / Assert
+    assert theme.page_item_foreground == (255, 255, 255)
+    assert theme.status_bar_background == (0x00, 0x71, 0xbc)
+    # Enum aliases (members sharing a value) are compiled too
+    assert theme.status_bar_foreground == (255, 255, 255)
+
+
+def test_rgb565_table():
+    """Tests the SPI fills get ready packed 16-bit colors, packed as the frames are"""
+    # Arrange
+    theme = CompiledTheme(DarkTheme)
+    light = CompiledTheme(LightTheme)
+    # Act / Assert
+    assert theme.rgb565.display_background == 0x0000
+    assert theme.rgb565.text_color == 0xFFFF
+    assert light.rgb565.display_background == color_to_rgb565(light.display_background)
+
+
+def test_set_theme_updates_in_place_and_rebuilds_sprites():
+    """Tests modules holding THEME see the new colors and fresh sprites"""
+    # Arrange
+    theme = THEME
+    dark_sprites = status_bar_sprites()
+    try:
+        # Act
+        set_theme(LightTheme)
+        # Assert
+        assert theme.display_background == (0xe4, 0xe2, 0xe0)
+        assert status_bar_sprites() is not dark_sprites
+        assert status_bar_sprites().theme is theme
+    finally:
+        set_theme(DarkTheme)